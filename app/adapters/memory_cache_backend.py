@@ -0,0 +1,55 @@
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.application.cache import PayloadCache
+from app.domain.interfaces import CacheBackend
+
+class InMemoryCacheBackend(CacheBackend):
+    """Backend local al proceso: LRU acotada para los valores y pub/sub síncrono en memoria."""
+
+    # Cada cuántos incr() se purgan los contadores expirados
+    PRUNE_EVERY = 1000
+
+    def __init__(self, max_entries: int, max_bytes: int, clock: Callable[[], float] = time.monotonic):
+        self.values = PayloadCache("memory", max_entries, max_bytes, ttl=0, clock=clock)
+        self.clock = clock
+        self._counters: Dict[str, Tuple[int, float]] = {}
+        self._incr_calls = 0
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+
+    async def get(self, key: str) -> Optional[str]:
+        # Como en Redis, un contador se lee con get(); se guardan aparte para que la LRU no los expulse
+        counter = self._counters.get(key)
+        if counter is not None:
+            return str(counter[0]) if counter[1] > self.clock() else None
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self.values.set(key, value, self.values.read_token(), ttl=ttl)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        if self.values.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.values.invalidate(key)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        now = self.clock()
+        self._incr_calls += 1
+        if self._incr_calls % self.PRUNE_EVERY == 0:
+            self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+        value, expires_at = self._counters.get(key, (0, now))
+        value = value + 1 if expires_at > now else 1
+        self._counters[key] = (value, now + ttl)
+        return value
+
+    async def publish(self, channel: str, message: str) -> None:
+        for callback in list(self._subscribers[channel]):
+            callback(message)
+
+    async def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        self._subscribers[channel].append(callback)
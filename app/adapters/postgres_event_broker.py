@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Callable, List
+
+from app.domain.interfaces import EventBroker
+
+try:
+    import asyncpg
+except ImportError:  # Dependencia opcional: sólo hace falta con TASK_EVENTS_BROKER=postgres
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+class PostgresEventBroker(EventBroker):
+    """
+    Difusión entre workers con LISTEN/NOTIFY sobre una conexión asyncpg propia, fuera del pool:
+    LISTEN necesita una conexión fija durante toda la vida del proceso.
+
+    PostgreSQL entrega las notificaciones a todos los que escuchan en el orden de commit. Cada una
+    lleva delante un valor de la secuencia task_events_id_seq ("<id>:<mensaje>"): el id que
+    comparten todos los workers para ese evento.
+    """
+
+    # NOTIFY rechaza payloads de 8000 bytes o más; se reservan 21 para el id y el separador
+    MAX_PAYLOAD = 7999 - 21
+    SEQUENCE = "task_events_id_seq"
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, dsn: str, channel: str = "task_events"):
+        self.dsn = dsn
+        self.channel = channel
+        self._connection = None
+        self._callbacks: List[Callable[[str, str], None]] = []
+        # Una conexión asyncpg no admite dos consultas a la vez (se crea ya dentro del IOLoop)
+        self._lock = None
+        self._closed = False
+
+    @classmethod
+    def from_url(cls, url: str, channel: str = "task_events") -> "PostgresEventBroker":
+        if asyncpg is None:
+            raise RuntimeError("TASK_EVENTS_BROKER=postgres requires the 'asyncpg' package (pip install asyncpg)")
+        # asyncpg entiende postgresql://, sin el sufijo de driver de SQLAlchemy
+        scheme, separator, rest = url.partition("://")
+        return cls(f"{scheme.split('+')[0]}{separator}{rest}", channel)
+
+    async def publish(self, message: str) -> None:
+        if len(message.encode()) > self.MAX_PAYLOAD:
+            logger.warning("Task event too large for NOTIFY (%d bytes), not forwarded", len(message))
+            return
+        async with self._locked():
+            connection = await self._connect()
+            await connection.execute(
+                f"SELECT pg_notify($1, nextval('{self.SEQUENCE}')::text || ':' || $2)", self.channel, message
+            )
+
+    async def subscribe(self, callback: Callable[[str, str], None]) -> None:
+        self._callbacks.append(callback)
+        async with self._locked():
+            await self._connect()
+
+    async def close(self) -> None:
+        self._closed = True
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    def _locked(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _connect(self):
+        if self._connection is None or self._connection.is_closed():
+            connection = await asyncpg.connect(self.dsn)
+            await connection.add_listener(self.channel, self._on_notification)
+            connection.add_termination_listener(self._on_termination)
+            self._connection = connection
+        return self._connection
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        event_id, _, message = payload.partition(":")
+        for callback in self._callbacks:
+            try:
+                callback(event_id, message)
+            except Exception:
+                logger.exception("Error processing task event notification")
+
+    def _on_termination(self, connection):
+        if connection is self._connection and not self._closed:
+            # Sin LISTEN activo este worker deja de ver los cambios de los demás: se reconecta enseguida
+            logger.warning("Task events LISTEN connection lost, reconnecting")
+            self._connection = None
+            asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._closed:
+            try:
+                async with self._locked():
+                    await self._connect()
+                return
+            except (OSError, asyncpg.PostgresError):
+                logger.exception("Could not reconnect task events listener")
+                await asyncio.sleep(self.RECONNECT_DELAY)
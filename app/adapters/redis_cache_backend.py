@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+from app.domain.interfaces import CacheBackend
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Dependencia opcional: sólo hace falta con TASK_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class RedisCacheBackend(CacheBackend):
+    """Backend compartido por todos los procesos, sobre un cliente redis.asyncio (o compatible)."""
+
+    def __init__(self, client):
+        self.client = client
+        self._listeners = []
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        if redis is None:
+            raise RuntimeError("TASK_CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        return cls(redis.from_url(url, decode_responses=True))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        return bool(await self.client.set(key, value, px=int(ttl * 1000), nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        value = await self.client.incr(key)
+        await self.client.pexpire(key, int(ttl * 1000))
+        return value
+
+    async def incr_many(self, keys: List[str], ttl: float) -> List[int]:
+        # Pipeline sin MULTI: una ida y vuelta para todas las claves
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.pexpire(key, int(ttl * 1000))
+            results = await pipe.execute()
+        return results[::2]
+
+    async def delete_many(self, keys: List[str]) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        self._listeners.append(asyncio.ensure_future(self._listen(pubsub, callback)))
+
+    async def close(self):
+        for listener in self._listeners:
+            listener.cancel()
+        self._listeners.clear()
+
+    async def _listen(self, pubsub, callback: Callable[[str], None]):
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                callback(message["data"])
+            except Exception:
+                logger.exception("Error processing cache invalidation message")
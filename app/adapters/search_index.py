@@ -0,0 +1,157 @@
+import functools
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, namedtuple
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Índice invertido en memoria para la búsqueda de tareas cuando la base de datos no es PostgreSQL
+# (SQLite en tests y desarrollo). Puntúa con BM25 y exige todos los términos, como websearch_to_tsquery.
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Minúsculas y sin tildes: "Revisión" y "revision" son el mismo término."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return _WORD.findall("".join(char for char in decomposed if not unicodedata.combining(char)))
+
+class InvertedIndex:
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+        self._dirty: Set[int] = set()
+        self.built = False
+        # max(updated_at) de las filas indexadas: la siguiente sincronización relee desde ahí
+        self.synced_at: Optional[datetime] = None
+        # Versión del listado (task_list_version) con la que se sincronizó y la última que anotó un handler
+        self.version: Optional[str] = None
+        self.observed: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def observe(self, version: str):
+        """Anota la versión actual del listado: mientras no cambie ni haya filas sucias, no se consulta la tabla."""
+        self.observed = version
+
+    def is_current(self, version: Optional[str]) -> bool:
+        return self.built and version is not None and version == self.version and not self._dirty
+
+    def add(self, task_id: int, title: Optional[str], description: Optional[str]):
+        tokens = tokenize(title) + tokenize(description)
+        with self._lock:
+            self.remove(task_id)
+            frequencies = Counter(tokens)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[task_id] = frequency
+            self._terms[task_id] = tuple(frequencies)
+            self._lengths[task_id] = len(tokens)
+            self._total_length += len(tokens)
+
+    def remove(self, task_id: int):
+        with self._lock:
+            for term in self._terms.pop(task_id, ()):
+                postings = self._postings[term]
+                del postings[task_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(task_id, 0)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._terms.clear()
+            self._lengths.clear()
+            self._total_length = 0
+            self.built = False
+            self.synced_at = None
+            self.version = None
+            self.observed = None
+
+    def mark_dirty(self, task_ids: Iterable[int]):
+        """Tareas escritas por este proceso: se releen en la próxima búsqueda aunque la versión no cambie."""
+        with self._lock:
+            self._dirty.update(task_ids)
+
+    def take_dirty(self) -> Set[int]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    def apply(self, rows: Iterable[Tuple], checked_ids: Iterable[int] = ()):
+        """
+        Reindexa filas (id, title, description[, updated_at]) y quita los ids comprobados que ya no existen.
+        Con updated_at avanza `synced_at`.
+        """
+        with self._lock:
+            present = set()
+            for row in rows:
+                present.add(row[0])
+                self.add(row[0], row[1], row[2])
+                if len(row) > 3 and row[3] is not None and (self.synced_at is None or row[3] > self.synced_at):
+                    self.synced_at = row[3]
+            for task_id in set(checked_ids) - present:
+                self.remove(task_id)
+            self.built = True
+
+    def retain(self, task_ids: Iterable[int]):
+        """Quita las tareas que ya no están en la tabla (borradas por otro proceso)."""
+        with self._lock:
+            for task_id in set(self._lengths) - set(task_ids):
+                self.remove(task_id)
+
+    def search(self, text: str, after: Optional[Tuple[float, int]] = None, limit: int = 100) -> List[Tuple[float, int]]:
+        """
+        Hasta `limit` pares (puntuación, id) en orden descendente, estrictamente por debajo de `after`:
+        el mismo contrato de keyset que ORDER BY rank DESC, id DESC.
+        """
+        terms = list(dict.fromkeys(tokenize(text)))
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not terms or not all(postings):
+                return []
+            # Se intersecta empezando por el término más raro
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            documents = len(self._lengths)
+            average_length = self._total_length / documents if documents else 0.0
+            weights = [math.log(1 + (documents - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+            scored = []
+            for task_id in candidates:
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[task_id] / (average_length or 1.0))
+                score = 0.0
+                for weight, term_postings in zip(weights, postings):
+                    frequency = term_postings[task_id]
+                    score += weight * frequency * (self.K1 + 1) / (frequency + norm)
+                score = round(score, 6)
+                if after is None or (score, task_id) < after:
+                    scored.append((score, task_id))
+        return heapq.nlargest(limit, scored)
+
+@functools.lru_cache(maxsize=None)
+def _ranked_row_type(fields: Tuple[str, ...]):
+    return namedtuple("RankedTaskRow", fields + ("rank",))
+
+def ranked_rows(ranked: List[Tuple[float, int]], rows: Iterable) -> List[Tuple]:
+    """Filas en el orden de `ranked` con la puntuación como última columna `rank`, igual que en PostgreSQL."""
+    by_id = {row.id: row for row in rows}
+    result = []
+    for score, task_id in ranked:
+        row = by_id.get(task_id)
+        if row is not None:
+            result.append(_ranked_row_type(tuple(row._fields))(*row, score))
+    return result
+
+# Un índice por proceso, sincronizado con la tabla cuando cambia la versión del listado
+task_search_index = InvertedIndex()
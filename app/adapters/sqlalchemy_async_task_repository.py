@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.adapters.search_index import ranked_rows, task_search_index
+from app.adapters.task_queries import (
+    bounded_ids, bulk_delete_statements, bulk_insert_statements, bulk_update_statement,
+    comment_page_statement, comments_for_tasks_statement, returned_tasks, search_candidates_statement,
+    search_index_statement, selected_ids_statement, supports_full_text_search, supports_returning,
+    task_count_statement, task_delete_statement, task_export_statement, task_ids_statement,
+    task_page_statement, task_row_statement, task_search_statement, task_stats_statement,
+    task_update_statement, task_version_condition, task_version_statement, tasks_by_ids_statement,
+    touch_task_statement,
+)
+from app.domain.interfaces import AsyncTaskRepository
+from app.domain.models import Task, Comment
+from app.domain.queries import TaskBulkSelectionDTO, TaskListQueryDTO, TaskSearchQueryDTO
+
+class SQLAlchemyAsyncTaskRepository(AsyncTaskRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_tasks(self) -> List[Task]:
+        result = await self.db.execute(select(Task))
+        return result.scalars().all()
+
+    async def list_tasks(self, query: TaskListQueryDTO, after: Optional[Tuple[Any, int]], limit: int) -> List[Tuple]:
+        result = await self.db.execute(task_page_statement(query, after, limit))
+        return result.all()
+
+    async def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int) -> AsyncIterator[List[Tuple]]:
+        result = await self.db.stream(task_export_statement(query, chunk_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_task_stats(self) -> List[Tuple]:
+        result = await self.db.execute(task_stats_statement())
+        return result.all()
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        result = await self.db.execute(select(Task).where(Task.id == task_id))
+        return result.scalars().first()
+
+    async def get_task_row(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        result = await self.db.execute(task_row_statement(task_id, fields))
+        return result.first()
+
+    async def get_task_version(self, task_id: int) -> Optional[datetime]:
+        result = await self.db.execute(task_version_statement(task_id))
+        return result.scalar()
+
+    async def create_task(self, task: Task) -> Task:
+        self.db.add(task)
+        await self.db.commit()
+        await self.db.refresh(task)
+        return task
+
+    async def update_task(self, task_id: int, updates: dict, expected_version: Optional[datetime] = None) -> Optional[Task]:
+        if not updates:
+            return await self.get_task_by_id(task_id)
+        statement = task_update_statement(task_version_condition(self.db, task_id, expected_version), updates)
+        if supports_returning(self.db):
+            # Una sola ida y vuelta: updated_at (onupdate) vuelve en el RETURNING
+            result = await self.db.execute(statement.returning(*Task.__table__.columns))
+            row = result.first()
+            await self.db.commit()
+            return Task(**row._mapping) if row else None
+        result = await self.db.execute(statement)
+        await self.db.commit()
+        return await self.get_task_by_id(task_id) if result.rowcount else None
+
+    async def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        condition = task_version_condition(self.db, task_id, expected_version)
+        if supports_returning(self.db):
+            result = await self.db.execute(task_delete_statement(condition).returning(Task.id))
+            deleted = result.scalar()
+            await self.db.commit()
+            return deleted is not None
+        # Primero la tarea, con la condición de versión; sus comentarios sólo si se ha borrado
+        result = await self.db.execute(task_delete_statement(condition))
+        deleted = result.rowcount > 0
+        if deleted:
+            delete_comments, _ = bulk_delete_statements([task_id])
+            await self.db.execute(delete_comments)
+        await self.db.commit()
+        return deleted
+
+    async def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        if supports_returning(self.db):
+            rows = []
+            for statement in bulk_insert_statements(tasks):
+                result = await self.db.execute(statement)
+                rows.extend(result.all())
+            await self.db.commit()
+            return returned_tasks(rows)
+        # Sin RETURNING: un INSERT por fila, pero un solo commit y una sola lectura final
+        self.db.add_all(tasks)
+        await self.db.flush()
+        ids = [task.id for task in tasks]
+        await self.db.commit()
+        result = await self.db.execute(tasks_by_ids_statement(ids))
+        return result.scalars().all()
+
+    async def _selected_ids(self, selection: TaskBulkSelectionDTO):
+        """Subconsulta de una lista de ids; con filtro, sus ids ya leídos y acotados a MAX_BULK_ITEMS."""
+        ids = selected_ids_statement(selection)
+        if selection.ids is not None:
+            return ids
+        result = await self.db.execute(ids)
+        return bounded_ids(result.scalars().all())
+
+    async def update_tasks(self, selection: TaskBulkSelectionDTO, updates: dict) -> List[int]:
+        ids = await self._selected_ids(selection)
+        if supports_returning(self.db):
+            result = await self.db.execute(bulk_update_statement(ids, updates).returning(Task.id))
+            updated = result.scalars().all()
+        else:
+            updated = ids if isinstance(ids, list) else (await self.db.execute(ids)).scalars().all()
+            if updated:
+                await self.db.execute(bulk_update_statement(updated, updates))
+        await self.db.commit()
+        return updated
+
+    async def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        ids = await self._selected_ids(selection)
+        if supports_returning(self.db):
+            # Los comentarios los borra el ON DELETE CASCADE
+            _, delete_tasks = bulk_delete_statements(ids)
+            result = await self.db.execute(delete_tasks.returning(Task.id))
+            deleted = result.scalars().all()
+        else:
+            deleted = ids if isinstance(ids, list) else (await self.db.execute(ids)).scalars().all()
+            for statement in bulk_delete_statements(deleted):
+                await self.db.execute(statement)
+        await self.db.commit()
+        return deleted
+
+    async def add_comment_to_task(self, task_id: int, comment: Comment) -> Comment:
+        result = await self.db.execute(touch_task_statement(task_id))
+        if not result.rowcount:
+            await self.db.rollback()
+            raise ValueError(f"Task with id {task_id} not found.")
+
+        comment.task_id = task_id
+        self.db.add(comment)
+        await self.db.commit()
+        await self.db.refresh(comment)
+        return comment
+
+    async def list_comments(self, task_id: int, after_id: Optional[int], limit: int) -> List[Tuple]:
+        result = await self.db.execute(comment_page_statement(task_id, after_id, limit))
+        return result.all()
+
+    async def get_comments_for_tasks(self, task_ids: List[int]) -> List[Tuple]:
+        result = await self.db.execute(comments_for_tasks_statement(task_ids))
+        return result.all()
+
+    async def search_tasks(self, query: TaskSearchQueryDTO, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple]:
+        if supports_full_text_search(self.db):
+            result = await self.db.execute(task_search_statement(query, after, limit))
+            return result.all()
+
+        await self._sync_search_index()
+        rows = []
+        while len(rows) < limit:
+            ranked = task_search_index.search(query.q, after, limit * 2)
+            if not ranked:
+                break
+            result = await self.db.execute(search_candidates_statement(query, [task_id for _, task_id in ranked]))
+            rows += ranked_rows(ranked, result.all())
+            after = ranked[-1]
+        return rows[:limit]
+
+    async def _sync_search_index(self):
+        index = task_search_index
+        version = index.observed
+        if index.is_current(version):
+            return
+        dirty = index.take_dirty()
+        result = await self.db.execute(search_index_statement(index.synced_at, dirty) if index.built else search_index_statement())
+        index.apply(result.all(), dirty)
+        if version is None or version != index.version:
+            result = await self.db.execute(task_count_statement())
+            if result.scalar() != len(index):
+                result = await self.db.execute(task_ids_statement())
+                index.retain(result.scalars().all())
+        index.version = version
@@ -1,8 +1,20 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from app.adapters.search_index import ranked_rows, task_search_index
+from app.adapters.task_queries import (
+    bounded_ids, bulk_delete_statements, bulk_insert_statements, bulk_update_statement,
+    comment_page_statement, comments_for_tasks_statement, returned_tasks, search_candidates_statement,
+    search_index_statement, selected_ids_statement, supports_full_text_search, supports_returning,
+    task_count_statement, task_delete_statement, task_export_statement, task_ids_statement,
+    task_page_statement, task_row_statement, task_search_statement, task_stats_statement,
+    task_update_statement, task_version_condition, task_version_statement, tasks_by_ids_statement,
+    touch_task_statement,
+)
 from app.domain.interfaces import TaskRepository
 from app.domain.models import Task, Comment
 from app.infrastructure.database import SessionLocal
+from app.domain.queries import TaskBulkSelectionDTO, TaskListQueryDTO, TaskSearchQueryDTO
 
 class SQLAlchemyTaskRepository(TaskRepository):
     def __init__(self, db: Session):
@@ -11,41 +23,152 @@ class SQLAlchemyTaskRepository(TaskRepository):
     def get_all_tasks(self) -> List[Task]:
         return self.db.query(Task).all()
 
+    def list_tasks(self, query: TaskListQueryDTO, after: Optional[Tuple[Any, int]], limit: int) -> List[Tuple]:
+        return self.db.execute(task_page_statement(query, after, limit)).all()
+
+    def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int) -> Iterator[List[Tuple]]:
+        result = self.db.execute(task_export_statement(query, chunk_size))
+        yield from result.partitions()
+
+    def get_task_stats(self) -> List[Tuple]:
+        return self.db.execute(task_stats_statement()).all()
+
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         return self.db.query(Task).filter(Task.id == task_id).first()
 
+    def get_task_row(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        return self.db.execute(task_row_statement(task_id, fields)).first()
+
+    def get_task_version(self, task_id: int) -> Optional[datetime]:
+        return self.db.execute(task_version_statement(task_id)).scalar()
+
     def create_task(self, task: Task) -> Task:
         self.db.add(task)
         self.db.commit()
         self.db.refresh(task)
         return task
 
-    def update_task(self, task_id: int, updates: dict) -> Optional[Task]:
-        task = self.get_task_by_id(task_id)
-        if task:
-            for key, value in updates.items():
-                if key == "priority" and isinstance(value, str):
-                    value = PriorityEnum[value]
-                setattr(task, key, value)
+    def update_task(self, task_id: int, updates: dict, expected_version: Optional[datetime] = None) -> Optional[Task]:
+        if not updates:
+            return self.get_task_by_id(task_id)
+        statement = task_update_statement(task_version_condition(self.db, task_id, expected_version), updates)
+        if supports_returning(self.db):
+            # Una sola ida y vuelta: updated_at (onupdate) vuelve en el RETURNING
+            row = self.db.execute(statement.returning(*Task.__table__.columns)).first()
             self.db.commit()
-            self.db.refresh(task)
-        return task
+            return Task(**row._mapping) if row else None
+        result = self.db.execute(statement)
+        self.db.commit()
+        return self.get_task_by_id(task_id) if result.rowcount else None
 
-    def delete_task(self, task_id: int) -> bool:
-        task = self.get_task_by_id(task_id)
-        if task:
-            self.db.delete(task)
+    def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        condition = task_version_condition(self.db, task_id, expected_version)
+        if supports_returning(self.db):
+            deleted = self.db.execute(task_delete_statement(condition).returning(Task.id)).scalar()
             self.db.commit()
-            return True
-        return False
+            return deleted is not None
+        # Primero la tarea, con la condición de versión; sus comentarios sólo si se ha borrado
+        deleted = self.db.execute(task_delete_statement(condition)).rowcount > 0
+        if deleted:
+            delete_comments, _ = bulk_delete_statements([task_id])
+            self.db.execute(delete_comments)
+        self.db.commit()
+        return deleted
+
+    def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        if supports_returning(self.db):
+            rows = []
+            for statement in bulk_insert_statements(tasks):
+                rows.extend(self.db.execute(statement).all())
+            self.db.commit()
+            return returned_tasks(rows)
+        # Sin RETURNING: un INSERT por fila, pero un solo commit y una sola lectura final
+        self.db.add_all(tasks)
+        self.db.flush()
+        ids = [task.id for task in tasks]
+        self.db.commit()
+        return self.db.execute(tasks_by_ids_statement(ids)).scalars().all()
+
+    def _selected_ids(self, selection: TaskBulkSelectionDTO):
+        """Subconsulta de una lista de ids; con filtro, sus ids ya leídos y acotados a MAX_BULK_ITEMS."""
+        ids = selected_ids_statement(selection)
+        if selection.ids is not None:
+            return ids
+        return bounded_ids(self.db.execute(ids).scalars().all())
+
+    def update_tasks(self, selection: TaskBulkSelectionDTO, updates: dict) -> List[int]:
+        ids = self._selected_ids(selection)
+        if supports_returning(self.db):
+            updated = self.db.execute(bulk_update_statement(ids, updates).returning(Task.id)).scalars().all()
+        else:
+            updated = ids if isinstance(ids, list) else self.db.execute(ids).scalars().all()
+            if updated:
+                self.db.execute(bulk_update_statement(updated, updates))
+        self.db.commit()
+        return updated
+
+    def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        ids = self._selected_ids(selection)
+        if supports_returning(self.db):
+            # Los comentarios los borra el ON DELETE CASCADE
+            _, delete_tasks = bulk_delete_statements(ids)
+            deleted = self.db.execute(delete_tasks.returning(Task.id)).scalars().all()
+        else:
+            deleted = ids if isinstance(ids, list) else self.db.execute(ids).scalars().all()
+            for statement in bulk_delete_statements(deleted):
+                self.db.execute(statement)
+        self.db.commit()
+        return deleted
 
     def add_comment_to_task(self, task_id: int, comment: Comment) -> Comment:
-        task = self.get_task_by_id(task_id)
-        if not task:
+        # El UPDATE que sube updated_at también comprueba que la tarea existe
+        if not self.db.execute(touch_task_statement(task_id)).rowcount:
+            self.db.rollback()
             raise ValueError(f"Task with id {task_id} not found.")
 
         comment.task_id = task_id
         self.db.add(comment)
         self.db.commit()
         self.db.refresh(comment)
-        return comment
\ No newline at end of file
+        return comment
+
+    def list_comments(self, task_id: int, after_id: Optional[int], limit: int) -> List[Tuple]:
+        return self.db.execute(comment_page_statement(task_id, after_id, limit)).all()
+
+    def get_comments_for_tasks(self, task_ids: List[int]) -> List[Tuple]:
+        return self.db.execute(comments_for_tasks_statement(task_ids)).all()
+
+    def search_tasks(self, query: TaskSearchQueryDTO, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple]:
+        if supports_full_text_search(self.db):
+            return self.db.execute(task_search_statement(query, after, limit)).all()
+
+        # Sin PostgreSQL: el índice invertido del proceso ordena y la base de datos aplica los filtros,
+        # por lotes hasta completar la página
+        self._sync_search_index()
+        rows = []
+        while len(rows) < limit:
+            ranked = task_search_index.search(query.q, after, limit * 2)
+            if not ranked:
+                break
+            candidates = self.db.execute(search_candidates_statement(query, [task_id for _, task_id in ranked])).all()
+            rows += ranked_rows(ranked, candidates)
+            after = ranked[-1]
+        return rows[:limit]
+
+    def _sync_search_index(self):
+        """
+        Pone al día el índice sólo si cambió la versión del listado o este proceso escribió tareas: relee lo
+        modificado desde la última sincronización más lo escrito aquí (sus borrados incluidos) y, si la versión
+        cambió y el número de filas no cuadra (borrados de otro proceso), quita los ids que ya no existen.
+        """
+        index = task_search_index
+        version = index.observed
+        if index.is_current(version):
+            return
+        dirty = index.take_dirty()
+        statement = search_index_statement(index.synced_at, dirty) if index.built else search_index_statement()
+        index.apply(self.db.execute(statement).all(), dirty)
+        if version is None or version != index.version:
+            if self.db.execute(task_count_statement()).scalar() != len(index):
+                index.retain(self.db.execute(task_ids_statement()).scalars().all())
+        index.version = version
@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, literal_column, or_, select, tuple_, update
+from sqlalchemy.sql import Select
+
+from app.domain.models import SEARCH_CONFIG, Comment, Task
+from app.domain.queries import (
+    COMMENT_RESPONSE_FIELDS, MAX_BULK_ITEMS, TASK_RESPONSE_FIELDS, TaskBulkSelectionDTO, TaskFilterDTO,
+    TaskListQueryDTO, TaskSearchQueryDTO,
+)
+
+# Consultas compartidas por el repositorio síncrono y el asíncrono
+
+def task_columns(fields: Tuple[str, ...], *required: str) -> tuple:
+    """
+    Columnas de una proyección (?fields=) seguidas de las que la consulta necesita aunque no se pidan
+    (las del cursor, updated_at para el ETag): van al final y el serializador no las emite.
+    """
+    extra = [field for field in dict.fromkeys(required) if field not in fields]
+    return tuple(Task.__table__.c[field] for field in (*fields, *extra))
+
+# Listados y exportaciones leen filas (tuplas) en lugar de entidades: sin identity map ni from_orm
+TASK_ROW_COLUMNS = task_columns(TASK_RESPONSE_FIELDS)
+COMMENT_ROW_COLUMNS = tuple(Comment.__table__.c[field] for field in COMMENT_RESPONSE_FIELDS)
+
+def apply_task_filters(statement, query: TaskFilterDTO):
+    if query.completed is not None:
+        statement = statement.where(Task.completed == query.completed)
+    if query.priority is not None:
+        statement = statement.where(Task.priority == query.priority)
+    if query.category is not None:
+        statement = statement.where(Task.category == query.category)
+    if query.due_after is not None:
+        statement = statement.where(Task.due_date >= query.due_after)
+    if query.due_before is not None:
+        statement = statement.where(Task.due_date < query.due_before)
+    return statement
+
+def _order_by(query: TaskListQueryDTO):
+    column = getattr(Task, query.sort_field)
+    if query.sort_field == "id":
+        return (Task.id.desc(),) if query.descending else (Task.id.asc(),)
+    if query.descending:
+        return (column.desc(), Task.id.desc())
+    return (column.asc(), Task.id.asc())
+
+def task_page_statement(query: TaskListQueryDTO, after: Optional[Tuple[Any, int]], limit: int) -> Select:
+    """
+    Página ordenada por (columna de orden, id) usando keyset pagination: en lugar de OFFSET
+    se filtra a partir de la última fila vista, así cada página cuesta O(limit) sobre los índices compuestos.
+    """
+    column = getattr(Task, query.sort_field)
+    columns = task_columns(query.response_fields, query.sort_field, "id")
+    statement = apply_task_filters(select(*columns), query)
+
+    if after is not None:
+        value, last_id = after
+        if query.sort_field == "id":
+            keyset = Task.id < last_id if query.descending else Task.id > last_id
+        elif query.descending:
+            keyset = tuple_(column, Task.id) < tuple_(value, last_id)
+        else:
+            keyset = tuple_(column, Task.id) > tuple_(value, last_id)
+        statement = statement.where(keyset)
+
+    return statement.order_by(*_order_by(query)).limit(limit)
+
+def task_export_statement(query: TaskListQueryDTO, chunk_size: int) -> Select:
+    """Todas las filas filtradas, leídas con un cursor de servidor de chunk_size filas cada vez."""
+    statement = apply_task_filters(select(*task_columns(query.response_fields)), query).order_by(*_order_by(query))
+    return statement.execution_options(stream_results=True, yield_per=chunk_size)
+
+# Columna tsvector mantenida por un trigger que sólo existe en PostgreSQL (ver SEARCH_VECTOR_DDL)
+SEARCH_VECTOR = literal_column("tasks.search_vector")
+
+def supports_full_text_search(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def task_search_statement(query: TaskSearchQueryDTO, after: Optional[Tuple[float, int]], limit: int) -> Select:
+    """
+    Coincidencias de websearch_to_tsquery sobre el índice GIN, ordenadas por ts_rank y id.
+    La última columna de cada fila es `rank`, que el cursor necesita y el serializador no emite.
+    """
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), query.q)
+    rank = func.ts_rank(SEARCH_VECTOR, ts_query)
+    statement = apply_task_filters(
+        select(*task_columns(query.response_fields, "id"), rank.label("rank")).where(SEARCH_VECTOR.op("@@")(ts_query)),
+        query,
+    )
+    if after is not None:
+        statement = statement.where(tuple_(rank, Task.id) < tuple_(*after))
+    return statement.order_by(rank.desc(), Task.id.desc()).limit(limit)
+
+def search_candidates_statement(query: TaskSearchQueryDTO, ids: List[int]) -> Select:
+    """Filas de los candidatos del índice en memoria que además cumplen los filtros."""
+    return apply_task_filters(select(*task_columns(query.response_fields, "id")).where(Task.id.in_(ids)), query)
+
+def search_index_statement(since: Optional[datetime] = None, ids=()) -> Select:
+    """Filas a (re)indexar: todas, o las modificadas desde `since` más las escritas por este proceso."""
+    statement = select(Task.id, Task.title, Task.description, Task.updated_at)
+    if since is None:
+        return statement
+    return statement.where(or_(Task.updated_at >= since, Task.id.in_(list(ids))))
+
+def task_count_statement() -> Select:
+    """Número de filas: delata borrados hechos por otro proceso que el índice en memoria no vio."""
+    return select(func.count()).select_from(Task)
+
+def task_ids_statement() -> Select:
+    """Sólo los ids, para quitar del índice en memoria las tareas borradas sin releer el texto."""
+    return select(Task.id)
+
+def task_stats_statement() -> Select:
+    """Una sola consulta agrupada: una fila por combinación (completed, priority, category)."""
+    overdue = case((and_(Task.completed.is_(False), Task.due_date < func.now()), 1), else_=0)
+    return (
+        select(
+            Task.completed,
+            Task.priority,
+            Task.category,
+            func.count().label("total"),
+            func.sum(overdue).label("overdue"),
+        )
+        .group_by(Task.completed, Task.priority, Task.category)
+    )
+
+def task_row_statement(task_id: int, fields: Tuple[str, ...]) -> Select:
+    """Una tarea proyectada en `fields` (más updated_at para los validadores HTTP)."""
+    return select(*task_columns(fields, "updated_at")).where(Task.id == task_id)
+
+def task_version_statement(task_id: int) -> Select:
+    """Sólo updated_at: basta para calcular el ETag sin hidratar la fila."""
+    return select(Task.updated_at).where(Task.id == task_id)
+
+def supports_returning(db) -> bool:
+    """INSERT/UPDATE/DELETE ... RETURNING (PostgreSQL; no disponible para SQLite en SQLAlchemy 1.4)."""
+    return db.get_bind().dialect.full_returning
+
+# Todas las filas de un INSERT multi-fila deben tener las mismas columnas
+TASK_INSERT_COLUMNS = ("title", "description", "completed", "due_date", "priority", "category")
+# Filas por sentencia: mantiene los parámetros por debajo del límite de asyncpg (32767)
+BULK_INSERT_CHUNK = 1000
+
+def bulk_insert_statements(tasks: List[Task]):
+    """INSERT multi-fila ... RETURNING, troceado en bloques de BULK_INSERT_CHUNK filas."""
+    rows = [{column: getattr(task, column) for column in TASK_INSERT_COLUMNS} for task in tasks]
+    for start in range(0, len(rows), BULK_INSERT_CHUNK):
+        yield insert(Task).values(rows[start:start + BULK_INSERT_CHUNK]).returning(*Task.__table__.columns)
+
+def returned_tasks(rows) -> List[Task]:
+    """
+    Tareas del RETURNING en el orden en que se pasaron al INSERT. PostgreSQL no garantiza el orden
+    de RETURNING, pero el serial se asigna recorriendo VALUES en orden: ordenar por id lo recupera.
+    """
+    return [Task(**row._mapping) for row in sorted(rows, key=lambda row: row.id)]
+
+def tasks_by_ids_statement(ids: List[int]) -> Select:
+    return select(Task).where(Task.id.in_(ids)).order_by(Task.id)
+
+def selected_ids_statement(selection: TaskBulkSelectionDTO) -> Select:
+    statement = select(Task.id)
+    if selection.ids is not None:
+        return statement.where(Task.id.in_(selection.ids))
+    # Un filtro puede abarcar toda la tabla: se lee como mucho una fila más que el tope para detectarlo
+    return apply_task_filters(statement, selection.filter).limit(MAX_BULK_ITEMS + 1)
+
+def bounded_ids(ids: List[int]) -> List[int]:
+    """Ids de una selección por filtro, con el mismo tope que una lista de ids. Lanza ValueError si lo supera."""
+    if len(ids) > MAX_BULK_ITEMS:
+        raise ValueError(f"Filter matches more than {MAX_BULK_ITEMS} tasks")
+    return ids
+
+def bulk_update_statement(ids, updates: dict):
+    # updated_at lo recalcula el onupdate de la columna
+    return update(Task).where(Task.id.in_(ids)).values(**updates).execution_options(synchronize_session=False)
+
+def task_version_condition(db, task_id: int, expected_version: Optional[datetime]):
+    """
+    WHERE de una escritura sobre una tarea. Con If-Match exige además la versión (updated_at) leída:
+    si otra escritura se cuela entre la comprobación y la escritura, no se toca ninguna fila.
+    """
+    condition = Task.id == task_id
+    if expected_version is None:
+        return condition
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite guarda CURRENT_TIMESTAMP como texto sin microsegundos y un datetime enlazado los lleva
+        return and_(condition, func.datetime(Task.updated_at) == func.datetime(expected_version))
+    return and_(condition, Task.updated_at == expected_version)
+
+def task_update_statement(condition, updates: dict):
+    """UPDATE de una sola tarea (condition: task_version_condition); con RETURNING sustituye a SELECT + flush + refresh."""
+    return update(Task).where(condition).values(**updates).execution_options(synchronize_session=False)
+
+def task_delete_statement(condition):
+    """DELETE de una sola tarea; con RETURNING id, los comentarios los borra el ON DELETE CASCADE de comments.task_id."""
+    return delete(Task).where(condition).execution_options(synchronize_session=False)
+
+def comment_page_statement(task_id: int, after_id: Optional[int], limit: int) -> Select:
+    """Comentarios de una tarea por id ascendente (keyset sobre ix_comments_task_id_id)."""
+    statement = select(*COMMENT_ROW_COLUMNS).where(Comment.task_id == task_id)
+    if after_id is not None:
+        statement = statement.where(Comment.id > after_id)
+    return statement.order_by(Comment.id).limit(limit)
+
+def comments_for_tasks_statement(task_ids: List[int]) -> Select:
+    """Comentarios de toda una página de tareas en una sola consulta IN, como selectinload pero sobre filas."""
+    return select(*COMMENT_ROW_COLUMNS).where(Comment.task_id.in_(task_ids)).order_by(Comment.task_id, Comment.id)
+
+def touch_task_statement(task_id: int):
+    """Un comentario nuevo cambia la versión de su tarea: ETag del detalle y de los listados con comentarios."""
+    return update(Task).where(Task.id == task_id).values(updated_at=func.now()).execution_options(synchronize_session=False)
+
+def bulk_delete_statements(ids):
+    """Sin RETURNING (SQLite no aplica el ON DELETE CASCADE salvo con PRAGMA foreign_keys):
+    borra primero los comentarios de las tareas seleccionadas y después las tareas."""
+    return (
+        delete(Comment).where(Comment.task_id.in_(ids)).execution_options(synchronize_session=False),
+        delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False),
+    )
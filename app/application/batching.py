@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from app.infrastructure import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_SIZES = metrics.histogram(
+    "task_create_batch_size", "Altas agrupadas en cada INSERT multi-fila.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+BATCH_WAIT_SECONDS = metrics.histogram(
+    "task_create_batch_wait_seconds", "Latencia añadida: espera de cada alta hasta que su lote se escribe.",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+BATCH_FALLBACKS = metrics.counter(
+    "task_create_batch_fallbacks_total", "Lotes fallidos que se reintentaron fila a fila."
+)
+
+class GroupCommitBatcher(Generic[T, R]):
+    """
+    Write-behind de altas concurrentes: cada submit() espera en una cola del IOLoop y, al llenarse
+    el lote (max_size) o vencer la ventana (window segundos desde el primero), todas se escriben con
+    una sola llamada a `flush` (un INSERT multi-fila ... RETURNING y un commit). Cada llamante
+    recibe su propia fila: `flush` debe devolver un resultado por dato y en el mismo orden (el
+    repositorio ordena lo devuelto por RETURNING por id). Si no devuelve tantos como datos, el lote
+    ya está escrito y no se puede repartir: todos los llamantes reciben el error.
+
+    Si el lote falla se reintenta cada alta por separado, para que una fila inválida no arrastre
+    al resto; cada llamante recibe entonces su resultado o su propia excepción.
+    """
+
+    def __init__(self, flush: Callable[[List[T]], Awaitable[List[R]]], max_size: int, window: float):
+        self.flush = flush
+        self.max_size = max(max_size, 1)
+        self.window = window
+        self._pending: List[Tuple[T, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        # shield: si el cliente se va, su fila se escribe igualmente con el resto del lote
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._write(batch))
+
+    async def _write(self, batch: List[Tuple[T, asyncio.Future, float]]):
+        started = time.perf_counter()
+        BATCH_SIZES.observe(len(batch))
+        for _, _, submitted in batch:
+            BATCH_WAIT_SECONDS.observe(started - submitted)
+        try:
+            results = await self.flush([item for item, _, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=e)
+                return
+            BATCH_FALLBACKS.inc()
+            await asyncio.gather(*(self._write_one(item, future) for item, future, _ in batch))
+            return
+        if len(results) != len(batch):
+            # Reintentar duplicaría filas ya confirmadas
+            error = RuntimeError(f"Batch flush returned {len(results)} results for {len(batch)} items")
+            for _, future, _ in batch:
+                _resolve(future, error=error)
+            return
+        for (_, future, _), result in zip(batch, results):
+            _resolve(future, result)
+
+    async def _write_one(self, item: T, future: asyncio.Future):
+        try:
+            (result,) = await self.flush([item])
+        except Exception as e:
+            _resolve(future, error=e)
+        else:
+            _resolve(future, result)
+
+def _resolve(future: asyncio.Future, result=None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
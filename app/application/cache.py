@@ -0,0 +1,243 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Iterable, Optional, Tuple
+
+from app.application.singleflight import SingleFlight
+from app.domain.interfaces import CacheBackend
+from app.infrastructure import metrics
+
+INVALIDATION_CHANNEL = "task-cache-invalidation"
+
+CACHE_HITS = metrics.counter("task_cache_hits_total", "Lecturas servidas desde la caché.", ["cache"])
+CACHE_MISSES = metrics.counter("task_cache_misses_total", "Lecturas que no estaban en la caché.", ["cache"])
+CACHE_EVICTIONS = metrics.counter("task_cache_evictions_total", "Entradas expulsadas de la caché.", ["cache", "reason"])
+CACHE_COALESCED = metrics.counter("task_cache_coalesced_total", "Recargas ahorradas por single-flight.", ["cache"])
+
+class PayloadCache:
+    """
+    LRU en memoria de payloads JSON ya serializados (o de cualquier objeto que informe su
+    tamaño con len(), como PrecompressedBody), acotada en número de entradas, en bytes y por TTL.
+
+    Para que una lectura lenta no guarde un payload obsoleto después de una escritura,
+    el lector toma un token con read_token() antes de consultar la base de datos y lo
+    pasa a set(): si la clave se invalidó entretanto, el payload se descarta.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.size_bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Último contador de escrituras en el que se invalidó cada clave (acotado)
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._forgotten_up_to = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                self._remove(key)
+                CACHE_EVICTIONS.inc(cache=self.name, reason="ttl")
+                entry = None
+            if entry is None:
+                CACHE_MISSES.inc(cache=self.name)
+                return None
+            self._entries.move_to_end(key)
+        CACHE_HITS.inc(cache=self.name)
+        return entry[0]
+
+    def read_token(self) -> int:
+        return self._writes
+
+    def set(self, key: Hashable, payload: str, token: int, ttl: Optional[float] = None):
+        if not self.enabled or len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if token < self._forgotten_up_to or self._invalidated.get(key, 0) > token:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, self.clock() + (self.ttl if ttl is None else ttl))
+            self.size_bytes += len(payload)
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                CACHE_EVICTIONS.inc(cache=self.name, reason="size")
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._writes += 1
+            self._remove(key)
+            self._invalidated[key] = self._writes
+            self._invalidated.move_to_end(key)
+            # Sólo hace falta recordar invalidaciones recientes; las olvidadas invalidan cualquier token anterior
+            while len(self._invalidated) > max(self.max_entries, 1):
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten_up_to = forgotten
+
+    def clear(self):
+        with self._lock:
+            self._writes += 1
+            self._forgotten_up_to = self._writes
+            self._invalidated.clear()
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
+
+class VersionToken:
+    """
+    Versión opaca de un conjunto (el listado de tareas) guardada en un CacheBackend: leerla cuesta
+    un get, no una consulta sobre todo el conjunto. Cada bump() la sustituye por un valor aleatorio,
+    así nunca se repite aunque la clave caduque, la expulse la LRU o el proceso se reinicie.
+    """
+
+    def __init__(self, backend: CacheBackend, key: str, ttl: float):
+        self.backend = backend
+        self.key = key
+        self.ttl = ttl
+
+    async def get(self) -> str:
+        token = await self.backend.get(self.key)
+        if token is None:
+            candidate = uuid.uuid4().hex
+            await self.backend.add(self.key, candidate, self.ttl)
+            # Con la caché desactivada no se guarda nada: cada lectura es una versión nueva
+            token = await self.backend.get(self.key) or candidate
+        return token
+
+    async def bump(self):
+        await self.backend.set(self.key, uuid.uuid4().hex, self.ttl)
+
+class TaskCache:
+    """
+    Caché read-through de payloads sobre un CacheBackend, compartible entre procesos.
+
+    * Claves versionadas: cada escritura incrementa la versión de la clave, de modo que
+      un payload guardado por una lectura que compitió con la escritura queda huérfano
+      bajo la versión anterior y nadie vuelve a leerlo.
+    * Single-flight: dentro del proceso, las lecturas concurrentes de una clave ausente
+      comparten una sola carga; entre procesos, un lock con TTL en el backend hace que
+      el resto espere brevemente al payload en lugar de consultar Postgres.
+    * Caché local opcional (L1), invalidada por los mensajes que publica cada escritura.
+    """
+
+    LOCK_TTL = 5.0
+    LOCK_WAIT = 0.02
+    LOCK_RETRIES = 10
+
+    def __init__(self, backend: CacheBackend, ttl: float, local: Optional[PayloadCache] = None, name: str = "task"):
+        self.backend = backend
+        self.ttl = ttl
+        # La versión vive más que cualquier payload guardado bajo ella
+        self.version_ttl = 2 * ttl + 60
+        self.local = local
+        self.name = name
+        self.single_flight = SingleFlight()
+        self._subscribed = False
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.name}:{key}:version"
+
+    def _payload_key(self, key: str, version) -> str:
+        return f"{self.name}:{key}:v{version}"
+
+    async def start(self):
+        """Se suscribe a las invalidaciones de otros procesos (sólo necesario con caché local)."""
+        if self.local is not None and not self._subscribed:
+            self._subscribed = True
+            await self.backend.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+
+    def _on_invalidation(self, message: str):
+        name, _, keys = message.partition(":")
+        if name == self.name and self.local is not None:
+            for key in keys.split(","):
+                self.local.invalidate(key)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[str]]],
+                          store: bool = True) -> Optional[str]:
+        """
+        Devuelve el payload cacheado o lo obtiene con loader(); None (p. ej. 404) no se cachea.
+        Con store=False (lecturas de una réplica, que puede ir atrasada) se aprovecha lo cacheado,
+        pero lo cargado no se guarda: la caché sólo contiene payloads leídos del primario.
+        """
+        key = str(key)
+        token = None
+        if self.local is not None:
+            payload = self.local.get(key)
+            if payload is not None:
+                return payload
+            token = self.local.read_token()
+
+        # Una lectura del primario no se une a la carga desde una réplica
+        payload, shared = await self.single_flight.do((key, store), lambda: self._load(key, loader, store))
+        if shared:
+            CACHE_COALESCED.inc(cache=self.name)
+        if payload is not None and store and self.local is not None:
+            self.local.set(key, payload, token)
+        return payload
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[str]]], store: bool) -> Optional[str]:
+        version = await self.backend.get(self._version_key(key)) or "0"
+        payload_key = self._payload_key(key, version)
+        payload = await self.backend.get(payload_key)
+        if payload is not None:
+            CACHE_HITS.inc(cache=self.name)
+            return payload
+        CACHE_MISSES.inc(cache=self.name)
+        if not store:
+            return await loader()
+
+        lock_key = payload_key + ":lock"
+        locked = await self.backend.add(lock_key, "1", self.LOCK_TTL)
+        if not locked:
+            # Otro proceso ya está cargando esta clave
+            for _ in range(self.LOCK_RETRIES):
+                await asyncio.sleep(self.LOCK_WAIT)
+                payload = await self.backend.get(payload_key)
+                if payload is not None:
+                    CACHE_COALESCED.inc(cache=self.name)
+                    return payload
+        try:
+            payload = await loader()
+            if payload is not None:
+                await self.backend.set(payload_key, payload, self.ttl)
+            return payload
+        finally:
+            if locked:
+                await self.backend.delete(lock_key)
+
+    async def invalidate(self, key: Hashable):
+        await self.invalidate_many([key])
+
+    async def invalidate_many(self, keys: Iterable[Hashable]):
+        """Invalida varias claves con un paso por operación (incr, delete, publish), no uno por clave."""
+        keys = [str(key) for key in keys]
+        if not keys:
+            return
+        if self.local is not None:
+            for key in keys:
+                self.local.invalidate(key)
+        versions = await self.backend.incr_many([self._version_key(key) for key in keys], self.version_ttl)
+        await self.backend.delete_many([self._payload_key(key, version - 1) for key, version in zip(keys, versions)])
+        # Un solo mensaje con todas las claves separadas por comas
+        await self.backend.publish(INVALIDATION_CHANNEL, f"{self.name}:{','.join(keys)}")
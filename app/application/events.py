@@ -0,0 +1,193 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+
+from app.domain.interfaces import EventBroker, EventPublisher
+from app.infrastructure import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PUBLISHED = metrics.counter("task_events_published_total", "Eventos de cambio emitidos.", ["type", "origin"])
+EVENT_SUBSCRIBERS = metrics.gauge("task_events_subscribers", "Conexiones abiertas a /tasks/events.")
+EVENT_RESETS = metrics.counter("task_events_resets_total", "Reconexiones que no pudieron reanudarse desde Last-Event-ID.")
+
+class TaskEvent(NamedTuple):
+    # Posición en el feed de este proceso
+    id: int
+    type: str
+    # Mensaje SSE completo, serializado una sola vez y compartido por todas las conexiones
+    message: bytes
+    # Id que ve el cliente (Last-Event-ID)
+    key: str
+
+class ChangeFeed(EventPublisher):
+    """
+    Feed de cambios del proceso: un buffer circular de los últimos eventos, numerados de forma
+    consecutiva, sobre el que cada conexión abierta lleva su propia posición.
+
+    * Las conexiones en espera comparten un único future que se resuelve con cada evento: una
+      conexión ociosa no tiene cola propia ni hace trabajo hasta que algo cambia.
+    * publish() puede llamarse desde los hilos del executor; el aviso a las conexiones se agenda
+      en el IOLoop con call_soon_threadsafe.
+    * Con un EventBroker (LISTEN/NOTIFY), cada evento se envía al broker y llega a todos los
+      workers, también a este, en el mismo orden y con un id común asignado por el broker (una
+      secuencia de PostgreSQL): un Last-Event-ID de cualquier worker se reanuda en cualquier otro
+      si el evento sigue en su buffer.
+    * Sin broker, los ids llevan el identificador del proceso (epoch). Un Last-Event-ID de otro
+      proceso, o ya fuera del buffer, se responde con un evento "reset" para que el cliente recargue.
+    """
+
+    def __init__(self, capacity: int, broker: Optional[EventBroker] = None):
+        self.capacity = capacity
+        self.broker = broker
+        self.last_id = 0
+        self._epoch = None
+        self._epoch_pid = None
+        self._positions: Dict[str, int] = {}
+        self.closed = False
+        self._events: "deque[TaskEvent]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._started = False
+
+    async def start(self):
+        """Fija el IOLoop del proceso y, con broker, empieza a recibir los eventos de otros workers."""
+        self._loop = asyncio.get_running_loop()
+        if self.broker is not None and not self._started:
+            self._started = True
+            await self.broker.subscribe(self._on_remote)
+
+    async def close(self):
+        """Termina las conexiones abiertas (tras reenviarles lo pendiente) y cierra el broker."""
+        self.closed = True
+        self._wake()
+        if self.broker is not None and self._started:
+            await self.broker.close()
+
+    @property
+    def epoch(self) -> str:
+        """Identificador del proceso. Se genera en el propio proceso: un worker no hereda el del padre tras el fork."""
+        pid = os.getpid()
+        if self._epoch_pid != pid:
+            self._epoch, self._epoch_pid = uuid.uuid4().hex[:8], pid
+        return self._epoch
+
+    def event_id(self, position: int) -> str:
+        """Id para el cliente de una posición: el del evento si sigue en el buffer, o uno local."""
+        with self._lock:
+            if self._events and self._events[0].id <= position <= self._events[-1].id:
+                return self._events[position - self._events[0].id].key
+        return f"{self.epoch}-{position}"
+
+    def parse_event_id(self, value: Optional[str]) -> Optional[int]:
+        """Posición correspondiente a un Last-Event-ID, o None si no es de este proceso o no es válido."""
+        value = (value or "").strip()
+        with self._lock:
+            position = self._positions.get(value)
+        if position is not None:
+            return position
+        epoch, _, sequence = value.partition("-")
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self.last_id:
+            return None
+        return int(sequence)
+
+    def publish(self, event_type: str, data: dict) -> None:
+        EVENTS_PUBLISHED.inc(type=event_type, origin="local")
+        loop = self._loop
+        if self._started:
+            # Se añade al buffer cuando vuelve del broker, con el id común a todos los workers
+            if self._in_loop():
+                self._send(event_type, data)
+            else:
+                loop.call_soon_threadsafe(self._send, event_type, data)
+            return
+        self._append(event_type, data)
+        if loop is None:
+            # Nadie ha llegado a esperar eventos: basta con el buffer
+            return
+        if self._in_loop():
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def since(self, position: int) -> Optional[List[TaskEvent]]:
+        """Eventos posteriores a position, o None si alguno ya salió del buffer."""
+        with self._lock:
+            if position >= self.last_id:
+                return []
+            first = self._events[0].id if self._events else self.last_id + 1
+            if position < first - 1:
+                return None
+            return list(itertools.islice(self._events, position - first + 1, None))
+
+    async def wait(self, position: int, timeout: float) -> bool:
+        """Espera a que haya eventos posteriores a position (o al cierre). False si venció el timeout."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if position < self.last_id or self.closed:
+            return True
+        if self._waiter is None or self._waiter.done():
+            self._waiter = self._loop.create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _append(self, event_type: str, data: dict, key: Optional[str] = None) -> TaskEvent:
+        payload = json.dumps(data, default=str)
+        epoch = self.epoch
+        with self._lock:
+            self.last_id += 1
+            key = key or f"{epoch}-{self.last_id}"
+            message = f"id: {key}\nevent: {event_type}\ndata: {payload}\n\n"
+            event = TaskEvent(self.last_id, event_type, message.encode(), key)
+            if len(self._events) == self._events.maxlen:
+                self._positions.pop(self._events[0].key, None)
+            self._events.append(event)
+            self._positions[key] = event.id
+        return event
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _send(self, event_type: str, data: dict):
+        asyncio.ensure_future(self._forward(event_type, data))
+
+    def _wake(self):
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _forward(self, event_type: str, data: dict):
+        message = json.dumps({"origin": self.epoch, "type": event_type, "data": data}, default=str)
+        try:
+            await self.broker.publish(message)
+        except Exception:
+            # Al menos lo ven las conexiones de este worker; las de los demás, en su próxima recarga completa
+            logger.exception("Error forwarding task event to other workers")
+            self._append(event_type, data)
+            self._wake()
+
+    def _on_remote(self, event_id: str, message: str):
+        try:
+            event = json.loads(message)
+        except ValueError:
+            logger.warning("Ignoring malformed task event: %r", message[:200])
+            return
+        if event_id in self._positions:
+            return
+        self._append(event["type"], event["data"], event_id)
+        if event.get("origin") != self.epoch:
+            EVENTS_PUBLISHED.inc(type=event["type"], origin="remote")
+        self._wake()
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from typing import Dict, NamedTuple, Optional
+
+from app.application.singleflight import SingleFlight
+from app.domain.interfaces import CacheBackend
+from app.infrastructure import metrics
+
+IDEMPOTENCY_REQUESTS = metrics.counter(
+    "idempotency_requests_total", "Peticiones con Idempotency-Key según su resultado.", ["outcome"]
+)
+
+# Cabeceras de la respuesta original que se repiten al reenviarla
+REPLAYED_HEADERS = ("Content-Type", "Etag", "Last-Modified", "Location")
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: str
+
+    def dumps(self) -> str:
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def loads(cls, payload: str) -> "StoredResponse":
+        return cls(**json.loads(payload))
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """Huella de la petición: la misma clave con otro cuerpo es un error del cliente, no un reintento."""
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body or b"")
+    return digest.hexdigest()
+
+def storable(status: int) -> bool:
+    # Los 5xx y los 429 no son definitivos: un reintento debe volver a ejecutarse
+    return status < 500 and status != 429
+
+class IdempotencyStore:
+    """
+    Respuestas de escrituras con Idempotency-Key, guardadas durante `ttl` sobre un CacheBackend
+    (en memoria o Redis, compartido entre procesos).
+
+    * Los duplicados que llegan mientras el original sigue en curso en el mismo proceso se agrupan
+      con SingleFlight y reciben su respuesta.
+    * Entre procesos, un lock con TTL marca la clave como en curso; quien no lo obtiene responde 409.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, lock_ttl: float = 30.0, name: str = "idempotency"):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.name = name
+        self.single_flight = SingleFlight()
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        payload = await self.backend.get(self._key(key))
+        return StoredResponse.loads(payload) if payload is not None else None
+
+    async def lock(self, key: str) -> bool:
+        return await self.backend.add(self._key(key) + ":lock", "1", self.lock_ttl)
+
+    async def unlock(self, key: str):
+        await self.backend.delete(self._key(key) + ":lock")
+
+    async def save(self, key: str, response: StoredResponse):
+        if storable(response.status):
+            await self.backend.set(self._key(key), response.dumps(), self.ttl)
@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from app.domain.models import Task
+
+# Los cursores son opacos para el cliente: JSON [sort, valor, id] codificado en base64url
+DATETIME_SORT_FIELDS = {"created_at", "updated_at"}
+INTEGER_SORT_FIELDS = {"id", "priority"}
+# Relevancia de /tasks/search
+NUMERIC_SORT_FIELDS = {"rank"}
+
+def encode_cursor(sort: str, task: Task) -> str:
+    field = sort.lstrip("-")
+    value = getattr(task, field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, task.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _is_integer(value: Any) -> bool:
+    # bool es subclase de int, pero True no es un id ni una prioridad
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def decode_cursor(token: str, sort: str) -> Tuple[Any, int]:
+    """Devuelve (valor, id) de la última fila de la página anterior. Lanza ValueError si el cursor no es válido."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor_sort, value, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if cursor_sort != sort or not _is_integer(task_id):
+            raise ValueError("Invalid cursor")
+        # Un cursor manipulado puede traer cualquier tipo: se comprueba el del campo de orden antes de llegar al SQL
+        field = sort.lstrip("-")
+        if field in DATETIME_SORT_FIELDS:
+            if not isinstance(value, str):
+                raise ValueError("Invalid cursor")
+            value = datetime.fromisoformat(value)
+        elif field in NUMERIC_SORT_FIELDS:
+            if not (_is_integer(value) or isinstance(value, float)):
+                raise ValueError("Invalid cursor")
+        elif field not in INTEGER_SORT_FIELDS or not _is_integer(value):
+            raise ValueError("Invalid cursor")
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, task_id
@@ -0,0 +1,64 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app.infrastructure import metrics
+
+T = TypeVar("T")
+
+READS_COALESCED = metrics.counter(
+    "http_reads_coalesced_total", "Lecturas servidas con el resultado de otra idéntica en curso.", ["route"]
+)
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave: la primera ejecuta la función
+    y las demás esperan su resultado (o su excepción) en lugar de repetir el trabajo.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Devuelve (resultado, compartido); compartido es True si se reutilizó otra llamada."""
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita el aviso "exception was never retrieved" si nadie más esperaba
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+class ReadCoalescer:
+    """
+    SingleFlight para lecturas idénticas (misma ruta y misma consulta normalizada) que comparten
+    una ejecución y su resultado ya serializado. No guarda nada: sólo agrupa las que coinciden en
+    el tiempo. Cada escritura abre una generación nueva para que una lectura posterior no se una
+    a otra empezada antes de la escritura.
+    """
+
+    def __init__(self):
+        self.single_flight = SingleFlight()
+        self.generation = 0
+
+    async def do(self, route: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        result, shared = await self.single_flight.do((self.generation, route, key), fn)
+        if shared:
+            READS_COALESCED.inc(route=route)
+        return result
+
+    def invalidate(self):
+        self.generation += 1
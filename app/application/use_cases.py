@@ -1,37 +1,268 @@
-from typing import List, Optional
-from app.domain.interfaces import TaskRepository
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from app.domain.interfaces import EventPublisher, TaskRepository, AsyncTaskRepository
+from app.application.pagination import decode_cursor, encode_cursor
 from app.domain.models import Task, Comment
-from app.presentation.dtos import TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO 
+from app.domain.queries import TaskBulkSelectionDTO, TaskListQueryDTO, TaskSearchQueryDTO
+from app.presentation.dtos import (
+    TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO, TaskPageDTO, TaskStatsDTO, TaskBulkUpdateDTO,
+    CommentCreateDTO, CommentListQueryDTO, CommentPageDTO, CommentResponseDTO,
+)
 from datetime import datetime
 
+STREAM_CHUNK_SIZE = 500
+# Ids por evento en las operaciones por lotes: cada mensaje cabe de sobra en un NOTIFY
+EVENT_IDS_PER_MESSAGE = 500
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+
+def _task_from_dto(task_data: TaskCreateDTO) -> Task:
+    return Task(
+        title=task_data.title,
+        description=task_data.description,
+        due_date=task_data.due_date,
+        priority=task_data.priority,
+        category=task_data.category,
+        completed=False,
+    )
+
+def _task_page(query: TaskListQueryDTO, rows: List[Tuple]) -> TaskPageDTO:
+    # El repositorio devuelve limit + 1 filas: la fila extra sólo indica que hay otra página
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        next_cursor = encode_cursor(query.sort, rows[-1])
+    # Filas recién leídas de nuestra propia base de datos: no se revalidan con TaskResponseDTO
+    return TaskPageDTO(items=rows, next_cursor=next_cursor)
+
+def _comment_page(query: CommentListQueryDTO, rows: List[Tuple]) -> CommentPageDTO:
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        next_cursor = encode_cursor("id", rows[-1])
+    return CommentPageDTO(items=rows, next_cursor=next_cursor)
+
+def _comments_after(query: CommentListQueryDTO) -> Optional[int]:
+    return decode_cursor(query.cursor, "id")[1] if query.cursor else None
+
+def _comments_by_task(rows) -> Dict[int, List[Tuple]]:
+    comments: Dict[int, List[Tuple]] = {}
+    for row in rows:
+        comments.setdefault(row.task_id, []).append(row)
+    return comments
+
+def _publish_tasks(events: Optional[EventPublisher], event_type: str, tasks: List[TaskResponseDTO]):
+    if events is not None:
+        for task in tasks:
+            events.publish(event_type, {"task": task.dict()})
+
+def _publish_ids(events: Optional[EventPublisher], event_type: str, task_ids: List[int]):
+    if events is not None:
+        for start in range(0, len(task_ids), EVENT_IDS_PER_MESSAGE):
+            events.publish(event_type, {"ids": task_ids[start:start + EVENT_IDS_PER_MESSAGE]})
+
+def _task_stats(rows) -> TaskStatsDTO:
+    stats = TaskStatsDTO()
+    for completed, priority, category, total, overdue in rows:
+        stats.total += total
+        stats.overdue += overdue or 0
+        if completed:
+            stats.completed += total
+        else:
+            stats.pending += total
+        stats.by_priority[priority] = stats.by_priority.get(priority, 0) + total
+        if category is None:
+            stats.uncategorized += total
+        else:
+            stats.by_category[category] = stats.by_category.get(category, 0) + total
+    return stats
+
 class TaskUseCases:
-    def __init__(self, task_repo: TaskRepository):
+    def __init__(self, task_repo: TaskRepository, events: Optional[EventPublisher] = None):
         self.task_repo = task_repo
+        # Cada escritura confirmada emite su delta (alta, modificación o borrado) para GET /tasks/events
+        self.events = events
 
     def get_all_tasks(self) -> List[TaskResponseDTO]:
         tasks = self.task_repo.get_all_tasks()
         return [TaskResponseDTO.from_orm(task) for task in tasks]
 
+    def list_tasks(self, query: TaskListQueryDTO) -> TaskPageDTO:
+        after = decode_cursor(query.cursor, query.sort) if query.cursor else None
+        tasks = self.task_repo.list_tasks(query, after, query.limit + 1)
+        page = _task_page(query, tasks)
+        if query.include_comments:
+            # Una sola consulta para los comentarios de toda la página, en lugar de una por tarea
+            task_ids = [row.id for row in page.items]
+            page.comments = _comments_by_task(self.task_repo.get_comments_for_tasks(task_ids)) if task_ids else {}
+        return page
+
+    def search_tasks(self, query: TaskSearchQueryDTO) -> TaskPageDTO:
+        # Mismo contrato de paginación que list_tasks, con el cursor sobre (rank, id)
+        after = decode_cursor(query.cursor, query.sort) if query.cursor else None
+        return _task_page(query, self.task_repo.search_tasks(query, after, query.limit + 1))
+
+    def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Tuple]]:
+        yield from self.task_repo.stream_tasks(query, chunk_size)
+
+    def get_task_stats(self) -> TaskStatsDTO:
+        return _task_stats(self.task_repo.get_task_stats())
+
     def get_task_by_id(self, task_id: int) -> Optional[TaskResponseDTO]:
         task = self.task_repo.get_task_by_id(task_id)
         return TaskResponseDTO.from_orm(task) if task else None
 
+    def get_task_fields(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        # Proyección ya validada por TaskFieldsDTO: la fila se serializa tal cual
+        return self.task_repo.get_task_row(task_id, fields)
+
+    def get_task_version(self, task_id: int) -> Optional[datetime]:
+        return self.task_repo.get_task_version(task_id)
+
     def create_task(self, task_data: TaskCreateDTO) -> TaskResponseDTO:
-        task = Task(
-            title=task_data.title,
-            description=task_data.description,
-            due_date=task_data.due_date,
-            priority=task_data.priority,
-            category=task_data.category,
-            completed=False,
-        )
-        created_task = self.task_repo.create_task(task)
-        return TaskResponseDTO.from_orm(created_task)
-
-    def update_task(self, task_id: int, task_data: TaskUpdateDTO) -> Optional[TaskResponseDTO]:
+        task = _task_from_dto(task_data)
+        created_task = TaskResponseDTO.from_orm(self.task_repo.create_task(task))
+        _publish_tasks(self.events, TASK_CREATED, [created_task])
+        return created_task
+
+    def update_task(self, task_id: int, task_data: TaskUpdateDTO,
+                    expected_version: Optional[datetime] = None) -> Optional[TaskResponseDTO]:
+        """Con expected_version (If-Match) sólo actualiza si la tarea sigue en esa versión; si no, devuelve None."""
+        updates = task_data.dict(exclude_unset=True)
+        updated_task = self.task_repo.update_task(task_id, updates, expected_version)
+        if not updated_task:
+            return None
+        updated_task = TaskResponseDTO.from_orm(updated_task)
+        _publish_tasks(self.events, TASK_UPDATED, [updated_task])
+        return updated_task
+
+    def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        deleted = self.task_repo.delete_task(task_id, expected_version)
+        if deleted:
+            _publish_ids(self.events, TASK_DELETED, [task_id])
+        return deleted
+
+    def create_tasks(self, tasks_data: List[TaskCreateDTO]) -> List[TaskResponseDTO]:
+        created_tasks = self.task_repo.create_tasks([_task_from_dto(task_data) for task_data in tasks_data])
+        created_tasks = [TaskResponseDTO.from_orm(task) for task in created_tasks]
+        _publish_tasks(self.events, TASK_CREATED, created_tasks)
+        return created_tasks
+
+    def update_tasks(self, bulk_update: TaskBulkUpdateDTO) -> List[int]:
+        # Sólo ids: el cliente relee las tareas afectadas en lugar de recibir miles de filas
+        task_ids = self.task_repo.update_tasks(bulk_update, bulk_update.changes.dict(exclude_unset=True))
+        _publish_ids(self.events, TASK_UPDATED, task_ids)
+        return task_ids
+
+    def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        task_ids = self.task_repo.delete_tasks(selection)
+        _publish_ids(self.events, TASK_DELETED, task_ids)
+        return task_ids
+
+    def list_comments(self, task_id: int, query: CommentListQueryDTO) -> Optional[CommentPageDTO]:
+        """Página de comentarios, o None si la tarea no existe. Lanza ValueError si el cursor no es válido."""
+        after = _comments_after(query)
+        if self.task_repo.get_task_version(task_id) is None:
+            return None
+        return _comment_page(query, self.task_repo.list_comments(task_id, after, query.limit + 1))
+
+    def add_comment(self, task_id: int, comment_data: CommentCreateDTO) -> Optional[CommentResponseDTO]:
+        try:
+            comment = self.task_repo.add_comment_to_task(task_id, Comment(content=comment_data.content))
+        except ValueError:
+            return None
+        return CommentResponseDTO.from_orm(comment)
+
+class AsyncTaskUseCases:
+    """Mismos casos de uso que TaskUseCases, sobre un AsyncTaskRepository."""
+
+    def __init__(self, task_repo: AsyncTaskRepository, events: Optional[EventPublisher] = None):
+        self.task_repo = task_repo
+        self.events = events
+
+    async def get_all_tasks(self) -> List[TaskResponseDTO]:
+        tasks = await self.task_repo.get_all_tasks()
+        return [TaskResponseDTO.from_orm(task) for task in tasks]
+
+    async def list_tasks(self, query: TaskListQueryDTO) -> TaskPageDTO:
+        after = decode_cursor(query.cursor, query.sort) if query.cursor else None
+        tasks = await self.task_repo.list_tasks(query, after, query.limit + 1)
+        page = _task_page(query, tasks)
+        if query.include_comments:
+            task_ids = [row.id for row in page.items]
+            page.comments = _comments_by_task(await self.task_repo.get_comments_for_tasks(task_ids)) if task_ids else {}
+        return page
+
+    async def search_tasks(self, query: TaskSearchQueryDTO) -> TaskPageDTO:
+        after = decode_cursor(query.cursor, query.sort) if query.cursor else None
+        return _task_page(query, await self.task_repo.search_tasks(query, after, query.limit + 1))
+
+    async def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Tuple]]:
+        async for rows in self.task_repo.stream_tasks(query, chunk_size):
+            yield rows
+
+    async def get_task_stats(self) -> TaskStatsDTO:
+        return _task_stats(await self.task_repo.get_task_stats())
+
+    async def get_task_by_id(self, task_id: int) -> Optional[TaskResponseDTO]:
+        task = await self.task_repo.get_task_by_id(task_id)
+        return TaskResponseDTO.from_orm(task) if task else None
+
+    async def get_task_fields(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        return await self.task_repo.get_task_row(task_id, fields)
+
+    async def get_task_version(self, task_id: int) -> Optional[datetime]:
+        return await self.task_repo.get_task_version(task_id)
+
+    async def create_task(self, task_data: TaskCreateDTO) -> TaskResponseDTO:
+        task = _task_from_dto(task_data)
+        created_task = TaskResponseDTO.from_orm(await self.task_repo.create_task(task))
+        _publish_tasks(self.events, TASK_CREATED, [created_task])
+        return created_task
+
+    async def update_task(self, task_id: int, task_data: TaskUpdateDTO,
+                    expected_version: Optional[datetime] = None) -> Optional[TaskResponseDTO]:
+        """Con expected_version (If-Match) sólo actualiza si la tarea sigue en esa versión; si no, devuelve None."""
         updates = task_data.dict(exclude_unset=True)
-        updated_task = self.task_repo.update_task(task_id, updates)
-        return TaskResponseDTO.from_orm(updated_task) if updated_task else None
+        updated_task = await self.task_repo.update_task(task_id, updates, expected_version)
+        if not updated_task:
+            return None
+        updated_task = TaskResponseDTO.from_orm(updated_task)
+        _publish_tasks(self.events, TASK_UPDATED, [updated_task])
+        return updated_task
+
+    async def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        deleted = await self.task_repo.delete_task(task_id, expected_version)
+        if deleted:
+            _publish_ids(self.events, TASK_DELETED, [task_id])
+        return deleted
+
+    async def create_tasks(self, tasks_data: List[TaskCreateDTO]) -> List[TaskResponseDTO]:
+        created_tasks = await self.task_repo.create_tasks([_task_from_dto(task_data) for task_data in tasks_data])
+        created_tasks = [TaskResponseDTO.from_orm(task) for task in created_tasks]
+        _publish_tasks(self.events, TASK_CREATED, created_tasks)
+        return created_tasks
+
+    async def update_tasks(self, bulk_update: TaskBulkUpdateDTO) -> List[int]:
+        task_ids = await self.task_repo.update_tasks(bulk_update, bulk_update.changes.dict(exclude_unset=True))
+        _publish_ids(self.events, TASK_UPDATED, task_ids)
+        return task_ids
+
+    async def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        task_ids = await self.task_repo.delete_tasks(selection)
+        _publish_ids(self.events, TASK_DELETED, task_ids)
+        return task_ids
+
+    async def list_comments(self, task_id: int, query: CommentListQueryDTO) -> Optional[CommentPageDTO]:
+        after = _comments_after(query)
+        if await self.task_repo.get_task_version(task_id) is None:
+            return None
+        return _comment_page(query, await self.task_repo.list_comments(task_id, after, query.limit + 1))
 
-    def delete_task(self, task_id: int) -> bool:
-        return self.task_repo.delete_task(task_id)
\ No newline at end of file
+    async def add_comment(self, task_id: int, comment_data: CommentCreateDTO) -> Optional[CommentResponseDTO]:
+        try:
+            comment = await self.task_repo.add_comment_to_task(task_id, Comment(content=comment_data.content))
+        except ValueError:
+            return None
+        return CommentResponseDTO.from_orm(comment)
@@ -1,28 +1,228 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
 from app.domain.models import Task, Comment
+from app.domain.queries import TaskBulkSelectionDTO, TaskListQueryDTO, TaskSearchQueryDTO
 
 class TaskRepository(ABC):
     @abstractmethod
     def get_all_tasks(self) -> List[Task]:
         pass
 
+    @abstractmethod
+    def list_tasks(self, query: TaskListQueryDTO, after: Optional[Tuple[Any, int]], limit: int) -> List[Tuple]:
+        """Filas (no entidades) con las columnas de TASK_RESPONSE_FIELDS."""
+        pass
+
+    @abstractmethod
+    def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int) -> Iterator[List[Tuple]]:
+        """Todas las tareas filtradas, en bloques de chunk_size, sin cargarlas a la vez en memoria."""
+        pass
+
+    @abstractmethod
+    def get_task_stats(self) -> List[Tuple]:
+        """Filas (completed, priority, category, total, overdue) agrupadas."""
+        pass
+
     @abstractmethod
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         pass
 
+    @abstractmethod
+    def get_task_row(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        """Fila con las columnas `fields` (más updated_at), o None si no existe."""
+        pass
+
+    @abstractmethod
+    def get_task_version(self, task_id: int) -> Optional[datetime]:
+        """updated_at de la tarea, o None si no existe."""
+        pass
+
     @abstractmethod
     def create_task(self, task: Task) -> Task:
         pass
 
     @abstractmethod
-    def update_task(self, task_id: int, updates: dict) -> Optional[Task]:
+    def update_task(self, task_id: int, updates: dict, expected_version: Optional[datetime] = None) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        pass
+
+    @abstractmethod
+    def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        """Inserta todas las tareas en una sola transacción."""
+        pass
+
+    @abstractmethod
+    def update_tasks(self, selection: TaskBulkSelectionDTO, updates: dict) -> List[int]:
+        """Aplica los mismos cambios a las tareas seleccionadas. Devuelve los ids actualizados."""
         pass
 
     @abstractmethod
-    def delete_task(self, task_id: int) -> bool:
+    def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        """Borra las tareas seleccionadas (y sus comentarios). Devuelve los ids borrados."""
         pass
 
     @abstractmethod
     def add_comment_to_task(self, task_id: int, comment: Comment) -> Comment:
-        pass
\ No newline at end of file
+        """Lanza ValueError si la tarea no existe."""
+        pass
+
+    @abstractmethod
+    def list_comments(self, task_id: int, after_id: Optional[int], limit: int) -> List[Tuple]:
+        """Filas con las columnas de COMMENT_RESPONSE_FIELDS, por id ascendente."""
+        pass
+
+    @abstractmethod
+    def get_comments_for_tasks(self, task_ids: List[int]) -> List[Tuple]:
+        """Comentarios de varias tareas en una sola consulta, ordenados por (task_id, id)."""
+        pass
+
+    @abstractmethod
+    def search_tasks(self, query: TaskSearchQueryDTO, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple]:
+        """Filas que coinciden con query.q por (rank, id) descendente; la última columna es `rank`."""
+        pass
+
+class AsyncTaskRepository(ABC):
+    """Variante asíncrona de TaskRepository para drivers async (asyncpg, aiosqlite)."""
+
+    @abstractmethod
+    async def get_all_tasks(self) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def list_tasks(self, query: TaskListQueryDTO, after: Optional[Tuple[Any, int]], limit: int) -> List[Tuple]:
+        pass
+
+    @abstractmethod
+    def stream_tasks(self, query: TaskListQueryDTO, chunk_size: int) -> AsyncIterator[List[Tuple]]:
+        pass
+
+    @abstractmethod
+    async def get_task_stats(self) -> List[Tuple]:
+        pass
+
+    @abstractmethod
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def get_task_row(self, task_id: int, fields: Tuple[str, ...]) -> Optional[Tuple]:
+        pass
+
+    @abstractmethod
+    async def get_task_version(self, task_id: int) -> Optional[datetime]:
+        pass
+
+    @abstractmethod
+    async def create_task(self, task: Task) -> Task:
+        pass
+
+    @abstractmethod
+    async def update_task(self, task_id: int, updates: dict, expected_version: Optional[datetime] = None) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def delete_task(self, task_id: int, expected_version: Optional[datetime] = None) -> bool:
+        pass
+
+    @abstractmethod
+    async def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def update_tasks(self, selection: TaskBulkSelectionDTO, updates: dict) -> List[int]:
+        pass
+
+    @abstractmethod
+    async def delete_tasks(self, selection: TaskBulkSelectionDTO) -> List[int]:
+        pass
+
+    @abstractmethod
+    async def add_comment_to_task(self, task_id: int, comment: Comment) -> Comment:
+        pass
+
+    @abstractmethod
+    async def list_comments(self, task_id: int, after_id: Optional[int], limit: int) -> List[Tuple]:
+        pass
+
+    @abstractmethod
+    async def get_comments_for_tasks(self, task_ids: List[int]) -> List[Tuple]:
+        pass
+
+    @abstractmethod
+    async def search_tasks(self, query: TaskSearchQueryDTO, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple]:
+        pass
+
+
+class CacheBackend(ABC):
+    """Almacén clave-valor para la caché de payloads (en memoria o compartido entre procesos)."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        """Guarda el valor sólo si la clave no existe. Devuelve True si lo guardó."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """Incrementa un contador y renueva su TTL. Devuelve el nuevo valor."""
+        pass
+
+    async def incr_many(self, keys: List[str], ttl: float) -> List[int]:
+        """incr() de varias claves; un backend remoto lo sobrescribe para hacerlo en una sola ida y vuelta."""
+        return [await self.incr(key, ttl) for key in keys]
+
+    async def delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            await self.delete(key)
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        pass
+
+    @abstractmethod
+    async def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        pass
+
+
+class EventPublisher(ABC):
+    """Destino de los eventos de cambio que emiten los casos de uso tras cada escritura."""
+
+    @abstractmethod
+    def publish(self, event_type: str, data: dict) -> None:
+        """No bloquea y puede llamarse desde cualquier hilo (también desde el DatabaseExecutor)."""
+        pass
+
+
+class EventBroker(ABC):
+    """
+    Difusión de mensajes entre procesos worker para el feed de cambios: cada mensaje llega a todos
+    los suscriptores, también al del proceso que lo envió, en el mismo orden en todos y junto a un
+    id único asignado por el broker (callback(event_id, message)).
+    """
+
+    @abstractmethod
+    async def publish(self, message: str) -> None:
+        pass
+
+    @abstractmethod
+    async def subscribe(self, callback: Callable[[str, str], None]) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
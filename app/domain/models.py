@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, Integer, String, Boolean, DateTime, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,14 +17,52 @@ class Task(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
+    # passive_deletes: el borrado de comentarios lo resuelve el ON DELETE CASCADE, sin cargarlos
+    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Índices compuestos (filtro/orden, id) para la paginación keyset de GET /tasks
+    __table_args__ = (
+        Index("ix_tasks_completed_id", "completed", "id"),
+        Index("ix_tasks_priority_id", "priority", "id"),
+        Index("ix_tasks_category_id", "category", "id"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),
+    )
+
+# Búsqueda de texto (sólo PostgreSQL): columna tsvector sobre título y descripción, mantenida por un trigger,
+# con índice GIN. No se declara en el modelo porque SQLite no la admite; la migración la crea en bases existentes.
+SEARCH_CONFIG = "spanish"
+SEARCH_VECTOR_EXPRESSION = (
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '') || ' ' || coalesce(NEW.description, ''))"
+)
+# Una sentencia por DDL: asyncpg no ejecuta varias sentencias en una sola llamada
+SEARCH_VECTOR_DDL = (
+    DDL("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector"),
+    DDL(
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {SEARCH_VECTOR_EXPRESSION}; RETURN NEW; END $$ LANGUAGE plpgsql"
+    ),
+    DDL(
+        "CREATE TRIGGER tasks_search_vector_trigger BEFORE INSERT OR UPDATE OF title, description ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()"
+    ),
+    DDL("CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)"),
+)
+for statement in SEARCH_VECTOR_DDL:
+    event.listen(Task.__table__, "after_create", statement.execute_if(dialect="postgresql"))
 
 class Comment(Base):
     __tablename__ = "comments"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     content = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
-    task = relationship("Task", back_populates="comments")
\ No newline at end of file
+    task = relationship("Task", back_populates="comments")
+
+    # Comentarios de una tarea (o de una página de tareas) en orden de id, sin recorrer la tabla
+    __table_args__ = (
+        Index("ix_comments_task_id_id", "task_id", "id"),
+    )
@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from pydantic import BaseModel, Field, conint, conlist, root_validator, validator
+
+# Consultas y selecciones sobre las tareas: parámetros de los puertos del repositorio
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_BULK_ITEMS = 5000
+DEFAULT_COMMENT_PAGE_SIZE = 50
+# Relaciones que GET /tasks puede incluir con ?include=
+INCLUDE_OPTIONS = ("comments",)
+# Columnas no nulas por las que se puede ordenar (prefijo "-" para orden descendente)
+SORT_FIELDS = ("id", "created_at", "updated_at", "priority")
+
+# Orden de las columnas en las filas que se serializan sin pasar por TaskResponseDTO
+TASK_RESPONSE_FIELDS = (
+    "id", "title", "description", "completed", "due_date", "priority", "category", "created_at", "updated_at",
+)
+# Igual para CommentResponseDTO
+COMMENT_RESPONSE_FIELDS = ("id", "task_id", "content", "created_at")
+
+
+class TaskFieldsDTO(BaseModel):
+    """Proyección `?fields=id,title`: sólo se leen de la base de datos y se serializan esas columnas."""
+    fields: Optional[Tuple[str, ...]] = None
+
+    @validator("fields", pre=True)
+    def validate_fields(cls, value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = [field.strip() for field in value.split(",") if field.strip()]
+        if not value:
+            raise ValueError("fields must name at least one field")
+        unknown = [field for field in value if field not in TASK_RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown fields {', '.join(unknown)}; allowed: {', '.join(TASK_RESPONSE_FIELDS)}")
+        # Orden canónico: la misma proyección siempre produce las mismas claves en el mismo orden
+        return tuple(field for field in TASK_RESPONSE_FIELDS if field in value)
+
+    @property
+    def response_fields(self) -> Tuple[str, ...]:
+        return self.fields or TASK_RESPONSE_FIELDS
+
+class TaskFilterDTO(BaseModel):
+    completed: Optional[bool] = None
+    priority: Optional[conint(ge=1, le=3)] = None
+    category: Optional[str] = Field(None, max_length=50)
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+
+class TaskListQueryDTO(TaskFilterDTO, TaskFieldsDTO):
+    sort: str = "id"
+    limit: conint(ge=1, le=MAX_PAGE_SIZE) = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    include: Optional[Tuple[str, ...]] = None
+
+    @validator("include", pre=True)
+    def validate_include(cls, value):
+        if isinstance(value, str):
+            value = [option.strip() for option in value.split(",") if option.strip()]
+        unknown = [option for option in value or () if option not in INCLUDE_OPTIONS]
+        if unknown:
+            raise ValueError(f"include must be one of {', '.join(INCLUDE_OPTIONS)}")
+        return tuple(value) if value else None
+
+    @property
+    def include_comments(self) -> bool:
+        return "comments" in (self.include or ())
+
+    @validator("sort")
+    def validate_sort(cls, value):
+        if value.lstrip("-") not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)} (optionally prefixed with '-')")
+        return value
+
+    @property
+    def sort_field(self) -> str:
+        return self.sort.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.sort.startswith("-")
+
+class TaskSearchQueryDTO(TaskFilterDTO, TaskFieldsDTO):
+    """Búsqueda por palabras en título y descripción, ordenada por relevancia (y id) con keyset pagination."""
+    q: str = Field(..., min_length=1, max_length=200)
+    limit: conint(ge=1, le=MAX_PAGE_SIZE) = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+
+    @validator("q")
+    def validate_q(cls, value):
+        if not value.strip():
+            raise ValueError("q must contain at least one word")
+        return value.strip()
+
+    @property
+    def sort(self) -> str:
+        # Orden fijo: el cursor guarda (rank, id) de la última fila
+        return "-rank"
+
+class TaskBulkSelectionDTO(BaseModel):
+    """Tareas afectadas por una operación masiva: una lista de ids o un filtro no vacío."""
+    ids: Optional[conlist(int, min_items=1, max_items=MAX_BULK_ITEMS)] = None
+    filter: Optional[TaskFilterDTO] = None
+
+    @root_validator
+    def validate_selection(cls, values):
+        ids, task_filter = values.get("ids"), values.get("filter")
+        if (ids is None) == (task_filter is None):
+            raise ValueError("exactly one of 'ids' or 'filter' is required")
+        if task_filter is not None and not task_filter.dict(exclude_none=True):
+            raise ValueError("'filter' must have at least one criterion")
+        return values
@@ -0,0 +1,129 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+from app.infrastructure import metrics
+from app.infrastructure.pool import WaitTracker, pool_wait
+
+# Peticiones por segundo que recupera cada par (cliente, ruta); 0 (por defecto) desactiva el límite
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", 0))
+# Ráfaga máxima por encima del ritmo sostenido (capacidad del bucket)
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 100))
+# Segundos sin peticiones tras los que se olvida un cliente
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", 300))
+# Tope de buckets en memoria: si se alcanza, se expulsa el cliente menos reciente
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 100000))
+# Peticiones admitidas a la vez por proceso (0 = sin límite)
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 256))
+# Con una espera media del pool por encima de este objetivo (segundos) sólo se admite hasta ADMISSION_MIN_CONCURRENT
+ADMISSION_TARGET_POOL_WAIT = float(os.getenv("ADMISSION_TARGET_POOL_WAIT", 0.1))
+ADMISSION_MIN_CONCURRENT = int(os.getenv("ADMISSION_MIN_CONCURRENT", 8))
+
+RATE_LIMITED = metrics.counter("http_rate_limited_total", "Peticiones rechazadas con 429 por el rate limit.", ["route"])
+RATE_LIMIT_CLIENTS = metrics.gauge("http_rate_limit_clients", "Buckets de rate limit en memoria.")
+RATE_LIMIT_EVICTIONS = metrics.counter("http_rate_limit_evictions_total", "Buckets expulsados.", ["reason"])
+LOAD_SHED = metrics.counter("http_load_shed_total", "Peticiones rechazadas con 503 por sobrecarga.", ["reason"])
+ADMITTED = metrics.gauge("http_admitted_requests", "Peticiones admitidas en curso.")
+
+class TokenBucketLimiter:
+    """
+    Token bucket por clave (cliente y ruta). Cada bucket es una tupla (tokens, último acceso) en
+    un OrderedDict ordenado por último acceso: actualizarlo es O(1) y los clientes inactivos quedan
+    al principio, de donde se expulsan unos pocos en cada llamada.
+
+    Un bucket inactivo durante burst / rate segundos ya está lleno: olvidarlo no cambia nada.
+    """
+
+    # Buckets caducados que se revisan por llamada: coste acotado aunque expiren muchos a la vez
+    EVICT_BATCH = 8
+
+    def __init__(self, rate: float, burst: float, idle_seconds: float, max_clients: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.idle_seconds = max(idle_seconds, self.burst / rate) if rate > 0 else idle_seconds
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable) -> float:
+        """Consume un token. Devuelve 0 si la petición pasa o los segundos hasta el próximo token."""
+        if not self.enabled:
+            return 0.0
+        now = self.clock()
+        self.evict_idle(now, self.EVICT_BATCH)
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+            RATE_LIMIT_EVICTIONS.inc(reason="size")
+        return wait
+
+    def evict_idle(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Olvida los clientes sin peticiones en idle_seconds (como mucho `limit`)."""
+        now = self.clock() if now is None else now
+        evicted = 0
+        while self._buckets and (limit is None or evicted < limit):
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.idle_seconds:
+                break
+            del self._buckets[key]
+            evicted += 1
+        if evicted:
+            RATE_LIMIT_EVICTIONS.inc(evicted, reason="idle")
+        return evicted
+
+class AdmissionController:
+    """
+    Límite global de peticiones en curso del proceso. Además descarta carga cuando el pool de
+    conexiones se congestiona: si la espera media supera el objetivo, sólo se admiten peticiones
+    mientras haya menos de min_concurrent en curso, en lugar de encolar más detrás del pool.
+    """
+
+    def __init__(self, max_concurrent: int, target_wait: float, min_concurrent: int,
+                 wait_tracker: WaitTracker = pool_wait):
+        self.max_concurrent = max_concurrent
+        self.target_wait = target_wait
+        self.min_concurrent = min_concurrent
+        self.wait_tracker = wait_tracker
+        self.in_flight = 0
+
+    def try_acquire(self) -> Optional[str]:
+        """None si la petición se admite (hay que llamar a release()); si no, el motivo del rechazo."""
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            LOAD_SHED.inc(reason="concurrency")
+            return "concurrency"
+        if self.in_flight >= self.min_concurrent and self.wait_tracker.value() > self.target_wait:
+            LOAD_SHED.inc(reason="pool_wait")
+            return "pool_wait"
+        self.in_flight += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+
+def build_rate_limiter() -> TokenBucketLimiter:
+    return TokenBucketLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST, RATE_LIMIT_IDLE_SECONDS, RATE_LIMIT_MAX_CLIENTS)
+
+def build_admission() -> AdmissionController:
+    return AdmissionController(ADMISSION_MAX_CONCURRENT, ADMISSION_TARGET_POOL_WAIT, ADMISSION_MIN_CONCURRENT)
+
+# Ambos viven en el IOLoop del proceso: prepare() y on_finish() nunca corren en otro hilo
+rate_limiter = build_rate_limiter()
+admission = build_admission()
+RATE_LIMIT_CLIENTS.set_function(lambda: len(rate_limiter))
+ADMITTED.set_function(lambda: admission.in_flight)
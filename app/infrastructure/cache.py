@@ -0,0 +1,57 @@
+import os
+
+from app.application.cache import PayloadCache, TaskCache, VersionToken
+from app.application.idempotency import IdempotencyStore
+from app.application.singleflight import ReadCoalescer
+
+# "memory": caché propia de cada proceso; "redis": caché compartida por todos los procesos
+TASK_CACHE_BACKEND = os.getenv("TASK_CACHE_BACKEND", "memory")
+TASK_CACHE_REDIS_URL = os.getenv("TASK_CACHE_REDIS_URL", "redis://localhost:6379/0")
+TASK_CACHE_MAX_ENTRIES = int(os.getenv("TASK_CACHE_MAX_ENTRIES", 10000))
+TASK_CACHE_MAX_BYTES = int(os.getenv("TASK_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", 60))
+# Caché local (L1) delante del backend compartido, invalidada por pub/sub
+TASK_CACHE_LOCAL_ENTRIES = int(os.getenv("TASK_CACHE_LOCAL_ENTRIES", 1000))
+TASK_CACHE_LOCAL_TTL = float(os.getenv("TASK_CACHE_LOCAL_TTL", 5))
+# Páginas de GET /tasks (con sus versiones comprimidas) por proceso, indexadas por el ETag de la colección
+TASK_LIST_CACHE_ENTRIES = int(os.getenv("TASK_LIST_CACHE_ENTRIES", 256))
+TASK_LIST_CACHE_MAX_BYTES = int(os.getenv("TASK_LIST_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+# Respuestas de escrituras con Idempotency-Key (con TASK_CACHE_BACKEND=redis se comparten entre procesos)
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", 24 * 3600))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 10000))
+IDEMPOTENCY_MAX_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BYTES", 16 * 1024 * 1024))
+
+def build_task_cache() -> TaskCache:
+    if TASK_CACHE_BACKEND == "redis":
+        from app.adapters.redis_cache_backend import RedisCacheBackend
+        backend = RedisCacheBackend.from_url(TASK_CACHE_REDIS_URL)
+        local = PayloadCache("task-local", TASK_CACHE_LOCAL_ENTRIES, TASK_CACHE_MAX_BYTES, TASK_CACHE_LOCAL_TTL)
+        return TaskCache(backend, TASK_CACHE_TTL, local=local)
+
+    from app.adapters.memory_cache_backend import InMemoryCacheBackend
+    return TaskCache(InMemoryCacheBackend(TASK_CACHE_MAX_ENTRIES, TASK_CACHE_MAX_BYTES), TASK_CACHE_TTL)
+
+def build_idempotency_store() -> IdempotencyStore:
+    if TASK_CACHE_BACKEND == "redis":
+        from app.adapters.redis_cache_backend import RedisCacheBackend
+        return IdempotencyStore(RedisCacheBackend.from_url(TASK_CACHE_REDIS_URL), IDEMPOTENCY_TTL)
+
+    from app.adapters.memory_cache_backend import InMemoryCacheBackend
+    return IdempotencyStore(InMemoryCacheBackend(IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_MAX_BYTES), IDEMPOTENCY_TTL)
+
+# Payloads de GET /tasks/{id}, invalidados por cada escritura sobre la tarea
+task_cache = build_task_cache()
+
+def build_task_list_version(cache: TaskCache) -> VersionToken:
+    return VersionToken(cache.backend, "task-list:version", TASK_CACHE_TTL)
+
+# Versión del listado de tareas que cambia con cada escritura, en el mismo backend que la caché de detalle
+task_list_version = build_task_list_version(task_cache)
+
+# La clave ya incluye la versión de la colección: una escritura deja las páginas viejas huérfanas hasta que el LRU las expulse
+task_list_cache = PayloadCache("task-list", TASK_LIST_CACHE_ENTRIES, TASK_LIST_CACHE_MAX_BYTES, TASK_CACHE_TTL)
+
+idempotency_store = build_idempotency_store()
+
+# GET /tasks y GET /tasks/{id} idénticos y simultáneos comparten consulta y serialización, aun sin caché
+read_coalescer = ReadCoalescer()
@@ -0,0 +1,23 @@
+import os
+
+from app.application.events import ChangeFeed
+from app.infrastructure.database import ASYNC_DATABASE_URL, DATABASE_URL
+
+# "postgres": LISTEN/NOTIFY reparte los eventos entre workers; "memory": sólo los del propio proceso
+TASK_EVENTS_BROKER = os.getenv("TASK_EVENTS_BROKER", "postgres" if DATABASE_URL.startswith("postgresql") else "memory")
+TASK_EVENTS_CHANNEL = os.getenv("TASK_EVENTS_CHANNEL", "task_events")
+# Eventos recientes que se guardan para reanudar con Last-Event-ID
+TASK_EVENTS_BUFFER = int(os.getenv("TASK_EVENTS_BUFFER", 1000))
+# Segundos entre comentarios de keep-alive en una conexión sin eventos (evita cortes de proxies)
+TASK_EVENTS_HEARTBEAT = float(os.getenv("TASK_EVENTS_HEARTBEAT", 15))
+# Milisegundos que espera EventSource antes de reconectar
+TASK_EVENTS_RETRY_MS = int(os.getenv("TASK_EVENTS_RETRY_MS", 3000))
+
+def build_task_events() -> ChangeFeed:
+    if TASK_EVENTS_BROKER == "postgres":
+        from app.adapters.postgres_event_broker import PostgresEventBroker
+        return ChangeFeed(TASK_EVENTS_BUFFER, PostgresEventBroker.from_url(ASYNC_DATABASE_URL, TASK_EVENTS_CHANNEL))
+    return ChangeFeed(TASK_EVENTS_BUFFER)
+
+# Alta, modificación y borrado de tareas para GET /tasks/events; el broker se conecta en ChangeFeed.start()
+task_events = build_task_events()
@@ -0,0 +1,86 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import tornado.ioloop
+
+from app.infrastructure import database, metrics
+
+# Un hilo por conexión del pool: más hilos sólo esperarían una conexión libre (0 = tamaño del pool del proceso)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", 0))
+# Peticiones que pueden esperar un hilo libre antes de responder 503
+DB_EXECUTOR_MAX_QUEUE = int(os.getenv("DB_EXECUTOR_MAX_QUEUE", 100))
+
+EXECUTOR_WORKERS = metrics.gauge("db_executor_workers", "Hilos del executor de base de datos.")
+EXECUTOR_ACTIVE = metrics.gauge("db_executor_active", "Unidades de trabajo ejecutándose en el executor.")
+EXECUTOR_QUEUED = metrics.gauge("db_executor_queued", "Unidades de trabajo esperando un hilo libre.")
+EXECUTOR_REJECTED = metrics.counter("db_executor_rejected_total", "Peticiones rechazadas con 503 por cola llena.")
+EXECUTOR_COMPLETED = metrics.counter("db_executor_completed_total", "Unidades de trabajo completadas.")
+EXECUTOR_WAIT_SECONDS = metrics.counter("db_executor_wait_seconds_total", "Tiempo acumulado esperando un hilo libre.")
+
+class DatabaseExecutor:
+    """
+    ThreadPoolExecutor acotado para ejecutar el repositorio síncrono fuera del IOLoop.
+    Las peticiones se admiten con try_acquire(); cuando hay más de max_queue esperando
+    un hilo, la admisión falla para que el handler responda 503 de inmediato.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-executor")
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.queued = 0
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.admitted >= self.max_workers + self.max_queue:
+                EXECUTOR_REJECTED.inc()
+                return False
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.admitted -= 1
+
+    async def run(self, fn: Callable, *args):
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+
+        def unit_of_work():
+            EXECUTOR_WAIT_SECONDS.inc(time.perf_counter() - submitted_at)
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                EXECUTOR_COMPLETED.inc()
+
+        # run_in_executor no propaga el contexto: se copia para que las consultas se sumen a la petición
+        context = contextvars.copy_context()
+        return await tornado.ioloop.IOLoop.current().run_in_executor(self._pool, context.run, unit_of_work)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+_db_executor: Optional[DatabaseExecutor] = None
+
+def get_db_executor() -> DatabaseExecutor:
+    """Crea el executor la primera vez que se usa (nunca al importar el módulo)."""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = DatabaseExecutor(DB_EXECUTOR_WORKERS or database.pool_size, DB_EXECUTOR_MAX_QUEUE)
+        EXECUTOR_WORKERS.set_function(lambda: _db_executor.max_workers)
+        EXECUTOR_ACTIVE.set_function(lambda: _db_executor.active)
+        EXECUTOR_QUEUED.set_function(lambda: _db_executor.queued)
+    return _db_executor
@@ -0,0 +1,100 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.infrastructure import metrics
+
+# Añade la cabecera Server-Timing (db, app, serialize, total) a cada respuesta
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP.", ["route", "method"]
+)
+REQUESTS = metrics.counter("http_requests_total", "Peticiones HTTP respondidas.", ["route", "method", "status"])
+REQUEST_DB_QUERIES = metrics.histogram(
+    "http_request_db_queries", "Consultas SQL por petición.", ["route", "method"], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = metrics.histogram(
+    "http_request_db_seconds", "Tiempo en consultas SQL por petición.", ["route", "method"]
+)
+REQUEST_APP_SECONDS = metrics.histogram(
+    "http_request_app_seconds", "Tiempo en casos de uso fuera de SQL (ORM y from_orm) por petición.",
+    ["route", "method"],
+)
+REQUEST_SERIALIZE_SECONDS = metrics.histogram(
+    "http_request_serialize_seconds", "Tiempo en json.dumps por petición.", ["route", "method"]
+)
+RESPONSE_SIZE = metrics.histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de las respuestas.", ["route", "method"], buckets=SIZE_BUCKETS
+)
+
+class RequestTimings:
+    """Tiempos acumulados de una petición. Es mutable: las copias del contexto comparten la instancia."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.phases: Dict[str, float] = {"db": 0.0, "use_case": 0.0, "serialize": 0.0}
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    @property
+    def app_seconds(self) -> float:
+        # Las consultas se ejecutan dentro del caso de uso: lo que queda es ORM, pydantic y lógica
+        return max(self.phases["use_case"] - self.phases["db"], 0.0)
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join([
+            f'db;dur={self.phases["db"] * 1000:.2f};desc="{self.db_queries} queries"',
+            f"app;dur={self.app_seconds * 1000:.2f}",
+            f'serialize;dur={self.phases["serialize"] * 1000:.2f}',
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+def observe_request(route: str, method: str, status: int, duration: float, size: int, timings: RequestTimings):
+    labels = {"route": route, "method": method}
+    REQUEST_DURATION.observe(duration, **labels)
+    REQUESTS.inc(status=status, **labels)
+    REQUEST_DB_QUERIES.observe(timings.db_queries, **labels)
+    REQUEST_DB_SECONDS.observe(timings.phases["db"], **labels)
+    REQUEST_APP_SECONDS.observe(timings.app_seconds, **labels)
+    REQUEST_SERIALIZE_SECONDS.observe(timings.phases["serialize"], **labels)
+    RESPONSE_SIZE.observe(size, **labels)
+
+# Eventos a nivel de clase Engine: cubren el engine síncrono, el asíncrono (su sync_engine) y los de tests
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.add("db", time.perf_counter() - context._query_started)
@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.infrastructure import metrics
+
+POOL_CHECKED_OUT = metrics.gauge("db_pool_checked_out", "Conexiones prestadas por el pool.", ["pool"])
+POOL_CHECKOUTS = metrics.counter("db_pool_checkouts_total", "Conexiones obtenidas del pool.", ["pool"])
+POOL_WAIT_SECONDS = metrics.counter(
+    "db_pool_wait_seconds_total", "Tiempo acumulado obteniendo una conexión del pool.", ["pool"]
+)
+POOL_OVERFLOW = metrics.counter(
+    "db_pool_overflow_total", "Conexiones abiertas por encima de pool_size (max_overflow).", ["pool"]
+)
+POOL_TIMEOUTS = metrics.counter(
+    "db_pool_timeouts_total", "Peticiones que agotaron pool_timeout sin conseguir conexión.", ["pool"]
+)
+
+class WaitTracker:
+    """
+    Media móvil exponencial del tiempo de espera por una conexión. Sin nuevas esperas el valor
+    decae a la mitad cada half_life segundos, así una congestión pasada no queda fija.
+    """
+
+    ALPHA = 0.2
+
+    def __init__(self, half_life: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.half_life = half_life
+        self.clock = clock
+        self._average = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        return self._average * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            now = self.clock()
+            self._average = self.ALPHA * seconds + (1 - self.ALPHA) * self._decayed(now)
+            self._updated = now
+
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(self.clock())
+
+# Espera reciente de ambos pools (síncrono y asíncrono), consultada por el control de admisión
+pool_wait = WaitTracker()
+
+class _InstrumentedPool:
+    """Mide cuánto tarda connect() en entregar una conexión y cuántas salen del overflow."""
+    label = "sync"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(pool=self.label)
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            POOL_WAIT_SECONDS.inc(waited, pool=self.label)
+            pool_wait.observe(waited)
+
+    def _create_connection(self):
+        connection = super()._create_connection()
+        # _overflow cuenta las conexiones abiertas menos pool_size: positivo = conexión de overflow
+        if self._overflow > 0:
+            POOL_OVERFLOW.inc(pool=self.label)
+        return connection
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    label = "sync"
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    label = "async"
+
+def instrument_engine(engine, label: str):
+    """Cuenta las conexiones prestadas con los eventos checkout/checkin del pool."""
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc(pool=label)
+        POOL_CHECKED_OUT.inc(pool=label)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        POOL_CHECKED_OUT.dec(pool=label)
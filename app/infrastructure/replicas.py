@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable, List, Optional
+
+from sqlalchemy import text
+from tornado.ioloop import PeriodicCallback
+
+from app.infrastructure import metrics
+
+DB_READS = metrics.counter("db_reads_total", "Peticiones de lectura según la base de datos que las sirve.", ["target"])
+REPLICA_HEALTHY = metrics.gauge("db_replica_healthy", "1 si la réplica pasa el health check.", ["replica"])
+REPLICA_IN_USE = metrics.gauge("db_replica_in_use", "Peticiones leyendo de cada réplica.", ["replica"])
+STICKY_CLIENTS = metrics.gauge("db_replica_sticky_clients", "Clientes que leen del primario tras escribir.")
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+class Replica:
+    """Réplica de lectura: sus engines (síncrono para el executor, asíncrono para el IOLoop) y su estado."""
+
+    def __init__(self, name: str, engine, async_engine):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.in_use = 0
+        REPLICA_HEALTHY.set(1, replica=name)
+
+    def set_healthy(self, healthy: bool):
+        self.healthy = healthy
+        REPLICA_HEALTHY.set(int(healthy), replica=self.name)
+
+    async def _select_one(self):
+        async with self.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def ping(self, timeout: float) -> bool:
+        # El timeout cubre también la conexión: una réplica que no responde no debe colgar el health check
+        try:
+            await asyncio.wait_for(self._select_one(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def dispose(self):
+        await self.async_engine.dispose()
+        self.engine.dispose()
+
+class ReplicaRouter:
+    """
+    Reparte las lecturas entre las réplicas sanas (round robin o la de menos peticiones en curso);
+    sin réplicas, o si ninguna está sana, se lee del primario.
+
+    Read-your-writes: durante sticky_seconds tras una escritura, las lecturas de ese cliente van al
+    primario y ven su cambio aunque las réplicas vayan con retraso. Los clientes se guardan en un
+    OrderedDict por orden de escritura: con una ventana fija, los caducados quedan al principio.
+    La ventana es por proceso; con varios workers, un cliente puede leer en otro antes de que venza.
+    """
+
+    # Clientes caducados que se revisan por llamada, como en TokenBucketLimiter
+    EVICT_BATCH = 8
+
+    def __init__(self, strategy: str = ROUND_ROBIN, sticky_seconds: float = 0.0, max_clients: int = 100000,
+                 health_interval: float = 5.0, health_timeout: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica balancing strategy: {strategy}")
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.max_clients = max_clients
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.clock = clock
+        self.replicas: List[Replica] = []
+        self._turn = itertools.count()
+        self._writes: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._health_check: Optional[PeriodicCallback] = None
+
+    def __len__(self) -> int:
+        """Clientes dentro de su ventana de read-your-writes (o pendientes de expulsar)."""
+        return len(self._writes)
+
+    def set_replicas(self, replicas: List[Replica]):
+        self.replicas = replicas
+
+    def record_write(self, client: Hashable):
+        """El cliente acaba de escribir: lee del primario hasta que venza la ventana."""
+        if not self.replicas or self.sticky_seconds <= 0:
+            return
+        self._writes.pop(client, None)
+        self._writes[client] = self.clock() + self.sticky_seconds
+        if len(self._writes) > self.max_clients:
+            self._writes.popitem(last=False)
+
+    def sticky(self, client: Hashable) -> bool:
+        now = self.clock()
+        for _ in range(self.EVICT_BATCH):
+            if not self._writes:
+                break
+            oldest, expires = next(iter(self._writes.items()))
+            if expires > now:
+                break
+            del self._writes[oldest]
+        expires = self._writes.get(client)
+        return expires is not None and expires > now
+
+    def choose(self, client: Hashable) -> Optional[Replica]:
+        """Réplica para una lectura del cliente, o None si debe ir al primario."""
+        if not self.replicas or self.sticky(client):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == LEAST_CONNECTIONS:
+            return min(healthy, key=lambda replica: replica.in_use)
+        return healthy[next(self._turn) % len(healthy)]
+
+    @contextmanager
+    def route(self, client: Hashable, read_only: bool):
+        """Elige dónde se ejecuta la petición; las escrituras siempre van al primario (None)."""
+        replica = self.choose(client) if read_only else None
+        if read_only:
+            DB_READS.inc(target=replica.name if replica is not None else "primary")
+        if replica is None:
+            yield None
+            return
+        replica.in_use += 1
+        REPLICA_IN_USE.inc(replica=replica.name)
+        try:
+            yield replica
+        finally:
+            replica.in_use -= 1
+            REPLICA_IN_USE.dec(replica=replica.name)
+
+    async def check_health(self):
+        """Marca cada réplica según responda a SELECT 1 en health_timeout segundos."""
+        results = await asyncio.gather(*(replica.ping(self.health_timeout) for replica in self.replicas))
+        for replica, healthy in zip(self.replicas, results):
+            replica.set_healthy(healthy)
+
+    async def start(self):
+        if self.replicas and self._health_check is None:
+            await self.check_health()
+            self._health_check = PeriodicCallback(self.check_health, self.health_interval * 1000)
+            self._health_check.start()
+
+    async def close(self):
+        if self._health_check is not None:
+            self._health_check.stop()
+            self._health_check = None
+        for replica in self.replicas:
+            await replica.dispose()
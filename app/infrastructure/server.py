@@ -0,0 +1,127 @@
+import os
+import signal
+import sys
+import time
+from typing import Callable, Optional
+
+import tornado.gen
+import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
+import tornado.process
+import tornado.web
+
+from app.infrastructure import database, metrics
+
+# Procesos worker (0 = uno por núcleo). Con más de uno se hace fork después de abrir el socket
+WEB_PROCESSES = int(os.getenv("WEB_PROCESSES", 1))
+# SO_REUSEPORT: cada worker abre su propio socket y el kernel reparte las conexiones entre ellos
+WEB_REUSE_PORT = os.getenv("WEB_REUSE_PORT", "false").lower() in ("1", "true", "yes")
+# Segundos que un worker espera a las peticiones en curso tras SIGTERM
+WEB_DRAIN_TIMEOUT = float(os.getenv("WEB_DRAIN_TIMEOUT", 30))
+# Reinicios de workers caídos que tolera el proceso padre antes de rendirse
+WEB_MAX_RESTARTS = int(os.getenv("WEB_MAX_RESTARTS", 100))
+
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Peticiones HTTP en curso en este proceso.")
+
+def process_count(processes: int) -> int:
+    return processes if processes > 0 else tornado.process.cpu_count()
+
+async def drain(server: tornado.httpserver.HTTPServer, timeout: float, poll_interval: float = 0.05,
+                on_stop: Optional[Callable] = None):
+    """
+    Deja de aceptar conexiones, avisa a la aplicación (on_stop: p. ej. terminar las conexiones
+    abiertas de /tasks/events), espera a las peticiones en curso (hasta timeout) y cierra el pool.
+    """
+    server.stop()
+    if on_stop is not None:
+        await on_stop()
+    deadline = time.monotonic() + timeout
+    while HTTP_IN_FLIGHT.value() > 0 and time.monotonic() < deadline:
+        await tornado.gen.sleep(poll_interval)
+    await server.close_all_connections()
+    await database.dispose_engine()
+
+def fork_workers(processes: int, max_restarts: int) -> int:
+    """
+    Como tornado.process.fork_processes, pero el padre conoce el pid de cada worker:
+    les reenvía SIGTERM para que drenen y, a partir de ahí, deja de relanzarlos.
+    Devuelve el número de worker en el hijo; el padre nunca retorna.
+    """
+    children = {}
+    stopping = False
+
+    def start_worker(worker_id: int) -> bool:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            return True
+        children[pid] = worker_id
+        return False
+
+    def forward_sigterm(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward_sigterm)
+    for worker_id in range(processes):
+        if start_worker(worker_id):
+            return worker_id
+
+    restarts = 0
+    while children:
+        pid, status = os.wait()
+        worker_id = children.pop(pid, None)
+        if worker_id is None or stopping:
+            continue
+        if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+            continue
+        # El worker murió por una señal o con error: se relanza con el mismo número
+        print(f"Worker {worker_id} (pid {pid}) terminó con estado {status}; relanzando")
+        restarts += 1
+        if restarts > max_restarts:
+            raise RuntimeError("Too many worker restarts, giving up")
+        if start_worker(worker_id):
+            return worker_id
+    sys.exit(0)
+
+def serve(
+    make_app: Callable[[], tornado.web.Application],
+    port: int,
+    processes: int = WEB_PROCESSES,
+    reuse_port: bool = WEB_REUSE_PORT,
+    drain_timeout: float = WEB_DRAIN_TIMEOUT,
+    max_restarts: int = WEB_MAX_RESTARTS,
+    on_start: Optional[Callable] = None,
+    on_stop: Optional[Callable] = None,
+):
+    processes = process_count(processes)
+    sockets = None
+    if processes > 1:
+        if not reuse_port:
+            # Un único socket heredado por todos los workers, que compiten por accept()
+            sockets = tornado.netutil.bind_sockets(port)
+        # El padre se queda aquí vigilando y relanza los workers que mueren por error o señal
+        fork_workers(processes, max_restarts)
+    if sockets is None:
+        sockets = tornado.netutil.bind_sockets(port, reuse_port=reuse_port)
+
+    # Ya en el worker: engine, pool de conexiones e IOLoop son propios de este proceso
+    database.init_engine(database.worker_pool_size(processes))
+    server = tornado.httpserver.HTTPServer(make_app())
+    server.add_sockets(sockets)
+    io_loop = tornado.ioloop.IOLoop.current()
+
+    async def shutdown():
+        await drain(server, drain_timeout, on_stop=on_stop)
+        io_loop.stop()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: io_loop.add_callback_from_signal(shutdown))
+    if on_start is not None:
+        io_loop.add_callback(on_start)
+    io_loop.start()
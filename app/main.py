@@ -1,17 +1,62 @@
-import tornado.ioloop
+import argparse
 import tornado.web
 import os
-from app.presentation.handlers import TaskListHandler, TaskDetailHandler
+from app.infrastructure import database
+from app.infrastructure.cache import task_cache
+from app.infrastructure.events import task_events
+from app.presentation.compression import build_transforms
+from app.infrastructure.server import WEB_DRAIN_TIMEOUT, WEB_MAX_RESTARTS, WEB_PROCESSES, WEB_REUSE_PORT, serve
+from app.presentation.handlers import (
+    TaskListHandler, TaskDetailHandler, TaskStatsHandler, TaskBulkHandler, TaskCommentsHandler, TaskSearchHandler,
+    TaskEventsHandler, MetricsHandler,
+)
 
 def make_app():
     return tornado.web.Application([
         (r"/tasks", TaskListHandler), # Ruta para GET y POST /tasks
+        (r"/tasks/stats", TaskStatsHandler), # Contadores agregados para el dashboard
+        (r"/tasks/search", TaskSearchHandler), # Búsqueda por palabras, ordenada por relevancia
+        (r"/tasks/events", TaskEventsHandler), # Cambios en vivo (Server-Sent Events)
+        (r"/tasks/bulk", TaskBulkHandler), # Alta, modificación y borrado por lotes
         (r"/tasks/([0-9]+)", TaskDetailHandler), # Ruta para GET, PUT, DELETE /tasks/{id}
-    ])
+        (r"/tasks/([0-9]+)/comments", TaskCommentsHandler), # Comentarios paginados de una tarea
+        (r"/metrics", MetricsHandler), # Métricas en formato de texto de Prometheus
+    ], transforms=build_transforms()) # gzip/brotli por encima de HTTP_COMPRESSION_MIN_BYTES
+
+async def on_start():
+    await task_cache.start()
+    # LISTEN de los eventos de los demás workers
+    await task_events.start()
+    # Primer health check de las réplicas y comprobaciones periódicas
+    await database.replica_router.start()
+
+async def on_stop():
+    # Las conexiones de /tasks/events terminan (el cliente reconecta a otro worker) y se cierra el LISTEN
+    await task_events.close()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor Tornado de la API de tareas.")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8888)))
+    parser.add_argument("--processes", type=int, default=WEB_PROCESSES,
+                        help="Workers a lanzar con fork (0 = uno por núcleo).")
+    parser.add_argument("--reuse-port", action="store_true", default=WEB_REUSE_PORT,
+                        help="Un socket SO_REUSEPORT por worker en lugar de un socket compartido.")
+    parser.add_argument("--drain-timeout", type=float, default=WEB_DRAIN_TIMEOUT,
+                        help="Segundos de espera a las peticiones en curso tras SIGTERM.")
+    parser.add_argument("--max-restarts", type=int, default=WEB_MAX_RESTARTS,
+                        help="Reinicios de workers caídos antes de abortar.")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    port = int(os.getenv("PORT", 8888))
-    app = make_app()
-    app.listen(port)
-    print(f"Servidor Tornado escuchando en http://localhost:{port}")
-    tornado.ioloop.IOLoop.current().start()
\ No newline at end of file
+    args = parse_args()
+    print(f"Servidor Tornado escuchando en http://localhost:{args.port}")
+    serve(
+        make_app,
+        args.port,
+        processes=args.processes,
+        reuse_port=args.reuse_port,
+        drain_timeout=args.drain_timeout,
+        max_restarts=args.max_restarts,
+        on_start=on_start,
+        on_stop=on_stop,
+    )
@@ -0,0 +1,145 @@
+import gzip
+import os
+import zlib
+from typing import Dict, Optional, Tuple
+
+import tornado.httputil
+import tornado.web
+
+from app.infrastructure import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se ofrece gzip
+    brotli = None
+
+# Codificaciones por orden de preferencia del servidor ("" u "off" desactiva la compresión)
+HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "br,gzip")
+# Las respuestas más pequeñas (p. ej. el detalle de una tarea) se envían sin comprimir
+HTTP_COMPRESSION_MIN_BYTES = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", 1024))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", 6))
+# La calidad por defecto de brotli (11) es demasiado lenta para respuestas dinámicas
+HTTP_BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/plain")
+
+COMPRESSED_RESPONSES = metrics.counter(
+    "http_compressed_responses_total", "Respuestas comprimidas.", ["encoding", "source"]
+)
+
+def enabled_encodings(setting: str = HTTP_COMPRESSION) -> Tuple[str, ...]:
+    encodings = [encoding.strip() for encoding in setting.split(",")]
+    return tuple(
+        encoding for encoding in encodings
+        if encoding == "gzip" or (encoding == "br" and brotli is not None)
+    )
+
+ENCODINGS = enabled_encodings()
+
+def negotiate(accept_encoding: str, encodings: Tuple[str, ...] = None) -> Optional[str]:
+    """Primera codificación habilitada que el cliente acepta (ignora las marcadas con q=0)."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        _, _, quality = params.replace(" ", "").partition("q=")
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in ENCODINGS if encodings is None else encodings:
+        if encoding in accepted:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=HTTP_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=HTTP_GZIP_LEVEL)
+
+class PrecompressedBody:
+    """
+    Cuerpo serializado junto con sus versiones comprimidas, calculadas una sola vez al guardarlo
+    en caché: los aciertos sirven los bytes comprimidos sin volver a comprimir.
+    """
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.variants: Dict[str, bytes] = {}
+        if len(body) >= HTTP_COMPRESSION_MIN_BYTES:
+            self.variants = {encoding: compress(body, encoding) for encoding in ENCODINGS}
+
+    def __len__(self) -> int:
+        # Tamaño que contabiliza PayloadCache: el cuerpo y todas sus variantes
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        encoding = negotiate(accept_encoding, tuple(self.variants))
+        if encoding is None:
+            return None, self.body
+        COMPRESSED_RESPONSES.inc(encoding=encoding, source="cache")
+        return encoding, self.variants[encoding]
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(HTTP_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, chunk: bytes, finishing: bool) -> bytes:
+        flush = zlib.Z_FINISH if finishing else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(chunk) + self._compressor.flush(flush)
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=HTTP_BROTLI_QUALITY)
+
+    def process(self, chunk: bytes, finishing: bool) -> bytes:
+        data = self._compressor.process(chunk)
+        return data + (self._compressor.finish() if finishing else self._compressor.flush())
+
+class CompressionTransform(tornado.web.OutputTransform):
+    """
+    Sustituye a GZipContentEncoding de Tornado: gzip o brotli según Accept-Encoding y un umbral
+    configurable. Las respuestas en streaming se comprimen por bloques (con flush en cada uno) y las
+    que el handler ya envía comprimidas (llevan Content-Encoding) pasan sin tocar.
+    """
+
+    def __init__(self, request: tornado.httputil.HTTPServerRequest):
+        self._encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        self._stream = None
+
+    def transform_first_chunk(self, status_code: int, headers: tornado.httputil.HTTPHeaders,
+                              chunk: bytes, finishing: bool):
+        if "Vary" in headers:
+            headers["Vary"] += ", Accept-Encoding"
+        else:
+            headers["Vary"] = "Accept-Encoding"
+        content_type = headers.get("Content-Type", "").split(";")[0].strip()
+        if (
+            self._encoding is None
+            or "Content-Encoding" in headers
+            or content_type not in COMPRESSIBLE_TYPES
+            or (finishing and len(chunk) < HTTP_COMPRESSION_MIN_BYTES)
+        ):
+            return status_code, headers, chunk
+
+        self._stream = _BrotliStream() if self._encoding == "br" else _GzipStream()
+        headers["Content-Encoding"] = self._encoding
+        COMPRESSED_RESPONSES.inc(encoding=self._encoding, source="transform")
+        chunk = self.transform_chunk(chunk, finishing)
+        if "Content-Length" in headers:
+            if finishing:
+                headers["Content-Length"] = str(len(chunk))
+            else:
+                del headers["Content-Length"]
+        return status_code, headers, chunk
+
+    def transform_chunk(self, chunk: bytes, finishing: bool) -> bytes:
+        if self._stream is None:
+            return chunk
+        return self._stream.process(chunk, finishing)
+
+def build_transforms() -> list:
+    """Transformaciones de salida de la Application: ninguna si la compresión está desactivada."""
+    return [CompressionTransform] if ENCODINGS else []
@@ -0,0 +1,43 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+# Validadores HTTP (ETag / Last-Modified) para peticiones condicionales
+
+def task_etag(task_id: int, updated_at: datetime, fields: Optional[Tuple[str, ...]] = None) -> str:
+    # Cada proyección (?fields=) es una representación distinta y necesita su propio ETag fuerte
+    version = f'{task_id}-{updated_at.strftime("%Y%m%d%H%M%S%f")}'
+    if fields:
+        version += "-" + hashlib.sha1(",".join(fields).encode()).hexdigest()[:8]
+    return f'"{version}"'
+
+def collection_etag(version: str, query_string: str) -> str:
+    # La página depende de los parámetros de consulta, así que también forman parte del ETag
+    return '"' + hashlib.sha1(f"{version}|{query_string}".encode()).hexdigest() + '"'
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Comparación fuerte para If-Match: acepta "*" o una lista de ETags."""
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def modified_since(last_modified: datetime, header: str) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # Las fechas HTTP tienen resolución de segundos
+    return last_modified.replace(microsecond=0) > since
+
+def pack_cached_task(etag: str, updated_at: datetime, body: str) -> str:
+    """La entrada de caché guarda el ETag y updated_at junto al cuerpo (JSON nunca contiene saltos de línea)."""
+    return f"{etag}\n{updated_at.isoformat()}\n{body}"
+
+def unpack_cached_task(entry: str) -> Tuple[str, datetime, str]:
+    etag, updated_at, body = entry.split("\n", 2)
+    return etag, datetime.fromisoformat(updated_at), body
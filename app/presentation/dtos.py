@@ -1,6 +1,15 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field, conint
+from pydantic import BaseModel, Field, conint, validator
+
+# Las consultas y selecciones son objetos del dominio (los usan los puertos y los repositorios);
+# se reexportan aquí porque también son los DTOs con los que los handlers validan la petición
+from app.domain.queries import (
+    COMMENT_RESPONSE_FIELDS, DEFAULT_COMMENT_PAGE_SIZE, DEFAULT_PAGE_SIZE, INCLUDE_OPTIONS, MAX_BULK_ITEMS,
+    MAX_PAGE_SIZE, SORT_FIELDS, TASK_RESPONSE_FIELDS, TaskBulkSelectionDTO, TaskFieldsDTO, TaskFilterDTO,
+    TaskListQueryDTO, TaskSearchQueryDTO,
+)
+
 
 class TaskCreateDTO(BaseModel):
     title: str = Field(..., min_length=3, max_length=100)
@@ -17,6 +26,7 @@ class TaskUpdateDTO(BaseModel):
     priority: Optional[conint(ge=1, le=3)] = None
     category: Optional[str] = Field(None, max_length=50)
 
+# Mismos campos y en el mismo orden que TASK_RESPONSE_FIELDS
 class TaskResponseDTO(BaseModel):
     id: int
     title: str
@@ -29,4 +39,51 @@ class TaskResponseDTO(BaseModel):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class CommentCreateDTO(BaseModel):
+    content: str = Field(..., min_length=1, max_length=1000)
+
+# Mismos campos y en el mismo orden que COMMENT_RESPONSE_FIELDS
+class CommentResponseDTO(BaseModel):
+    id: int
+    task_id: int
+    content: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class CommentListQueryDTO(BaseModel):
+    limit: conint(ge=1, le=MAX_PAGE_SIZE) = DEFAULT_COMMENT_PAGE_SIZE
+    cursor: Optional[str] = None
+
+class CommentPageDTO(BaseModel):
+    # Filas en el orden de COMMENT_RESPONSE_FIELDS, como TaskPageDTO
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+class TaskPageDTO(BaseModel):
+    # Filas de la base de datos en el orden de TASK_RESPONSE_FIELDS: datos de confianza, no se revalidan
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    # Con ?include=comments: filas de comentarios por id de tarea, leídas en una sola consulta
+    comments: Optional[Dict[int, List[Any]]] = None
+
+class TaskStatsDTO(BaseModel):
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    overdue: int = 0
+    by_priority: Dict[int, int] = {}
+    by_category: Dict[str, int] = {}
+    uncategorized: int = 0
+
+class TaskBulkUpdateDTO(TaskBulkSelectionDTO):
+    changes: TaskUpdateDTO
+
+    @validator("changes")
+    def validate_changes(cls, value):
+        if not value.dict(exclude_unset=True):
+            raise ValueError("'changes' must set at least one field")
+        return value
@@ -1,9 +1,41 @@
+import tornado.escape
+import tornado.iostream
 import tornado.web
 import json
-from app.application.use_cases import TaskUseCases
+import functools
+import math
+from datetime import datetime
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+from app.application.use_cases import TaskUseCases, AsyncTaskUseCases
 from app.adapters.sqlalchemy_task_repository import SQLAlchemyTaskRepository
-from app.infrastructure.database import SessionLocal, get_db
-from app.presentation.dtos import TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO
+from app.adapters.sqlalchemy_async_task_repository import SQLAlchemyAsyncTaskRepository
+from app.adapters.search_index import task_search_index
+from app.infrastructure import database
+from app.infrastructure.admission import RATE_LIMITED, admission, rate_limiter
+from app.infrastructure.database import SessionLocal, get_db, get_async_db
+from app.application.batching import GroupCommitBatcher
+from app.application.events import EVENT_RESETS, EVENT_SUBSCRIBERS
+from app.application.idempotency import IDEMPOTENCY_REQUESTS, REPLAYED_HEADERS, StoredResponse, request_fingerprint
+from app.infrastructure.cache import (
+    idempotency_store, read_coalescer, task_cache, task_list_cache, task_list_version,
+)
+from app.infrastructure.events import TASK_EVENTS_HEARTBEAT, TASK_EVENTS_RETRY_MS, task_events
+from app.infrastructure.executor import DatabaseExecutor, get_db_executor
+from app.infrastructure import instrumentation
+from app.infrastructure.instrumentation import RequestTimings, observe_request, start_request
+from app.infrastructure.metrics import REGISTRY
+from app.infrastructure.server import HTTP_IN_FLIGHT
+from app.presentation.compression import PrecompressedBody
+from app.presentation.conditional import (
+    body_etag, collection_etag, etag_matches, modified_since, pack_cached_task, task_etag, unpack_cached_task,
+)
+from app.presentation.dtos import (
+    MAX_BULK_ITEMS, TASK_RESPONSE_FIELDS, CommentCreateDTO, CommentListQueryDTO, TaskBulkSelectionDTO, TaskBulkUpdateDTO, TaskCreateDTO, TaskFieldsDTO,
+    TaskListQueryDTO, TaskSearchQueryDTO,
+    TaskResponseDTO, TaskUpdateDTO,
+)
+from app.presentation.serialization import comment_encoder, task_encoder, task_encoder_for
 from pydantic import ValidationError
 
 def with_db_session(func):
@@ -11,22 +43,196 @@ def with_db_session(func):
         db = next(get_db())
         try:
             task_repo = SQLAlchemyTaskRepository(db)
-            task_use_cases = TaskUseCases(task_repo)
+            task_use_cases = TaskUseCases(task_repo, task_events)
             return func(self, task_use_cases, *args, **kwargs)
         finally:
             db.close()
     return wrapper
 
+def with_async_db_session(func):
+    """Igual que with_db_session, pero la sesión es asíncrona y el handler se espera
+    dentro de ella: las consultas ceden el IOLoop en lugar de bloquearlo."""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        async with get_async_db(self.replica) as db:
+            task_repo = SQLAlchemyAsyncTaskRepository(db)
+            task_use_cases = TimedUseCases(AsyncTaskUseCases(task_repo, task_events), self.timings)
+            return await func(self, task_use_cases, *args, **kwargs)
+    return wrapper
+
+def _run_use_case(method_name: str, args: tuple, kwargs: dict, replica=None):
+    # Unidad de trabajo completa dentro del hilo: sesión, caso de uso y conversión a DTO
+    db = next(get_db(replica))
+    try:
+        # Los eventos de escritura se publican desde este hilo: ChangeFeed los lleva al IOLoop
+        task_use_cases = TaskUseCases(SQLAlchemyTaskRepository(db), task_events)
+        return getattr(task_use_cases, method_name)(*args, **kwargs)
+    finally:
+        db.close()
+
+def _stream_tasks(query: TaskListQueryDTO, replica=None):
+    # Generador que mantiene la sesión abierta mientras dura la exportación
+    db = next(get_db(replica))
+    try:
+        yield from TaskUseCases(SQLAlchemyTaskRepository(db)).stream_tasks(query)
+    finally:
+        db.close()
+
+async def _create_tasks_batch(tasks_data: list) -> list:
+    """Unidad de trabajo de un lote de altas: no pertenece a ninguna petición, abre su propia sesión."""
+    if database.DB_SESSION_MODE == "executor":
+        return await get_db_executor().run(_run_use_case, "create_tasks", (tasks_data,), {})
+    async with get_async_db() as db:
+        return await AsyncTaskUseCases(SQLAlchemyAsyncTaskRepository(db), task_events).create_tasks(tasks_data)
+
+# Sólo se usa con TASK_CREATE_BATCHING; create_tasks devuelve las filas en el orden de inserción
+task_create_batcher = GroupCommitBatcher(
+    _create_tasks_batch, database.TASK_CREATE_BATCH_MAX_SIZE, database.TASK_CREATE_BATCH_WINDOW
+)
+
+class TimedUseCases:
+    """Acumula en RequestTimings el tiempo de cada caso de uso (consultas incluidas)."""
+
+    def __init__(self, use_cases, timings: RequestTimings):
+        self._use_cases = use_cases
+        self._timings = timings
+
+    def stream_tasks(self, query: TaskListQueryDTO):
+        # La exportación intercala lectura y escritura: su tiempo sólo se refleja en el total
+        return self._use_cases.stream_tasks(query)
+
+    def __getattr__(self, method_name: str):
+        method = getattr(self._use_cases, method_name)
+
+        async def call(*args, **kwargs):
+            with self._timings.measure("use_case"):
+                return await method(*args, **kwargs)
+        return call
+
+class ExecutorTaskUseCases:
+    """Misma interfaz que AsyncTaskUseCases: cada llamada ejecuta el caso de uso
+    síncrono en el DatabaseExecutor y se espera sin bloquear el IOLoop."""
+
+    def __init__(self, executor: DatabaseExecutor, replica=None):
+        self.executor = executor
+        self.replica = replica
+
+    def __getattr__(self, method_name: str):
+        async def call(*args, **kwargs):
+            return await self.executor.run(_run_use_case, method_name, args, kwargs, self.replica)
+        return call
+
+    async def stream_tasks(self, query: TaskListQueryDTO):
+        # Cada bloque se lee en el executor; entre bloques el hilo queda libre
+        chunks = _stream_tasks(query, self.replica)
+        try:
+            while True:
+                chunk = await self.executor.run(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            await self.executor.run(chunks.close)
+
+# Métodos que pueden leer de una réplica
+READ_METHODS = ("GET", "HEAD")
+
+def with_task_use_cases(func):
+    """
+    Inyecta los casos de uso según DB_SESSION_MODE ("async" o "executor"). Las lecturas (GET)
+    se sirven desde una réplica si las hay; las escrituras, siempre desde el primario.
+    """
+    async_handler = with_async_db_session(func)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        read_only = self.request.method in READ_METHODS
+        with database.replica_router.route(self.request.remote_ip, read_only) as replica:
+            self.replica = replica
+            if database.DB_SESSION_MODE != "executor":
+                return await async_handler(self, *args, **kwargs)
+
+            executor = get_db_executor()
+            if not executor.try_acquire():
+                self.send_error(503, reason="Database executor saturated", retry_after=1)
+                return
+            try:
+                use_cases = ExecutorTaskUseCases(executor, self.replica)
+                return await func(self, TimedUseCases(use_cases, self.timings), *args, **kwargs)
+            finally:
+                executor.release()
+    return wrapper
+
+# Longitud máxima de Idempotency-Key (un UUID ocupa 36)
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+def idempotent(func):
+    """
+    Idempotency-Key en escrituras: la primera petición con una clave se ejecuta y su respuesta se
+    guarda; los reintentos (y los duplicados que llegan mientras sigue en curso) la reciben tal cual,
+    sin abrir una sesión ni repetir la escritura. Sin cabecera, el handler se ejecuta como siempre.
+    Debe ir por encima de with_task_use_cases.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        key = self.request.headers.get("Idempotency-Key")
+        if key is None:
+            return await func(self, *args, **kwargs)
+        if not 0 < len(key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+            self.send_error(400, reason="Invalid Idempotency-Key")
+            return
+        fingerprint = request_fingerprint(self.request.method, self.request.path, self.request.body)
+        scope = f"{self.request.method}:{self.request.path}:{key}"
+
+        async def execute():
+            stored = await idempotency_store.get(scope)
+            if stored is not None:
+                return stored, False
+            if not await idempotency_store.lock(scope):
+                # Otro proceso está ejecutando la misma clave
+                return None, False
+            try:
+                self._recorded = []
+                await func(self, *args, **kwargs)
+                response = self.recorded_response(fingerprint)
+                await idempotency_store.save(scope, response)
+                return response, True
+            finally:
+                await idempotency_store.unlock(scope)
+
+        (response, executed), shared = await idempotency_store.single_flight.do(scope, execute)
+        if executed and not shared:
+            IDEMPOTENCY_REQUESTS.inc(outcome="executed")
+        elif response is None:
+            IDEMPOTENCY_REQUESTS.inc(outcome="conflict")
+            self.send_error(409, reason="A request with this Idempotency-Key is in progress", retry_after=1)
+        elif response.fingerprint != fingerprint:
+            IDEMPOTENCY_REQUESTS.inc(outcome="mismatch")
+            self.send_error(422, reason="Idempotency-Key reused with a different request")
+        else:
+            IDEMPOTENCY_REQUESTS.inc(outcome="coalesced" if shared else "replayed")
+            self.replay(response)
+    return wrapper
+
 class BaseHandler(tornado.web.RequestHandler):
+    # Réplica de lectura elegida por with_task_use_cases (None = primario)
+    replica = None
+    # Las conexiones de larga duración (SSE) no ocupan plaza en el límite global de concurrencia
+    admission_controlled = True
+    # Cuerpo escrito hasta ahora, sólo mientras @idempotent lo necesita para guardarlo
+    _recorded = None
+
     def set_default_headers(self):
         self.set_header("Access-Control-Allow-Origin", "http://localhost:3000")
         
-        self.set_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
+        self.set_header("Access-Control-Allow-Methods", "GET, POST, PUT, PATCH, DELETE, OPTIONS")
 
-        self.set_header("Access-Control-Allow-Headers", "Content-Type, Access-Control-Allow-Headers, Authorization, X-Requested-With")
+        self.set_header("Access-Control-Allow-Headers", "Content-Type, Access-Control-Allow-Headers, Authorization, X-Requested-With, If-Match, If-None-Match, If-Modified-Since, Idempotency-Key")
 
         self.set_header("Access-Control-Allow-Credentials", "true")
 
+        self.set_header("Access-Control-Expose-Headers", "Link, X-Next-Cursor, ETag, Last-Modified, Retry-After, Idempotent-Replayed")
+
         self.set_header("Content-Type", "application/json") 
 
     def options(self):
@@ -34,6 +240,14 @@ class BaseHandler(tornado.web.RequestHandler):
         self.finish()
 
     def prepare(self):
+        # El drenado de SIGTERM espera a que este contador llegue a cero
+        HTTP_IN_FLIGHT.inc()
+        self._in_flight = True
+        self.timings = start_request()
+        self.response_size = 0
+        self.json_data = {}
+        if not self.admit():
+            return
         if self.request.body:
             try:
                 self.json_data = json.loads(self.request.body)
@@ -43,7 +257,174 @@ class BaseHandler(tornado.web.RequestHandler):
         else:
             self.json_data = {}
 
+    def admit(self) -> bool:
+        """
+        Rate limit por cliente y ruta (429) y control de admisión global (503), ambos con Retry-After.
+        Se comprueba antes de leer el cuerpo o abrir una sesión: rechazar no cuesta nada.
+        """
+        if self.request.method == "OPTIONS":
+            return True
+        route = type(self).__name__
+        wait = rate_limiter.acquire((self.request.remote_ip, route))
+        if wait:
+            RATE_LIMITED.inc(route=route)
+            self.send_error(429, reason="Too Many Requests", retry_after=math.ceil(wait))
+            return False
+        if self.admission_controlled:
+            if admission.try_acquire() is not None:
+                self.send_error(503, reason="Server overloaded", retry_after=1)
+                return False
+            self._admitted = True
+        return True
+
+    def write(self, chunk):
+        if isinstance(chunk, (str, bytes)):
+            chunk = tornado.escape.utf8(chunk)
+            self.response_size = getattr(self, "response_size", 0) + len(chunk)
+            if self._recorded is not None:
+                self._recorded.append(chunk)
+        super().write(chunk)
+
+    def recorded_response(self, fingerprint: str) -> StoredResponse:
+        headers = {name: self._headers[name] for name in REPLAYED_HEADERS if name in self._headers}
+        body = b"".join(self._recorded).decode()
+        return StoredResponse(fingerprint, self.get_status(), self._reason, headers, body)
+
+    def replay(self, response: StoredResponse):
+        """Reenvía una respuesta guardada por @idempotent."""
+        self.set_status(response.status, reason=response.reason)
+        for name, value in response.headers.items():
+            self.set_header(name, value)
+        self.set_header("Idempotent-Replayed", "true")
+        if response.body:
+            self.write(response.body)
+
+    def dumps(self, payload) -> str:
+        with self.timings.measure("serialize"):
+            return json.dumps(payload, default=str)
+
+    def dumps_task(self, task) -> str:
+        with self.timings.measure("serialize"):
+            return task_encoder.task(task)
+
+    def dumps_task_row(self, row, fields=TASK_RESPONSE_FIELDS) -> str:
+        with self.timings.measure("serialize"):
+            return task_encoder_for(fields).row(row)
+
+    def dumps_tasks(self, rows, fields=TASK_RESPONSE_FIELDS, comments=None) -> str:
+        # Filas leídas de nuestra propia base de datos: se serializan sin revalidar con pydantic
+        with self.timings.measure("serialize"):
+            if comments is None:
+                return task_encoder_for(fields).array(rows)
+            return task_encoder_for(fields).array_with(
+                rows, "comments", lambda row: comment_encoder.array(comments.get(row.id, ()))
+            )
+
+    def page_headers(self, next_cursor: Optional[str]) -> dict:
+        if not next_cursor:
+            return {}
+        next_url = self.request.path + "?" + urlencode({**self.query_arguments(), "cursor": next_cursor})
+        return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
+    async def invalidate_tasks(self, task_ids):
+        """Tras una escritura: invalida el detalle de cada tarea, las páginas de listado y el índice de búsqueda local."""
+        await task_cache.invalidate_many(task_ids)
+        # Nueva versión del listado: cambia su ETag y deja huérfanas las páginas cacheadas
+        await task_list_version.bump()
+        task_search_index.mark_dirty(task_ids)
+        read_coalescer.invalidate()
+
+    async def coalesce(self, key, load):
+        """Ejecuta load() o, si hay una lectura idéntica en curso en esta ruta, espera su resultado."""
+        # Quien lee del primario (read-your-writes) no se une a una lectura de réplica, que puede ir atrasada
+        return await read_coalescer.do(type(self).__name__, (self.replica is None, key), load)
+
+    def write_precompressed(self, response: PrecompressedBody):
+        """Escribe una respuesta cacheada eligiendo la variante ya comprimida que acepte el cliente."""
+        for name, value in response.headers.items():
+            self.set_header(name, value)
+        encoding, body = response.select(self.request.headers.get("Accept-Encoding", ""))
+        if encoding is not None:
+            # Con Content-Encoding ya fijado, CompressionTransform no vuelve a comprimir
+            self.set_header("Content-Encoding", encoding)
+        self.write(body)
+
+    def finish(self, chunk=None):
+        # Las respuestas en streaming ya enviaron sus cabeceras: no llevan Server-Timing
+        timings = getattr(self, "timings", None)
+        if instrumentation.SERVER_TIMING and timings is not None and not self._headers_written:
+            self.set_header("Server-Timing", timings.server_timing(self.request.request_time()))
+        return super().finish(chunk)
+
+    def on_finish(self):
+        if self.request.method not in READ_METHODS + ("OPTIONS",) and self.get_status() < 400:
+            # Read-your-writes: durante un rato, las lecturas de este cliente van al primario
+            database.replica_router.record_write(self.request.remote_ip)
+        if getattr(self, "_admitted", False):
+            self._admitted = False
+            admission.release()
+        if getattr(self, "_in_flight", False):
+            self._in_flight = False
+            HTTP_IN_FLIGHT.dec()
+        if getattr(self, "timings", None) is not None:
+            observe_request(
+                type(self).__name__, self.request.method, self.get_status(),
+                self.request.request_time(), self.response_size, self.timings,
+            )
+
+    def query_arguments(self) -> dict:
+        return {name: self.get_query_argument(name) for name in self.request.query_arguments}
+
+    def set_validators(self, etag: str, last_modified: Optional[datetime]):
+        self.set_header("Etag", etag)
+        if last_modified is not None:
+            self.set_header("Last-Modified", last_modified)
+
+    def not_modified(self, etag: str, last_modified: Optional[datetime]) -> bool:
+        """Fija ETag/Last-Modified y responde 304 si la copia del cliente sigue vigente."""
+        self.set_validators(etag, last_modified)
+        if self.request.headers.get("If-None-Match") is not None:
+            fresh = self.check_etag_header()
+        elif self.request.headers.get("If-Modified-Since") and last_modified is not None:
+            fresh = not modified_since(last_modified, self.request.headers["If-Modified-Since"])
+        else:
+            fresh = False
+        if fresh:
+            self.set_status(304)
+        return fresh
+
+    def is_conditional(self) -> bool:
+        return "If-None-Match" in self.request.headers or "If-Modified-Since" in self.request.headers
+
+    async def check_if_match(self, task_use_cases, task_id: int) -> Tuple[bool, Optional[datetime]]:
+        """
+        Concurrencia optimista con If-Match. Devuelve (procede, versión esperada): la comprobación
+        descarta pronto los ETags viejos y la escritura repite la versión en su WHERE, así dos
+        escrituras con el mismo ETag no pueden pasar las dos. Con "*" basta con que exista.
+        """
+        if_match = self.request.headers.get("If-Match")
+        if if_match is None:
+            return True, None
+        updated_at = await task_use_cases.get_task_version(task_id)
+        if updated_at is None:
+            self.send_error(404, reason="Task not found")
+            return False, None
+        if not etag_matches(if_match, task_etag(task_id, updated_at)):
+            self.send_error(412, reason="Precondition Failed")
+            return False, None
+        any_version = "*" in (candidate.strip() for candidate in if_match.split(","))
+        return True, None if any_version else updated_at
+
+    def write_conflict(self, expected_version: Optional[datetime]):
+        # Sin filas afectadas: con versión esperada, otra escritura ganó la carrera
+        if expected_version is not None:
+            self.send_error(412, reason="Precondition Failed")
+        else:
+            self.send_error(404, reason="Task not found")
+
     def write_error(self, status_code, **kwargs):
+        if "retry_after" in kwargs:
+            self.set_header("Retry-After", str(kwargs["retry_after"]))
         if "reason" in kwargs:
             self.set_status(status_code, reason=kwargs["reason"])
             self.write(json.dumps({"error": kwargs["reason"]}))
@@ -52,50 +433,200 @@ class BaseHandler(tornado.web.RequestHandler):
         self.finish()
 
 class TaskListHandler(BaseHandler):
-    @with_db_session
-    async def get(self, task_use_cases: TaskUseCases):
-        tasks = task_use_cases.get_all_tasks()
-        self.write(json.dumps([task.dict() for task in tasks], default=str))
+    def wants_stream(self) -> bool:
+        accept = self.request.headers.get("Accept", "")
+        return "application/x-ndjson" in accept or self.get_query_argument("stream", "0") in ("1", "true")
+
+    async def stream(self, task_use_cases: AsyncTaskUseCases, query: TaskListQueryDTO):
+        """
+        Exportación completa en streaming: cada bloque leído del cursor de servidor se escribe
+        y se envía (flush) antes de leer el siguiente, así la memoria no crece con el número de filas.
+        NDJSON si el cliente lo acepta; si no, un array JSON enviado por partes.
+        """
+        ndjson = "application/x-ndjson" in self.request.headers.get("Accept", "")
+        self.set_header("Content-Type", "application/x-ndjson" if ndjson else "application/json")
+        separator = "\n" if ndjson else ", "
+        first = True
+        if not ndjson:
+            self.write("[")
+        try:
+            async for tasks in task_use_cases.stream_tasks(query):
+                with self.timings.measure("serialize"):
+                    rows = task_encoder_for(query.response_fields).rows(tasks, separator)
+                if ndjson:
+                    rows += "\n"
+                elif not first:
+                    rows = separator + rows
+                first = False
+                self.write(rows)
+                await self.flush()
+            if not ndjson:
+                self.write("]")
+        except tornado.iostream.StreamClosedError:
+            # El cliente cerró la conexión: se deja de leer del cursor
+            pass
+
+    @with_task_use_cases
+    async def get(self, task_use_cases: AsyncTaskUseCases):
+        try:
+            query = TaskListQueryDTO(**self.query_arguments())
+        except ValidationError as e:
+            self.send_error(400, reason=f"Validation Error: {e.errors()}")
+            return
+
+        if self.wants_stream():
+            await self.stream(task_use_cases, query)
+            return
+
+        async def load_page() -> PrecompressedBody:
+            page = await task_use_cases.list_tasks(query)
+            headers = self.page_headers(page.next_cursor)
+            body = self.dumps_tasks(page.items, query.response_fields, page.comments)
+            # Se comprime una vez por versión de la colección, no en cada petición
+            with self.timings.measure("serialize"):
+                return PrecompressedBody(tornado.escape.utf8(body), headers)
+
+        async def load_cached_page() -> PrecompressedBody:
+            token = task_list_cache.read_token()
+            response = await load_page()
+            task_list_cache.set(etag, response, token)
+            return response
+
+        try:
+            if self.replica is not None:
+                # Lo leído de una réplica puede ir por detrás de la versión: su ETag sale del propio cuerpo y no se cachea
+                response = await self.coalesce(("page", self.request.query), load_page)
+                if self.not_modified(body_etag(response.body), None):
+                    return
+            else:
+                # La versión se lee antes que la página: si se cuela una escritura, el ETag queda más viejo que el cuerpo.
+                # Es un get en la caché, no un recuento de la tabla: el coste de la petición sigue siendo el de la página
+                etag = collection_etag(await task_list_version.get(), self.request.query)
+                if self.not_modified(etag, None):
+                    return
+                response = task_list_cache.get(etag)
+                if response is None:
+                    response = await self.coalesce(("page", etag), load_cached_page)
+        except ValueError:
+            self.send_error(400, reason="Invalid cursor")
+            return
+        self.write_precompressed(response)
 
-    @with_db_session
-    async def post(self, task_use_cases: TaskUseCases):
+    @idempotent
+    @with_task_use_cases
+    async def post(self, task_use_cases: AsyncTaskUseCases):
         try:
             task_data = TaskCreateDTO(**self.json_data)
-            new_task = task_use_cases.create_task(task_data)
+            if database.TASK_CREATE_BATCHING:
+                # Group commit: se escribe junto con las altas concurrentes en un solo INSERT
+                with self.timings.measure("use_case"):
+                    new_task = await task_create_batcher.submit(task_data)
+            else:
+                new_task = await task_use_cases.create_task(task_data)
+            await self.invalidate_tasks([new_task.id])
             self.set_status(201)
-            self.write(json.dumps(new_task.dict(), default=str))
+            self.write(self.dumps_task(new_task))
         except ValidationError as e:
             self.send_error(400, reason=f"Validation Error: {e.errors()}")
         except Exception as e:
             self.send_error(500, reason=f"Internal Server Error: {str(e)}")
 
+class TaskSearchHandler(BaseHandler):
+    @with_task_use_cases
+    async def get(self, task_use_cases: AsyncTaskUseCases):
+        try:
+            query = TaskSearchQueryDTO(**self.query_arguments())
+        except ValidationError as e:
+            self.send_error(400, reason=f"Validation Error: {e.errors()}")
+            return
+        # Sin PostgreSQL, el índice de búsqueda en memoria sólo vuelve a la tabla si la versión del listado cambió
+        task_search_index.observe(await task_list_version.get())
+        try:
+            page = await task_use_cases.search_tasks(query)
+        except ValueError:
+            self.send_error(400, reason="Invalid cursor")
+            return
+        for name, value in self.page_headers(page.next_cursor).items():
+            self.set_header(name, value)
+        self.write(self.dumps_tasks(page.items, query.response_fields))
+
+class TaskStatsHandler(BaseHandler):
+    @with_task_use_cases
+    async def get(self, task_use_cases: AsyncTaskUseCases):
+        stats = await task_use_cases.get_task_stats()
+        self.write(self.dumps(stats.dict()))
+
 class TaskDetailHandler(BaseHandler):
     def options(self, task_id: str):
         self.set_status(204)
         self.finish()
         
-    @with_db_session
-    async def get(self, task_use_cases: TaskUseCases, task_id: str):
+    @with_task_use_cases
+    async def get(self, task_use_cases: AsyncTaskUseCases, task_id: str):
         try:
-            task = task_use_cases.get_task_by_id(int(task_id))
-            if task:
-                self.write(json.dumps(task.dict(), default=str))
-            else:
+            fields = TaskFieldsDTO(fields=self.get_query_argument("fields", None)).fields
+        except ValidationError as e:
+            self.send_error(400, reason=f"Validation Error: {e.errors()}")
+            return
+        try:
+            task_id = int(task_id)
+            if self.is_conditional():
+                # Sólo se lee updated_at: un 304 no hidrata ni serializa la tarea
+                updated_at = await self.coalesce(("version", task_id), lambda: task_use_cases.get_task_version(task_id))
+                if updated_at is not None and self.not_modified(task_etag(task_id, updated_at, fields), updated_at):
+                    return
+
+            if fields:
+                # La proyección no pasa por la caché: se leen de la base de datos sólo las columnas pedidas
+                async def load_fields():
+                    row = await task_use_cases.get_task_fields(task_id, fields)
+                    if row is None:
+                        return None
+                    return task_etag(task_id, row.updated_at, fields), row.updated_at, self.dumps_task_row(row, fields)
+
+                loaded = await self.coalesce(("fields", task_id, fields), load_fields)
+                if loaded is None:
+                    self.send_error(404, reason="Task not found")
+                    return
+                etag, updated_at, payload = loaded
+                self.set_validators(etag, updated_at)
+                self.write(payload)
+                return
+
+            async def load_task():
+                task = await task_use_cases.get_task_by_id(task_id)
+                if not task:
+                    return None
+                return pack_cached_task(task_etag(task.id, task.updated_at), task.updated_at, self.dumps_task(task))
+
+            # Lo leído de una réplica puede ir atrasado: se sirve, pero no se cachea
+            entry = await task_cache.get_or_load(task_id, load_task, store=self.replica is None)
+            if entry is None:
                 self.send_error(404, reason="Task not found")
+                return
+            etag, updated_at, payload = unpack_cached_task(entry)
+            self.set_validators(etag, updated_at)
+            self.write(payload)
         except ValueError:
             self.send_error(400, reason="Invalid Task ID")
         except Exception as e:
             self.send_error(500, reason=f"Internal Server Error: {str(e)}")
 
-    @with_db_session
-    async def put(self, task_use_cases: TaskUseCases, task_id: str):
+    @idempotent
+    @with_task_use_cases
+    async def put(self, task_use_cases: AsyncTaskUseCases, task_id: str):
         try:
             task_data = TaskUpdateDTO(**self.json_data)
-            updated_task = task_use_cases.update_task(int(task_id), task_data)
+            proceed, expected_version = await self.check_if_match(task_use_cases, int(task_id))
+            if not proceed:
+                return
+            updated_task = await task_use_cases.update_task(int(task_id), task_data, expected_version)
+            await self.invalidate_tasks([int(task_id)])
             if updated_task:
-                self.write(json.dumps(updated_task.dict(), default=str))
+                self.set_validators(task_etag(updated_task.id, updated_task.updated_at), updated_task.updated_at)
+                self.write(self.dumps_task(updated_task))
             else:
-                self.send_error(404, reason="Task not found")
+                self.write_conflict(expected_version)
         except ValidationError as e:
             self.send_error(400, reason=f"Validation Error: {e.errors()}")
         except ValueError:
@@ -103,15 +634,198 @@ class TaskDetailHandler(BaseHandler):
         except Exception as e:
             self.send_error(500, reason=f"Internal Server Error: {str(e)}")
 
-    @with_db_session
-    async def delete(self, task_use_cases: TaskUseCases, task_id: str):
+    @with_task_use_cases
+    async def delete(self, task_use_cases: AsyncTaskUseCases, task_id: str):
         try:
-            deleted = task_use_cases.delete_task(int(task_id))
+            proceed, expected_version = await self.check_if_match(task_use_cases, int(task_id))
+            if not proceed:
+                return
+            deleted = await task_use_cases.delete_task(int(task_id), expected_version)
+            await self.invalidate_tasks([int(task_id)])
             if deleted:
                 self.set_status(204)
             else:
-                self.send_error(404, reason="Task not found")
+                self.write_conflict(expected_version)
         except ValueError:
             self.send_error(400, reason="Invalid Task ID")
         except Exception as e:
-            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
\ No newline at end of file
+            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
+
+class TaskCommentsHandler(BaseHandler):
+    def options(self, task_id: str):
+        self.set_status(204)
+        self.finish()
+
+    @with_task_use_cases
+    async def get(self, task_use_cases: AsyncTaskUseCases, task_id: str):
+        try:
+            query = CommentListQueryDTO(**self.query_arguments())
+        except ValidationError as e:
+            self.send_error(400, reason=f"Validation Error: {e.errors()}")
+            return
+        try:
+            page = await task_use_cases.list_comments(int(task_id), query)
+        except ValueError:
+            self.send_error(400, reason="Invalid cursor")
+            return
+        if page is None:
+            self.send_error(404, reason="Task not found")
+            return
+        for name, value in self.page_headers(page.next_cursor).items():
+            self.set_header(name, value)
+        with self.timings.measure("serialize"):
+            self.write(comment_encoder.array(page.items))
+
+    @idempotent
+    @with_task_use_cases
+    async def post(self, task_use_cases: AsyncTaskUseCases, task_id: str):
+        try:
+            comment_data = CommentCreateDTO(**self.json_data)
+        except (TypeError, ValidationError) as e:
+            detail = e.errors() if isinstance(e, ValidationError) else "Expected an object"
+            self.send_error(400, reason=f"Validation Error: {detail}")
+            return
+        try:
+            comment = await task_use_cases.add_comment(int(task_id), comment_data)
+            if comment is None:
+                self.send_error(404, reason="Task not found")
+                return
+            # El comentario cambia updated_at de la tarea: su detalle y los listados cacheados quedan obsoletos
+            await self.invalidate_tasks([comment.task_id])
+            self.set_status(201)
+            self.write(self.dumps(comment.dict()))
+        except Exception as e:
+            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
+
+class TaskBulkHandler(BaseHandler):
+    """Operaciones por lotes: cada verbo resuelve todo el lote en una sola transacción."""
+
+    def not_found(self, selection: TaskBulkSelectionDTO, affected) -> list:
+        if selection.ids is None:
+            return []
+        affected = set(affected)
+        return [task_id for task_id in dict.fromkeys(selection.ids) if task_id not in affected]
+
+    @idempotent
+    @with_task_use_cases
+    async def post(self, task_use_cases: AsyncTaskUseCases):
+        items = self.json_data.get("tasks") if isinstance(self.json_data, dict) else self.json_data
+        if not isinstance(items, list) or not items:
+            self.send_error(400, reason="Expected a non-empty list of tasks")
+            return
+        if len(items) > MAX_BULK_ITEMS:
+            self.send_error(400, reason=f"Too many tasks (max {MAX_BULK_ITEMS})")
+            return
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append(TaskCreateDTO(**item))
+            except (TypeError, ValidationError) as e:
+                detail = e.errors() if isinstance(e, ValidationError) else "Expected an object"
+                errors.append({"index": index, "error": detail})
+        if not valid:
+            self.set_status(400)
+            self.write(self.dumps({"created": [], "errors": errors}))
+            return
+        try:
+            created = await task_use_cases.create_tasks(valid)
+            await self.invalidate_tasks([task.id for task in created])
+            self.set_status(201)
+            self.write(self.dumps({"created": [task.dict() for task in created], "errors": errors}))
+        except Exception as e:
+            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
+
+    @idempotent
+    @with_task_use_cases
+    async def patch(self, task_use_cases: AsyncTaskUseCases):
+        try:
+            bulk_update = TaskBulkUpdateDTO(**self.json_data)
+            updated = await task_use_cases.update_tasks(bulk_update)
+            await self.invalidate_tasks(updated)
+            self.write(self.dumps({"updated": updated, "not_found": self.not_found(bulk_update, updated)}))
+        except (TypeError, ValidationError) as e:
+            detail = e.errors() if isinstance(e, ValidationError) else "Expected an object"
+            self.send_error(400, reason=f"Validation Error: {detail}")
+        except ValueError as e:
+            # Filtro que supera MAX_BULK_ITEMS
+            self.send_error(400, reason=str(e))
+        except Exception as e:
+            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
+
+    @with_task_use_cases
+    async def delete(self, task_use_cases: AsyncTaskUseCases):
+        try:
+            selection = TaskBulkSelectionDTO(**self.json_data)
+            deleted = await task_use_cases.delete_tasks(selection)
+            await self.invalidate_tasks(deleted)
+            self.write(self.dumps({"deleted": deleted, "not_found": self.not_found(selection, deleted)}))
+        except (TypeError, ValidationError) as e:
+            detail = e.errors() if isinstance(e, ValidationError) else "Expected an object"
+            self.send_error(400, reason=f"Validation Error: {detail}")
+        except ValueError as e:
+            # Filtro que supera MAX_BULK_ITEMS
+            self.send_error(400, reason=str(e))
+        except Exception as e:
+            self.send_error(500, reason=f"Internal Server Error: {str(e)}")
+
+class TaskEventsHandler(BaseHandler):
+    """
+    Server-Sent Events con las altas, modificaciones y bajas de tareas, en lugar de que cada
+    pestaña vuelva a pedir el listado completo. EventSource reconecta solo y envía Last-Event-ID:
+    se reenvía lo que se perdió desde el buffer o, si ya no está, un evento "reset" (recargar).
+    """
+
+    admission_controlled = False
+
+    def prepare(self):
+        super().prepare()
+        # Una conexión abierta indefinidamente no retrasa el drenado: al cerrarse, el cliente reconecta a otro worker
+        if self._in_flight:
+            self._in_flight = False
+            HTTP_IN_FLIGHT.dec()
+
+    def reset_event(self) -> bytes:
+        EVENT_RESETS.inc()
+        return f"id: {task_events.event_id(task_events.last_id)}\nevent: reset\ndata: {{}}\n\n".encode()
+
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        # Sin buffering en proxies como nginx
+        self.set_header("X-Accel-Buffering", "no")
+        last_event_id = self.request.headers.get("Last-Event-ID") or self.get_query_argument("last_event_id", None)
+        position = task_events.last_id
+        if last_event_id:
+            resumed = task_events.parse_event_id(last_event_id)
+            if resumed is None:
+                self.write(self.reset_event())
+            else:
+                position = resumed
+        # El primer id fija desde dónde reanudar aunque aún no haya llegado ningún evento
+        self.write(f"retry: {TASK_EVENTS_RETRY_MS}\nid: {task_events.event_id(position)}\n\n")
+
+        EVENT_SUBSCRIBERS.inc()
+        try:
+            while True:
+                events = task_events.since(position)
+                if events is None:
+                    # La conexión se quedó atrás más de lo que guarda el buffer
+                    self.write(self.reset_event())
+                    position = task_events.last_id
+                elif events:
+                    self.write(b"".join(event.message for event in events))
+                    position = events[-1].id
+                await self.flush()
+                if task_events.closed:
+                    break
+                if not await task_events.wait(position, TASK_EVENTS_HEARTBEAT):
+                    self.write(": keep-alive\n\n")
+        except tornado.iostream.StreamClosedError:
+            pass
+        finally:
+            EVENT_SUBSCRIBERS.dec()
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(REGISTRY.render())
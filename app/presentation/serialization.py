@@ -0,0 +1,96 @@
+import functools
+import json
+import os
+from datetime import datetime
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
+
+from app.presentation.dtos import COMMENT_RESPONSE_FIELDS, TASK_RESPONSE_FIELDS, CommentResponseDTO, TaskResponseDTO
+
+# "json": salida idéntica byte a byte a json.dumps(dto.dict(), default=str) (por defecto).
+# "orjson": más rápido, pero JSON compacto y fechas ISO 8601 ("2025-07-20T09:00:00"); requiere `pip install orjson`
+TASK_JSON_ENCODER = os.getenv("TASK_JSON_ENCODER", "json")
+
+def _nullable(encode: Callable[[Any], str]) -> Callable[[Any], str]:
+    return lambda value: "null" if value is None else encode(value)
+
+def _field_encoder(field) -> Callable[[Any], str]:
+    """Codificador de un campo según su tipo en TaskResponseDTO, igual que json.dumps(default=str)."""
+    if field.type_ is bool:
+        encode = lambda value: "true" if value else "false"
+    elif field.type_ is int:
+        encode = int.__repr__
+    elif field.type_ is str:
+        encode = encode_basestring_ascii
+    elif field.type_ is datetime:
+        # str(datetime) sólo contiene caracteres ASCII que JSON no escapa
+        encode = lambda value: f'"{value}"'
+    else:
+        encode = lambda value: json.dumps(value, default=str)
+    return _nullable(encode) if field.allow_none else encode
+
+class TaskJSONEncoder:
+    """
+    Serializa tareas directamente desde filas (tuplas en el orden de `fields`),
+    sin construir TaskResponseDTO ni pasar cada fecha por el fallback default=str de json.dumps.
+    Las columnas sobrantes al final de la fila (las del cursor en una proyección) se ignoran.
+    Con `model=CommentResponseDTO` serializa igual las filas de comentarios.
+    """
+
+    ITEM_SEPARATOR = ", "
+    KEY_SEPARATOR = ": "
+
+    def __init__(self, fields: Tuple[str, ...] = TASK_RESPONSE_FIELDS, model=TaskResponseDTO):
+        self.fields = fields
+        self._template = "{" + ", ".join(f'"{field}": %s' for field in fields) + "}"
+        self._encoders = tuple(_field_encoder(model.__fields__[field]) for field in fields)
+        self._values = attrgetter(*fields) if len(fields) > 1 else lambda task: (getattr(task, fields[0]),)
+
+    def row(self, row: Sequence) -> str:
+        return self._template % tuple(encode(value) for encode, value in zip(self._encoders, row))
+
+    def rows(self, rows: Iterable[Sequence], separator: Optional[str] = None) -> str:
+        return (separator or self.ITEM_SEPARATOR).join(map(self.row, rows))
+
+    def array(self, rows: Iterable[Sequence]) -> str:
+        return "[" + self.rows(rows) + "]"
+
+    def array_with(self, rows: Iterable[Sequence], key: str, nested: Callable[[Sequence], str]) -> str:
+        """Array de objetos con una clave extra al final, ya serializada por `nested(row)` (p. ej. sus comentarios)."""
+        extra = f'{self.ITEM_SEPARATOR}"{key}"{self.KEY_SEPARATOR}'
+        return "[" + self.ITEM_SEPARATOR.join(self.row(row)[:-1] + extra + nested(row) + "}" for row in rows) + "]"
+
+    def task(self, task) -> str:
+        """Una tarea con atributos (TaskResponseDTO o entidad) en lugar de una fila."""
+        return self.row(self._values(task))
+
+class OrjsonTaskEncoder(TaskJSONEncoder):
+    """Misma interfaz sobre orjson, que serializa datetime de forma nativa."""
+
+    ITEM_SEPARATOR = ","
+    KEY_SEPARATOR = ":"
+
+    def __init__(self, orjson, fields: Tuple[str, ...] = TASK_RESPONSE_FIELDS, model=TaskResponseDTO):
+        super().__init__(fields, model)
+        self._orjson = orjson
+
+    def row(self, row: Sequence) -> str:
+        return self._orjson.dumps(dict(zip(self.fields, row))).decode()
+
+    def array(self, rows: Iterable[Sequence]) -> str:
+        return self._orjson.dumps([dict(zip(self.fields, row)) for row in rows]).decode()
+
+def build_task_encoder(fields: Tuple[str, ...] = TASK_RESPONSE_FIELDS, model=TaskResponseDTO) -> TaskJSONEncoder:
+    if TASK_JSON_ENCODER == "orjson":
+        import orjson
+        return OrjsonTaskEncoder(orjson, fields, model)
+    return TaskJSONEncoder(fields, model)
+
+@functools.lru_cache(maxsize=None)
+def task_encoder_for(fields: Tuple[str, ...]) -> TaskJSONEncoder:
+    """Un codificador por proyección: las proyecciones válidas son finitas (subconjuntos en orden canónico)."""
+    return build_task_encoder(fields)
+
+task_encoder = task_encoder_for(TASK_RESPONSE_FIELDS)
+comment_encoder = build_task_encoder(COMMENT_RESPONSE_FIELDS, CommentResponseDTO)
@@ -4,6 +4,10 @@ import tornado.testing
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
 import copy
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import make_app
 from app.domain.models import Task, Comment
@@ -12,6 +16,12 @@ from app.adapters.sqlalchemy_task_repository import SQLAlchemyTaskRepository
 from app.infrastructure.database import get_db, SessionLocal, engine, Base # Importa engine y Base también para el parche
 from app.presentation.handlers import TaskListHandler, TaskDetailHandler, with_db_session
 from app.presentation.dtos import TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO
+from app.application.cache import PayloadCache
+from app.infrastructure.cache import build_idempotency_store, build_task_cache, build_task_list_version
+from app.infrastructure.admission import build_admission, build_rate_limiter
+from app.adapters.search_index import task_search_index
+from app.application.events import ChangeFeed
+from app.infrastructure.replicas import Replica
 
 @pytest.fixture
 def sample_task_data():
@@ -213,8 +223,62 @@ def mock_db_session_and_use_cases(mocker, mock_task_repository, mock_task_use_ca
     # Patch TaskUseCases to return our mock_task_use_cases instance
     mocker.patch('app.application.use_cases.TaskUseCases', return_value=mock_task_use_cases) # <-- ¡Nuevo!
 
+    # Buckets y plazas de admisión nuevos en cada test: todas las peticiones llegan desde 127.0.0.1
+    mocker.patch('app.presentation.handlers.rate_limiter', new=build_rate_limiter())
+    mocker.patch('app.presentation.handlers.admission', new=build_admission())
+    mocker.patch('app.presentation.handlers.idempotency_store', new=build_idempotency_store())
+
     yield mock_session_instance # Yield the mock_session_instance for the fixture itself to be used by tests
 
+@pytest.fixture
+def sqlite_database(mocker, tmp_path, mock_db_session_and_use_cases):
+    """
+    Base de datos SQLite real (en un fichero temporal) para tests de integración.
+    Reemplaza las fábricas de sesión síncrona y asíncrona por otras ligadas a SQLite.
+    """
+    db_path = tmp_path / "tasks.db"
+    # check_same_thread=False: en modo executor las conexiones se usan desde los hilos del pool
+    sync_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    # NullPool: cada sesión abre su conexión en el IOLoop del test que la usa
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    with sync_engine.begin() as connection:
+        # create_all está parcheado por mock_db_session_and_use_cases
+        for table in Base.metadata.sorted_tables:
+            table.create(connection)
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    async_session_factory = sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    mocker.patch('app.infrastructure.database.SessionLocal', new=session_factory)
+    mocker.patch('app.infrastructure.database.AsyncSessionLocal', new=async_session_factory)
+    # Con el engine ya fijado, get_async_db no llama a init_engine (que reconfiguraría estas fábricas)
+    mocker.patch('app.infrastructure.database.async_engine', new=async_engine)
+    # Los ids se repiten entre tests: la caché de payloads no debe sobrevivir a la base de datos
+    task_cache = build_task_cache()
+    mocker.patch('app.presentation.handlers.task_cache', new=task_cache)
+    mocker.patch('app.presentation.handlers.task_list_version', new=build_task_list_version(task_cache))
+    mocker.patch('app.presentation.handlers.task_list_cache', new=PayloadCache("task-list", 256, 16 * 1024 * 1024, 60))
+    # Feed de eventos propio del test, sin broker entre procesos
+    mocker.patch('app.presentation.handlers.task_events', new=ChangeFeed(capacity=100))
+    # Igual con el índice de búsqueda en memoria: se reconstruye desde la base de datos del test
+    task_search_index.clear()
+    task_search_index.take_dirty()
+
+    yield session_factory
+
+    sync_engine.dispose()
+
+def make_sqlite_replica(db_path, name: str = "replica0"):
+    """
+    Réplica de lectura sobre otro fichero SQLite con el mismo esquema. No replica nada: lo que
+    se escribe en ella permite comprobar desde qué base de datos se ha servido cada lectura.
+    """
+    sync_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    with sync_engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            table.create(connection)
+    replica = Replica(name, sync_engine, create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool))
+    return replica, sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
 # Fixture para la aplicación Tornado de prueba
 @pytest.fixture
 def app():
@@ -0,0 +1,57 @@
+from app.infrastructure.admission import AdmissionController, TokenBucketLimiter
+from app.infrastructure.pool import WaitTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, idle_seconds=60, max_clients=10, clock=clock)
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == 0.5
+    # Otra clave (otro cliente u otra ruta) tiene su propio bucket
+    assert limiter.acquire("b") == 0
+
+    clock.now += 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0.5
+
+
+def test_idle_and_excess_clients_are_evicted():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=5, idle_seconds=1, max_clients=3, clock=clock)
+    # Nunca se olvida un bucket antes de que se haya rellenado del todo
+    assert limiter.idle_seconds == 5
+
+    for key in ("a", "b", "c", "d"):
+        limiter.acquire(key)
+    assert len(limiter) == 3 and limiter.acquire("a") == 0 and len(limiter) == 3
+
+    clock.now += 5
+    limiter.acquire("e")
+    assert len(limiter) == 1
+    assert TokenBucketLimiter(0, 5, 1, 3).acquire("a") == 0
+
+
+def test_admission_sheds_load_when_pool_wait_exceeds_target():
+    clock = FakeClock()
+    tracker = WaitTracker(half_life=1, clock=clock)
+    admission = AdmissionController(max_concurrent=4, target_wait=0.1, min_concurrent=2, wait_tracker=tracker)
+
+    assert [admission.try_acquire() for _ in range(5)] == [None, None, None, None, "concurrency"]
+    for _ in range(4):
+        admission.release()
+
+    for _ in range(10):
+        tracker.observe(0.5)
+    assert [admission.try_acquire() for _ in range(3)] == [None, None, "pool_wait"]
+
+    # La espera media decae sin nuevas observaciones y la admisión se recupera
+    clock.now += 5
+    assert admission.try_acquire() is None
@@ -1,12 +1,27 @@
+import asyncio
+import base64
+import gzip
 import json
+import tornado.gen
 import tornado.testing
 from datetime import datetime, timezone
 import pytest
 import copy
 
-from app.domain.models import Task
+from app.domain.models import Comment, Task
 from app.presentation.dtos import TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO
-from app.tests.conftest import BaseAPITest
+from app.application.batching import BATCH_SIZES, GroupCommitBatcher
+from app.application.cache import CACHE_HITS, PayloadCache
+from app.application.singleflight import READS_COALESCED
+from app.infrastructure.cache import read_coalescer
+from app.infrastructure.admission import RATE_LIMITED, TokenBucketLimiter
+from app.infrastructure.executor import DatabaseExecutor
+from app.infrastructure.instrumentation import REQUEST_DB_QUERIES, REQUEST_DURATION
+from app.infrastructure.server import HTTP_IN_FLIGHT
+from app.presentation.compression import COMPRESSED_RESPONSES
+from app.presentation import handlers
+from app.infrastructure.replicas import DB_READS, ReplicaRouter
+from app.tests.conftest import BaseAPITest, make_sqlite_replica
 
 class TestTaskListHandler(BaseAPITest):
     """
@@ -114,3 +129,836 @@ class TestTaskDetailHandler(BaseAPITest):
         assert "Access-Control-Allow-Headers" in response.headers
         assert "Access-Control-Allow-Credentials" in response.headers
 
+
+class TestTaskApiAsyncDatabase(BaseAPITest):
+    """
+    Tests de integración: los handlers usan la sesión asíncrona sobre SQLite real.
+    """
+    @pytest.fixture(autouse=True)
+    def inject_database(self, mocker, sqlite_database, tmp_path):
+        self.mocker = mocker
+        self.session_factory = sqlite_database
+        self.tmp_path = tmp_path
+
+    async def _create(self, **overrides):
+        body = {"title": "Tarea de prueba", "priority": 1, **overrides}
+        response = await self.http_client.fetch(
+            self.get_url("/tasks"), method="POST", body=json.dumps(body)
+        )
+        return json.loads(response.body)
+
+    @tornado.testing.gen_test
+    async def test_crud_roundtrip(self):
+        """
+        Verifies create, read, update and delete through the async repository.
+        """
+        created = await self._create(description="Con driver async")
+        assert created["id"] == 1
+        assert created["completed"] is False
+
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["id"] for task in json.loads(response.body)] == [1]
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="PUT", body=json.dumps({"completed": True})
+        )
+        assert json.loads(response.body)["completed"] is True
+
+        response = await self.http_client.fetch(self.get_url("/tasks/1"), method="DELETE")
+        assert response.code == 204
+
+        response = await self.http_client.fetch(self.get_url("/tasks/1"), raise_error=False)
+        assert response.code == 404
+        # Todas las peticiones terminadas: el drenado de SIGTERM no esperaría a nadie
+        assert HTTP_IN_FLIGHT.value() == 0
+
+    @tornado.testing.gen_test
+    async def test_detail_served_from_cache_until_updated(self):
+        """
+        Verifies that repeated GET /tasks/{id} hit the cache and that PUT invalidates it.
+        """
+        await self._create(title="Cacheada")
+        await self.http_client.fetch(self.get_url("/tasks/1"))
+        hits = CACHE_HITS.value(cache="task")
+
+        # Un cambio directo en la base de datos no se ve mientras la entrada siga en caché
+        with self.session_factory() as db:
+            db.get(Task, 1).title = "Cambiada fuera de la API"
+            db.commit()
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["title"] == "Cacheada"
+        assert CACHE_HITS.value(cache="task") == hits + 1
+
+        await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="PUT", body=json.dumps({"completed": True})
+        )
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["title"] == "Cambiada fuera de la API"
+        assert json.loads(response.body)["completed"] is True
+
+    @tornado.testing.gen_test
+    async def test_conditional_get_detail(self):
+        """
+        Verifies ETag/Last-Modified on GET /tasks/{id} and 304 for If-None-Match/If-Modified-Since.
+        """
+        await self._create()
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        etag = response.headers["Etag"]
+        last_modified = response.headers["Last-Modified"]
+        assert etag.startswith('"1-')
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), headers={"If-None-Match": etag}, raise_error=False
+        )
+        assert response.code == 304
+        assert response.body == b""
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), headers={"If-Modified-Since": last_modified}, raise_error=False
+        )
+        assert response.code == 304
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), headers={"If-None-Match": '"1-0"'}, raise_error=False
+        )
+        assert response.code == 200
+
+    @tornado.testing.gen_test
+    async def test_conditional_get_collection(self):
+        """
+        Verifies that the collection ETag changes when a task is added.
+        """
+        self._seed(2)
+        response = await self.http_client.fetch(self.get_url("/tasks?limit=1"))
+        etag = response.headers["Etag"]
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks?limit=1"), headers={"If-None-Match": etag}, raise_error=False
+        )
+        assert response.code == 304
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks?limit=2"), headers={"If-None-Match": etag}, raise_error=False
+        )
+        assert response.code == 200
+
+        await self._create()
+        response = await self.http_client.fetch(
+            self.get_url("/tasks?limit=1"), headers={"If-None-Match": etag}, raise_error=False
+        )
+        assert response.code == 200
+        assert response.headers["Etag"] != etag
+
+    @tornado.testing.gen_test
+    async def test_request_timing_metrics_and_server_timing(self):
+        """
+        Verifies per-request histograms, the DB query count per request and the Server-Timing header.
+        """
+        self.mocker.patch("app.infrastructure.instrumentation.SERVER_TIMING", new=True)
+        created = await self._create()
+        labels = {"route": "TaskDetailHandler", "method": "GET"}
+        requests, queries = REQUEST_DURATION.count(**labels), REQUEST_DB_QUERIES.sum(**labels)
+
+        response = await self.http_client.fetch(self.get_url(f"/tasks/{created['id']}"))
+        assert REQUEST_DURATION.count(**labels) == requests + 1
+        assert REQUEST_DB_QUERIES.sum(**labels) == queries + 1
+        timing = response.headers["Server-Timing"]
+        assert timing.startswith("db;dur=") and 'desc="1 queries"' in timing and "total;dur=" in timing
+
+        # Segunda lectura desde la caché: ninguna consulta
+        response = await self.http_client.fetch(self.get_url(f"/tasks/{created['id']}"))
+        assert 'desc="0 queries"' in response.headers["Server-Timing"]
+
+        response = await self.http_client.fetch(self.get_url("/metrics"))
+        body = response.body.decode()
+        assert 'http_request_duration_seconds_bucket{route="TaskDetailHandler",method="GET",le="+Inf"}' in body
+        assert 'http_requests_total{route="TaskListHandler",method="POST",status="201"}' in body
+        assert "http_response_size_bytes_sum" in body
+
+    @tornado.testing.gen_test
+    async def test_delete_removes_comments_and_missing_writes_404(self):
+        """
+        Verifies that DELETE /tasks/{id} removes the task's comments without loading them,
+        and that writes against a missing task return 404.
+        """
+        created = await self._create()
+        with self.session_factory() as db:
+            db.add_all([Comment(task_id=created["id"], content=f"Comentario {i}") for i in range(3)])
+            db.commit()
+
+        response = await self.http_client.fetch(self.get_url(f"/tasks/{created['id']}"), method="DELETE")
+        assert response.code == 204
+        with self.session_factory() as db:
+            assert db.query(Comment).count() == 0
+
+        for method, body in (("PUT", json.dumps({"completed": True})), ("DELETE", None)):
+            response = await self.http_client.fetch(
+                self.get_url(f"/tasks/{created['id']}"), method=method, body=body, raise_error=False
+            )
+            assert response.code == 404
+
+    @tornado.testing.gen_test
+    async def test_put_without_changes_keeps_version(self):
+        """
+        Verifies that an empty PUT does not touch the row (updated_at, and so the ETag, stay the same).
+        """
+        created = await self._create()
+        with self.session_factory() as db:
+            db.query(Task).update({"updated_at": datetime(2020, 1, 1)})
+            db.commit()
+
+        response = await self.http_client.fetch(
+            self.get_url(f"/tasks/{created['id']}"), method="PUT", body=json.dumps({})
+        )
+        assert json.loads(response.body)["updated_at"].startswith("2020-01-01")
+
+    @tornado.testing.gen_test
+    async def test_if_match_on_put_and_delete(self):
+        """
+        Verifies optimistic concurrency: a stale If-Match is rejected with 412.
+        """
+        await self._create()
+        # CURRENT_TIMESTAMP de SQLite tiene resolución de segundos: se envejece la tarea
+        with self.session_factory() as db:
+            db.get(Task, 1).updated_at = datetime(2020, 1, 1)
+            db.commit()
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        etag = response.headers["Etag"]
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="PUT", body=json.dumps({"title": "Primera"}),
+            headers={"If-Match": etag},
+        )
+        new_etag = response.headers["Etag"]
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="PUT", body=json.dumps({"title": "Segunda"}),
+            headers={"If-Match": etag}, raise_error=False,
+        )
+        assert response.code == 412
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="DELETE", headers={"If-Match": new_etag}
+        )
+        assert response.code == 204
+
+    @tornado.testing.gen_test
+    async def test_if_match_write_is_conditional(self):
+        """
+        Verifies that a write racing another one after the If-Match check gets 412 and changes nothing:
+        the version is checked again in the UPDATE/DELETE itself.
+        """
+        await self._create()
+        with self.session_factory() as db:
+            db.get(Task, 1).updated_at = datetime(2020, 1, 1)
+            db.commit()
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        etag = response.headers["Etag"]
+        # Otra escritura se cuela entre la comprobación del ETag y la escritura
+        with self.session_factory() as db:
+            db.get(Task, 1).updated_at = datetime(2021, 1, 1)
+            db.commit()
+        self.mocker.patch(
+            "app.adapters.sqlalchemy_async_task_repository.SQLAlchemyAsyncTaskRepository.get_task_version",
+            return_value=datetime(2020, 1, 1),
+        )
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="PUT", body=json.dumps({"title": "Perdida"}),
+            headers={"If-Match": etag}, raise_error=False,
+        )
+        assert response.code == 412
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1"), method="DELETE", headers={"If-Match": etag}, raise_error=False
+        )
+        assert response.code == 412
+        with self.session_factory() as db:
+            assert db.get(Task, 1).title == "Tarea de prueba"
+
+    def _seed(self, count):
+        with self.session_factory() as db:
+            db.add_all([
+                Task(title=f"Tarea {i}", priority=i % 3 + 1, completed=i % 2 == 0, category="Trabajo")
+                for i in range(1, count + 1)
+            ])
+            db.commit()
+
+    @tornado.testing.gen_test
+    async def test_list_keyset_pagination(self):
+        """
+        Verifies that GET /tasks pages with an opaque cursor until the last page.
+        """
+        self._seed(5)
+        seen, url = [], self.get_url("/tasks?limit=2&sort=-id")
+        while url:
+            response = await self.http_client.fetch(url)
+            seen.extend(task["id"] for task in json.loads(response.body))
+            cursor = response.headers.get("X-Next-Cursor")
+            url = self.get_url(f"/tasks?limit=2&sort=-id&cursor={cursor}") if cursor else None
+        assert seen == [5, 4, 3, 2, 1]
+
+    @tornado.testing.gen_test
+    async def test_list_filters_and_sort(self):
+        """
+        Verifies server-side filters combined with a non-id sort key.
+        """
+        self._seed(6)
+        response = await self.http_client.fetch(self.get_url("/tasks?completed=false&sort=-priority&limit=2"))
+        tasks = json.loads(response.body)
+        assert [(task["id"], task["priority"]) for task in tasks] == [(5, 3), (1, 2)]
+        assert all(task["completed"] is False for task in tasks)
+        assert "X-Next-Cursor" in response.headers
+
+    @tornado.testing.gen_test
+    async def test_fields_projection_on_list_stream_and_detail(self):
+        """
+        Verifies that ?fields= returns only the requested keys, keeps cursor pagination working
+        and gives the projected detail its own ETag.
+        """
+        self._seed(3)
+        response = await self.http_client.fetch(self.get_url("/tasks?fields=title,id&sort=-priority&limit=2"))
+        tasks = json.loads(response.body)
+        assert tasks == [{"id": 2, "title": "Tarea 2"}, {"id": 1, "title": "Tarea 1"}]
+        cursor = response.headers["X-Next-Cursor"]
+        response = await self.http_client.fetch(self.get_url(f"/tasks?fields=title,id&sort=-priority&cursor={cursor}"))
+        assert json.loads(response.body) == [{"id": 3, "title": "Tarea 3"}]
+
+        response = await self.http_client.fetch(self.get_url("/tasks?stream=1&fields=completed"))
+        assert json.loads(response.body) == [{"completed": False}, {"completed": True}, {"completed": False}]
+
+        full = await self.http_client.fetch(self.get_url("/tasks/1"))
+        response = await self.http_client.fetch(self.get_url("/tasks/1?fields=priority"))
+        assert json.loads(response.body) == {"priority": 2}
+        assert response.headers["ETag"] != full.headers["ETag"]
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/1?fields=priority"), headers={"If-None-Match": response.headers["ETag"]},
+            raise_error=False,
+        )
+        assert response.code == 304
+
+        for url in ("/tasks?fields=secret", "/tasks/1?fields=", "/tasks/1?fields=id,bogus"):
+            response = await self.http_client.fetch(self.get_url(url), raise_error=False)
+            assert response.code == 400
+        response = await self.http_client.fetch(self.get_url("/tasks/99?fields=id"), raise_error=False)
+        assert response.code == 404
+
+    @tornado.testing.gen_test
+    async def test_list_compressed_once_per_version(self):
+        """
+        Verifies gzip on large list pages (served precompressed from the list cache until a write)
+        and that tiny detail responses go out uncompressed.
+        """
+        self._seed(30)
+        headers = {"Accept-Encoding": "gzip"}
+        cached = COMPRESSED_RESPONSES.value(encoding="gzip", source="cache")
+        plain = await self.http_client.fetch(self.get_url("/tasks"), decompress_response=False)
+        assert "Content-Encoding" not in plain.headers
+        first = await self.http_client.fetch(self.get_url("/tasks"), headers=headers, decompress_response=False)
+        second = await self.http_client.fetch(self.get_url("/tasks"), headers=headers, decompress_response=False)
+        assert first.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in first.headers["Vary"]
+        assert gzip.decompress(first.body) == plain.body
+        assert second.body == first.body
+        assert COMPRESSED_RESPONSES.value(encoding="gzip", source="cache") == cached + 2
+
+        await self.http_client.fetch(self.get_url("/tasks/1"), method="PUT", body=json.dumps({"title": "Cambiada"}))
+        third = await self.http_client.fetch(self.get_url("/tasks"), headers=headers, decompress_response=False)
+        assert json.loads(gzip.decompress(third.body))[0]["title"] == "Cambiada"
+
+        detail = await self.http_client.fetch(self.get_url("/tasks/1"), headers=headers, decompress_response=False)
+        assert "Content-Encoding" not in detail.headers
+
+    @tornado.testing.gen_test
+    async def test_comments_endpoint_and_include(self):
+        """
+        Verifies paginated GET/POST /tasks/{id}/comments and that ?include=comments loads the
+        comments of the whole page with a single extra query.
+        """
+        self._seed(20)
+        for content in ("Primero", "Segundo", "Tercero"):
+            response = await self.http_client.fetch(
+                self.get_url("/tasks/2/comments"), method="POST", body=json.dumps({"content": content})
+            )
+            assert response.code == 201
+        assert json.loads(response.body)["task_id"] == 2
+
+        response = await self.http_client.fetch(self.get_url("/tasks/2/comments?limit=2"))
+        assert [comment["content"] for comment in json.loads(response.body)] == ["Primero", "Segundo"]
+        cursor = response.headers["X-Next-Cursor"]
+        response = await self.http_client.fetch(self.get_url(f"/tasks/2/comments?limit=2&cursor={cursor}"))
+        assert [comment["content"] for comment in json.loads(response.body)] == ["Tercero"]
+
+        labels = {"route": "TaskListHandler", "method": "GET"}
+        queries = REQUEST_DB_QUERIES.sum(**labels)
+        plain = json.loads((await self.http_client.fetch(self.get_url("/tasks?limit=10"))).body)
+        plain_queries = REQUEST_DB_QUERIES.sum(**labels) - queries
+        response = await self.http_client.fetch(self.get_url("/tasks?limit=10&include=comments"))
+        assert REQUEST_DB_QUERIES.sum(**labels) - queries - plain_queries == plain_queries + 1
+        tasks = json.loads(response.body)
+        assert [task["comments"] for task in tasks if task["id"] != 2] == [[]] * 9
+        assert [comment["content"] for comment in tasks[1]["comments"]] == ["Primero", "Segundo", "Tercero"]
+        assert {key: value for key, value in tasks[0].items() if key != "comments"} == plain[0]
+
+        for url, code in (("/tasks/99/comments", 404), ("/tasks?include=owner", 400), ("/tasks/2/comments?cursor=x", 400)):
+            response = await self.http_client.fetch(self.get_url(url), raise_error=False)
+            assert response.code == code
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/99/comments"), method="POST", body=json.dumps({"content": "x"}), raise_error=False
+        )
+        assert response.code == 404
+
+    @tornado.testing.gen_test
+    async def test_search_ranked_with_pagination_and_filters(self):
+        """
+        Verifies GET /tasks/search: relevance order, keyset pagination, filters, projection and
+        that writes are reflected in the next search.
+        """
+        await self._create(title="Revisión del informe", description="informe trimestral, informe anual")
+        await self._create(title="Comprar pan", description="panadería")
+        await self._create(title="Informe", description="enviar", priority=3)
+        await self._create(title="Llamar al banco", description="revisar el informe de cuentas")
+
+        response = await self.http_client.fetch(self.get_url("/tasks/search?q=informe&limit=2"))
+        first = [task["id"] for task in json.loads(response.body)]
+        cursor = response.headers["X-Next-Cursor"]
+        response = await self.http_client.fetch(self.get_url(f"/tasks/search?q=informe&limit=2&cursor={cursor}"))
+        assert "X-Next-Cursor" not in response.headers
+        assert first[0] == 1
+        assert sorted(first + [task["id"] for task in json.loads(response.body)]) == [1, 3, 4]
+
+        # Todos los términos, sin distinguir tildes ni mayúsculas
+        response = await self.http_client.fetch(self.get_url("/tasks/search?q=REVISION%20informe"))
+        assert [task["id"] for task in json.loads(response.body)] == [1]
+        response = await self.http_client.fetch(self.get_url("/tasks/search?q=informe&priority=3&fields=id,title"))
+        assert json.loads(response.body) == [{"id": 3, "title": "Informe"}]
+
+        await self.http_client.fetch(
+            self.get_url("/tasks/2"), method="PUT", body=json.dumps({"description": "y el informe"})
+        )
+        await self.http_client.fetch(self.get_url("/tasks/1"), method="DELETE")
+        response = await self.http_client.fetch(self.get_url("/tasks/search?q=informe"))
+        assert sorted(task["id"] for task in json.loads(response.body)) == [2, 3, 4]
+
+        for url in ("/tasks/search", "/tasks/search?q=%20", "/tasks/search?q=informe&cursor=x"):
+            response = await self.http_client.fetch(self.get_url(url), raise_error=False)
+            assert response.code == 400
+
+    @tornado.testing.gen_test
+    async def test_events_stream_and_resume_from_last_event_id(self):
+        """
+        Verifies that GET /tasks/events pushes create/update/delete deltas as Server-Sent Events and
+        that a reconnection with Last-Event-ID replays only what was missed (or asks for a reset).
+        """
+        events = handlers.task_events
+        chunks = []
+        stream = self.http_client.fetch(self.get_url("/tasks/events"), streaming_callback=chunks.append)
+        while not chunks:
+            await tornado.gen.sleep(0.01)
+
+        created = await self._create(title="En vivo")
+        await self.http_client.fetch(
+            self.get_url(f"/tasks/{created['id']}"), method="PUT", body=json.dumps({"completed": True})
+        )
+        await self.http_client.fetch(self.get_url(f"/tasks/{created['id']}"), method="DELETE")
+        while b"task.deleted" not in b"".join(chunks):
+            await tornado.gen.sleep(0.01)
+        await events.close()
+        response = await stream
+        assert response.headers["Content-Type"] == "text/event-stream"
+        # Una conexión abierta no cuenta como petición en curso para el drenado
+        assert HTTP_IN_FLIGHT.value() == 0
+
+        messages = [message for message in b"".join(chunks).decode().split("\n\n") if "event:" in message]
+        parsed = [dict(line.split(": ", 1) for line in message.split("\n")) for message in messages]
+        assert [message["event"] for message in parsed] == ["task.created", "task.updated", "task.deleted"]
+        assert json.loads(parsed[0]["data"])["task"] == created
+        assert json.loads(parsed[1]["data"])["task"]["completed"] is True
+        assert json.loads(parsed[2]["data"]) == {"ids": [created["id"]]}
+
+        # Con el feed cerrado, la reconexión devuelve lo pendiente y termina
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/events"), headers={"Last-Event-ID": parsed[0]["id"]}
+        )
+        assert [line for line in response.body.decode().split("\n") if line.startswith("event:")] == [
+            "event: task.updated", "event: task.deleted",
+        ]
+        response = await self.http_client.fetch(self.get_url("/tasks/events?last_event_id=otro-proceso-1"))
+        assert "event: reset" in response.body.decode()
+
+    @tornado.testing.gen_test
+    async def test_events_stream_ends_when_the_feed_closes(self):
+        """
+        Verifies that an idle SSE connection finishes when the feed is closed (as drain() does on SIGTERM).
+        """
+        chunks = []
+        stream = self.http_client.fetch(self.get_url("/tasks/events"), streaming_callback=chunks.append)
+        while not chunks:
+            await tornado.gen.sleep(0.01)
+        await handlers.task_events.close()
+        response = await asyncio.wait_for(stream, timeout=5)
+        assert response.code == 200 and b"retry:" in b"".join(chunks)
+
+    @tornado.testing.gen_test
+    async def test_rate_limit_per_route_and_load_shedding(self):
+        """
+        Verifies 429 with Retry-After once a client exhausts its bucket on a route, independent
+        buckets per route, and 503 when the process is at its concurrency limit.
+        """
+        self.mocker.patch.object(handlers, "rate_limiter", TokenBucketLimiter(1, 2, 60, 100))
+        limited = RATE_LIMITED.value(route="TaskListHandler")
+        codes = [(await self.http_client.fetch(self.get_url("/tasks"), raise_error=False)).code for _ in range(3)]
+        assert codes == [200, 200, 429]
+        response = await self.http_client.fetch(self.get_url("/tasks"), raise_error=False)
+        assert response.headers["Retry-After"] == "1"
+        assert json.loads(response.body) == {"error": "Too Many Requests"}
+        assert RATE_LIMITED.value(route="TaskListHandler") == limited + 2
+        assert (await self.http_client.fetch(self.get_url("/tasks/stats"))).code == 200
+        response = await self.http_client.fetch(self.get_url("/tasks"), method="OPTIONS")
+        assert response.code == 204
+
+        self.mocker.patch.object(handlers, "rate_limiter", TokenBucketLimiter(0, 1, 60, 100))
+        handlers.admission.in_flight = handlers.admission.max_concurrent
+        response = await self.http_client.fetch(self.get_url("/tasks/stats"), raise_error=False)
+        assert response.code == 503 and response.headers["Retry-After"] == "1"
+        handlers.admission.in_flight = 0
+        assert (await self.http_client.fetch(self.get_url("/tasks/stats"))).code == 200
+        assert handlers.admission.in_flight == 0
+
+    @tornado.testing.gen_test
+    async def test_idempotency_key_replays_and_coalesces(self):
+        """
+        Verifies that retries with the same Idempotency-Key replay the stored response instead of
+        writing again, that concurrent duplicates share one execution, and that reusing a key with
+        another body or while another process holds it is rejected.
+        """
+        def post(body, key):
+            return self.http_client.fetch(
+                self.get_url("/tasks"), method="POST", body=json.dumps(body),
+                headers={"Idempotency-Key": key}, raise_error=False,
+            )
+
+        first, retry = await post({"title": "Una vez"}, "k1"), await post({"title": "Una vez"}, "k1")
+        assert first.code == retry.code == 201
+        assert retry.body == first.body and retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+
+        responses = await asyncio.gather(*(post({"title": "A la vez"}, "k2") for _ in range(5)))
+        assert {response.body for response in responses} == {responses[0].body}
+        tasks = json.loads((await self.http_client.fetch(self.get_url("/tasks"))).body)
+        assert sorted(task["title"] for task in tasks) == ["A la vez", "Una vez"]
+
+        assert (await post({"title": "Otra cosa"}, "k1")).code == 422
+        # Los errores de validación también se reenvían; los 5xx no se guardan
+        invalid = await post({"title": "x"}, "k3")
+        assert invalid.code == (await post({"title": "x"}, "k3")).code == 400
+
+        await handlers.idempotency_store.lock("POST:/tasks:k4")
+        response = await post({"title": "En otro proceso"}, "k4")
+        assert response.code == 409 and response.headers["Retry-After"] == "1"
+
+        put = lambda: self.http_client.fetch(
+            self.get_url(f"/tasks/{tasks[0]['id']}"), method="PUT", body=json.dumps({"completed": True}),
+            headers={"Idempotency-Key": "k5"},
+        )
+        updated, replayed = await put(), await put()
+        assert replayed.body == updated.body and replayed.headers["Etag"] == updated.headers["Etag"]
+
+    @tornado.testing.gen_test
+    async def test_identical_concurrent_reads_share_one_query(self):
+        """
+        Verifies that identical concurrent GET /tasks requests share one database execution and one
+        serialized payload even with the list cache disabled, and that a write starts a new flight.
+        """
+        self.mocker.patch.object(handlers, "task_list_cache", PayloadCache("task-list", 0, 0, 0))
+        self._seed(3)
+        labels = {"route": "TaskListHandler", "method": "GET"}
+        queries = REQUEST_DB_QUERIES.sum(**labels)
+        await self.http_client.fetch(self.get_url("/tasks?limit=2"))
+        single = REQUEST_DB_QUERIES.sum(**labels) - queries
+
+        coalesced = READS_COALESCED.value(route="TaskListHandler")
+        queries = REQUEST_DB_QUERIES.sum(**labels)
+        responses = await asyncio.gather(*(self.http_client.fetch(self.get_url("/tasks?limit=2")) for _ in range(5)))
+        assert len({response.body for response in responses}) == 1
+        assert READS_COALESCED.value(route="TaskListHandler") > coalesced
+        assert REQUEST_DB_QUERIES.sum(**labels) - queries < 5 * single
+
+        generation = read_coalescer.generation
+        await self.http_client.fetch(self.get_url("/tasks/1"), method="PUT", body=json.dumps({"title": "Nueva"}))
+        assert read_coalescer.generation == generation + 1
+        response = await self.http_client.fetch(self.get_url("/tasks?limit=2"))
+        assert json.loads(response.body)[0]["title"] == "Nueva"
+
+    @tornado.testing.gen_test
+    async def test_group_commit_batches_concurrent_creates(self):
+        """
+        Verifies that with TASK_CREATE_BATCHING concurrent POST /tasks requests are written in
+        multi-row batches and each client still receives its own task.
+        """
+        self.mocker.patch("app.infrastructure.database.TASK_CREATE_BATCHING", new=True)
+        self.mocker.patch.object(
+            handlers, "task_create_batcher", GroupCommitBatcher(handlers._create_tasks_batch, 3, 0.05)
+        )
+        batches = BATCH_SIZES.count()
+        responses = await asyncio.gather(*(
+            self.http_client.fetch(self.get_url("/tasks"), method="POST", body=json.dumps({"title": f"Alta {i}"}))
+            for i in range(5)
+        ))
+        assert all(response.code == 201 for response in responses)
+        created = [json.loads(response.body) for response in responses]
+        assert [task["title"] for task in created] == [f"Alta {i}" for i in range(5)]
+        assert len({task["id"] for task in created}) == 5
+        # Un lote lleno de 3 y otro de 2 al vencer la ventana
+        assert BATCH_SIZES.count() - batches == 2
+        assert [event.type for event in handlers.task_events.since(0)] == ["task.created"] * 5
+
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert len(json.loads(response.body)) == 5
+
+    @tornado.testing.gen_test
+    async def test_reads_use_replica_except_right_after_a_write(self):
+        """
+        Verifies with two SQLite files that GETs are served by the replica, that the writing client
+        reads from the primary during the read-your-writes window, and that an unhealthy replica is skipped.
+        """
+        replica, replica_session = make_sqlite_replica(self.tmp_path / "replica.db")
+        with replica_session() as db:
+            db.add_all([Task(title="En la réplica", priority=1), Task(title="Réplica 2", priority=2)])
+            db.commit()
+        now = [0.0]
+        router = ReplicaRouter(sticky_seconds=2, clock=lambda: now[0])
+        router.set_replicas([replica])
+        self.mocker.patch("app.infrastructure.database.replica_router", new=router)
+
+        reads = DB_READS.value(target="replica0")
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["title"] for task in json.loads(response.body)] == ["En la réplica", "Réplica 2"]
+        assert DB_READS.value(target="replica0") == reads + 1
+        # La réplica puede ir atrasada: su ETag sale del cuerpo, no de la versión del listado
+        response = await self.http_client.fetch(
+            self.get_url("/tasks"), headers={"If-None-Match": response.headers["Etag"]}, raise_error=False
+        )
+        assert response.code == 304
+
+        await self._create(title="En el primario")
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["title"] for task in json.loads(response.body)] == ["En el primario"]
+
+        now[0] += 3
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["title"] for task in json.loads(response.body)] == ["En la réplica", "Réplica 2"]
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["title"] == "En la réplica"
+
+        replica.set_healthy(False)
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["title"] for task in json.loads(response.body)] == ["En el primario"]
+        # El detalle leído de la réplica no quedó en la caché: el primario no lo ve
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["title"] == "En el primario"
+        await replica.dispose()
+
+    @tornado.testing.gen_test
+    async def test_stream_ndjson_and_json_array(self):
+        """
+        Verifies the streaming export in NDJSON and as a chunked JSON array, with filters.
+        """
+        self._seed(5)
+        response = await self.http_client.fetch(
+            self.get_url("/tasks?completed=false"), headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        lines = response.body.decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 3, 5]
+
+        response = await self.http_client.fetch(self.get_url("/tasks?stream=1&sort=-id"))
+        assert [task["id"] for task in json.loads(response.body)] == [5, 4, 3, 2, 1]
+        assert "X-Next-Cursor" not in response.headers
+
+    @tornado.testing.gen_test
+    async def test_stats(self):
+        """
+        Verifies the aggregated counters returned by GET /tasks/stats.
+        """
+        self._seed(4)
+        with self.session_factory() as db:
+            db.add(Task(title="Vencida", priority=3, due_date=datetime(2020, 1, 1)))
+            db.commit()
+
+        response = await self.http_client.fetch(self.get_url("/tasks/stats"))
+        assert json.loads(response.body) == {
+            "total": 5,
+            "completed": 2,
+            "pending": 3,
+            "overdue": 1,
+            "by_priority": {"1": 1, "2": 2, "3": 2},
+            "by_category": {"Trabajo": 4},
+            "uncategorized": 1,
+        }
+
+    @tornado.testing.gen_test
+    async def test_list_invalid_cursor(self):
+        """
+        Verifies that a tampered cursor is rejected with 400.
+        """
+        response = await self.http_client.fetch(self.get_url("/tasks?cursor=bogus"), raise_error=False)
+        assert response.code == 400
+        assert json.loads(response.body)["error"] == "Invalid cursor"
+
+        # Cursores bien codificados pero con un valor de otro tipo
+        for payload in (["created_at", 123, 1], ["id", [1], 1], ["id", None, True], ["priority", "alta", 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            sort = payload[0]
+            response = await self.http_client.fetch(
+                self.get_url(f"/tasks?sort={sort}&cursor={cursor}"), raise_error=False
+            )
+            assert response.code == 400
+            assert json.loads(response.body)["error"] == "Invalid cursor"
+
+    @tornado.testing.gen_test
+    async def test_bulk_create_reports_invalid_items(self):
+        """
+        Verifies that POST /tasks/bulk inserts the valid items and reports the rest by index.
+        """
+        body = [{"title": "Uno", "priority": 1}, {"priority": 2}, {"title": "Tres", "priority": 3}]
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="POST", body=json.dumps(body)
+        )
+        assert response.code == 201
+        payload = json.loads(response.body)
+        assert [task["title"] for task in payload["created"]] == ["Uno", "Tres"]
+        assert [error["index"] for error in payload["errors"]] == [1]
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="POST", body=json.dumps({"tasks": [{"priority": 1}]}),
+            raise_error=False,
+        )
+        assert response.code == 400
+        assert json.loads(response.body)["created"] == []
+
+    @tornado.testing.gen_test
+    async def test_bulk_update_and_delete(self):
+        """
+        Verifies PATCH and DELETE /tasks/bulk by ids and by filter, and that the detail cache is invalidated.
+        """
+        self._seed(4)
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["completed"] is False
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="PATCH",
+            body=json.dumps({"ids": [1, 3, 99], "changes": {"category": "Casa"}}),
+        )
+        assert json.loads(response.body) == {"updated": [1, 3], "not_found": [99]}
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="PATCH",
+            body=json.dumps({"filter": {"completed": False}, "changes": {"completed": True}}),
+        )
+        assert sorted(json.loads(response.body)["updated"]) == [1, 3]
+        response = await self.http_client.fetch(self.get_url("/tasks/1"))
+        assert json.loads(response.body)["completed"] is True
+        assert json.loads(response.body)["category"] == "Casa"
+
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="DELETE", allow_nonstandard_methods=True,
+            body=json.dumps({"filter": {"category": "Trabajo"}}),
+        )
+        assert sorted(json.loads(response.body)["deleted"]) == [2, 4]
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["id"] for task in json.loads(response.body)] == [1, 3]
+
+    @tornado.testing.gen_test
+    async def test_bulk_filter_selection_is_capped(self):
+        """
+        Verifies that a bulk write whose filter matches more than MAX_BULK_ITEMS tasks is rejected
+        with 400 before touching any row.
+        """
+        self.mocker.patch("app.adapters.task_queries.MAX_BULK_ITEMS", 2)
+        self._seed(3)
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="PATCH", raise_error=False,
+            body=json.dumps({"filter": {"category": "Trabajo"}, "changes": {"category": "Casa"}}),
+        )
+        assert response.code == 400
+        assert json.loads(response.body)["error"] == "Filter matches more than 2 tasks"
+        response = await self.http_client.fetch(
+            self.get_url("/tasks/bulk"), method="DELETE", allow_nonstandard_methods=True, raise_error=False,
+            body=json.dumps({"filter": {"category": "Trabajo"}}),
+        )
+        assert response.code == 400
+        response = await self.http_client.fetch(self.get_url("/tasks?category=Trabajo"))
+        assert len(json.loads(response.body)) == 3
+
+    @tornado.testing.gen_test
+    async def test_bulk_rejects_empty_selection(self):
+        """
+        Verifies that a bulk write without ids or with an empty filter is rejected with 400.
+        """
+        for body in ({"changes": {"completed": True}}, {"filter": {}, "changes": {"completed": True}},
+                     {"ids": [1], "changes": {}}):
+            response = await self.http_client.fetch(
+                self.get_url("/tasks/bulk"), method="PATCH", body=json.dumps(body), raise_error=False
+            )
+            assert response.code == 400
+
+
+class TestTaskApiExecutorMode(BaseAPITest):
+    """
+    Tests del modo executor: el repositorio síncrono se ejecuta en un pool de hilos acotado.
+    """
+    @pytest.fixture(autouse=True)
+    def inject_executor(self, mocker, sqlite_database):
+        mocker.patch('app.infrastructure.database.DB_SESSION_MODE', new="executor")
+        self.session_factory = sqlite_database
+        self.executor = DatabaseExecutor(max_workers=2, max_queue=1)
+        mocker.patch('app.presentation.handlers.get_db_executor', return_value=self.executor)
+        yield
+        self.executor.shutdown()
+
+    @tornado.testing.gen_test
+    async def test_create_and_list_in_executor(self):
+        """
+        Verifies that requests are served by the sync repository running on the executor.
+        """
+        response = await self.http_client.fetch(
+            self.get_url("/tasks"), method="POST", body=json.dumps({"title": "En un hilo"})
+        )
+        assert response.code == 201
+        # El evento se publicó desde el hilo del executor
+        assert [event.type for event in handlers.task_events.since(0)] == ["task.created"]
+
+        labels = {"route": "TaskListHandler", "method": "GET"}
+        queries = REQUEST_DB_QUERIES.sum(**labels)
+        response = await self.http_client.fetch(self.get_url("/tasks"))
+        assert [task["title"] for task in json.loads(response.body)] == ["En un hilo"]
+        assert self.executor.admitted == 0
+        # Las consultas hechas en los hilos del executor se atribuyen a la petición
+        assert REQUEST_DB_QUERIES.sum(**labels) > queries
+
+    @tornado.testing.gen_test
+    async def test_saturated_executor_returns_503(self):
+        """
+        Verifies that requests beyond workers + queue are rejected with 503 and Retry-After.
+        """
+        self.executor.admitted = self.executor.max_workers + self.executor.max_queue
+
+        response = await self.http_client.fetch(self.get_url("/tasks"), raise_error=False)
+        assert response.code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        response = await self.http_client.fetch(self.get_url("/metrics"))
+        assert b"db_executor_rejected_total" in response.body
+
+    @tornado.testing.gen_test
+    async def test_stream_in_executor(self):
+        """
+        Verifies that the streaming export reads chunks through the executor.
+        """
+        with self.session_factory() as db:
+            db.add_all([Task(title=f"Tarea {i}", priority=1) for i in range(3)])
+            db.commit()
+
+        response = await self.http_client.fetch(self.get_url("/tasks?stream=1"))
+        assert len(json.loads(response.body)) == 3
+        assert self.executor.queued == 0
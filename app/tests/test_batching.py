@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.adapters.task_queries import returned_tasks
+from app.application.batching import BATCH_FALLBACKS, GroupCommitBatcher
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_on_size_and_window():
+    calls = []
+
+    async def flush(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = GroupCommitBatcher(flush, max_size=2, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert results == [0, 10, 20]
+    assert calls == [[0, 1], [2]]
+    assert len(batcher) == 0
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_row_by_row():
+    async def flush(items):
+        if "mala" in items:
+            raise ValueError("fila inválida")
+        return [item.upper() for item in items]
+
+    batcher = GroupCommitBatcher(flush, max_size=10, window=0.01)
+    fallbacks = BATCH_FALLBACKS.value()
+    results = await asyncio.gather(*(batcher.submit(item) for item in ("a", "mala", "b")), return_exceptions=True)
+
+    assert results[0] == "A" and results[2] == "B"
+    assert isinstance(results[1], ValueError)
+    assert BATCH_FALLBACKS.value() == fallbacks + 1
+
+@pytest.mark.asyncio
+async def test_batch_with_missing_results_fails_every_caller():
+    async def flush(items):
+        return items[:-1]
+
+    batcher = GroupCommitBatcher(flush, max_size=3, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+    # Nada se reintenta fila a fila: el lote ya se escribió
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_returned_rows_are_matched_in_insert_order():
+    class Row:
+        def __init__(self, id, title):
+            self.id = id
+            self._mapping = {"id": id, "title": title}
+
+    tasks = returned_tasks([Row(12, "c"), Row(10, "a"), Row(11, "b")])
+    assert [(task.id, task.title) for task in tasks] == [(10, "a"), (11, "b"), (12, "c")]
@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks.harness import compare_results, parse_mix, percentile, summarize
+
+
+def test_percentile_interpolates():
+    values = [0.010, 0.020, 0.030, 0.040, 0.050]
+    assert percentile(values, 0.5) == 0.030
+    assert percentile(values, 0.99) == pytest.approx(0.0496)
+    assert percentile([], 0.99) == 0.0
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.010] * 99 + [0.100], errors=1, elapsed=2.0)
+    assert summary["requests"] == 100
+    assert summary["rps"] == 50.0
+    assert summary["p50_ms"] == 10.0
+    assert summary["errors"] == 1
+
+
+def test_compare_results_flags_regressions_beyond_tolerance():
+    baseline = {"detail": {"rps": 1000, "p50_ms": 2.0, "p95_ms": 5.0, "p99_ms": 10.0, "errors": 0}}
+    within = {"detail": {"rps": 950, "p50_ms": 2.1, "p95_ms": 5.2, "p99_ms": 10.5, "errors": 0}}
+    assert compare_results(within, baseline, tolerance=0.10) == []
+
+    slower = {"detail": {"rps": 800, "p50_ms": 2.0, "p95_ms": 5.0, "p99_ms": 14.0, "errors": 3}}
+    regressions = compare_results(slower, baseline, tolerance=0.10)
+    assert [regression.split(":")[0] for regression in regressions] == [
+        "detail.p99_ms", "detail.rps", "detail.errors",
+    ]
+
+
+def test_parse_mix():
+    assert parse_mix("detail=80,update=20") == {"detail": 80, "update": 20}
+    assert parse_mix(None)["list"] == 30
+    with pytest.raises(ValueError):
+        parse_mix("search=10")
@@ -0,0 +1,271 @@
+import asyncio
+import pytest
+
+from app.adapters.memory_cache_backend import InMemoryCacheBackend
+from app.adapters.redis_cache_backend import RedisCacheBackend
+from app.application.cache import PayloadCache, TaskCache, VersionToken, CACHE_EVICTIONS
+
+
+class FakePubSub:
+    def __init__(self, store):
+        self.store = store
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.store.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class FakePipeline:
+    """Encola los comandos y los ejecuta juntos en execute(), como un pipeline de redis.asyncio."""
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        self.store.round_trips += 1
+        return [await getattr(self.store, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """
+    Almacén en proceso con el subconjunto de la API de redis.asyncio que usa RedisCacheBackend.
+    Varias instancias de TaskCache sobre el mismo FakeRedis simulan varios procesos.
+    """
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.gets = 0
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def pexpire(self, key, milliseconds):
+        return True
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPayloadCache:
+    """
+    Tests de la caché LRU de payloads serializados.
+    """
+
+    def test_get_returns_payload_until_ttl(self):
+        clock = FakeClock()
+        cache = PayloadCache("test-ttl", max_entries=10, max_bytes=1024, ttl=5, clock=clock)
+        cache.set(1, '{"id": 1}', cache.read_token())
+
+        assert cache.get(1) == '{"id": 1}'
+        clock.now = 5
+        assert cache.get(1) is None
+        assert CACHE_EVICTIONS.value(cache="test-ttl", reason="ttl") == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PayloadCache("test-lru", max_entries=2, max_bytes=1024, ttl=60)
+        for key in (1, 2):
+            cache.set(key, str(key), cache.read_token())
+        cache.get(1)
+        cache.set(3, "3", cache.read_token())
+
+        assert cache.get(2) is None
+        assert cache.get(1) == "1"
+        assert cache.get(3) == "3"
+
+    def test_byte_limit_evicts_entries(self):
+        cache = PayloadCache("test-bytes", max_entries=10, max_bytes=10, ttl=60)
+        cache.set(1, "x" * 6, cache.read_token())
+        cache.set(2, "y" * 6, cache.read_token())
+
+        assert len(cache) == 1
+        assert cache.size_bytes == 6
+
+    def test_stale_read_is_not_cached_after_invalidation(self):
+        cache = PayloadCache("test-stale", max_entries=10, max_bytes=1024, ttl=60)
+        token = cache.read_token()
+        # Una escritura invalida la clave mientras la lectura estaba en curso
+        cache.invalidate(1)
+        cache.set(1, "viejo", token)
+        assert cache.get(1) is None
+
+        cache.set(1, "nuevo", cache.read_token())
+        assert cache.get(1) == "nuevo"
+
+
+class TestTaskCache:
+    """
+    Tests de la caché read-through sobre backends intercambiables.
+    """
+
+    @staticmethod
+    def _worker(store):
+        local = PayloadCache("test-local", max_entries=10, max_bytes=1024, ttl=60)
+        return TaskCache(RedisCacheBackend(store), ttl=60, local=local)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self):
+        cache = TaskCache(InMemoryCacheBackend(max_entries=10, max_bytes=1024), ttl=60)
+        loads = 0
+
+        async def loader():
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0.01)
+            return "payload"
+
+        results = await asyncio.gather(*(cache.get_or_load(1, loader) for _ in range(10)))
+        assert results == ["payload"] * 10
+        assert loads == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_bumps_version(self):
+        cache = TaskCache(InMemoryCacheBackend(max_entries=10, max_bytes=1024), ttl=60)
+
+        async def old():
+            return "viejo"
+
+        async def new():
+            return "nuevo"
+
+        assert await cache.get_or_load(1, old) == "viejo"
+        await cache.invalidate(1)
+        assert await cache.get_or_load(1, new) == "nuevo"
+        assert await cache.get_or_load(1, old) == "nuevo"
+
+    @pytest.mark.asyncio
+    async def test_replica_reads_are_served_but_not_stored(self):
+        cache = self._worker(FakeRedis())
+        replica_loads = []
+
+        async def from_replica():
+            replica_loads.append(1)
+            await asyncio.sleep(0.01)
+            return "réplica"
+
+        async def from_primary():
+            return "primario"
+
+        # Una lectura del primario no se une a la carga en curso desde la réplica
+        results = await asyncio.gather(
+            cache.get_or_load(3, from_replica, store=False), cache.get_or_load(3, from_replica, store=False),
+            cache.get_or_load(3, from_primary),
+        )
+        assert results == ["réplica", "réplica", "primario"] and len(replica_loads) == 1
+        # Lo cacheado (siempre del primario) sí se sirve a las lecturas de réplica
+        assert await cache.get_or_load(3, from_replica, store=False) == "primario"
+
+        assert await cache.get_or_load(4, from_replica, store=False) == "réplica"
+        assert cache.local.get("4") is None
+        assert await cache.get_or_load(4, from_primary) == "primario"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_fans_out_to_other_workers(self):
+        store = FakeRedis()
+        worker_a, worker_b = self._worker(store), self._worker(store)
+        await worker_a.start()
+        await worker_b.start()
+
+        async def v1():
+            return "v1"
+
+        async def v2():
+            return "v2"
+
+        assert await worker_a.get_or_load(7, v1) == "v1"
+        # El segundo proceso lo encuentra en el almacén compartido y lo guarda en su L1
+        assert await worker_b.get_or_load(7, v2) == "v1"
+        assert worker_b.local.get("7") == "v1"
+
+        await worker_a.invalidate(7)
+        await asyncio.sleep(0)
+        assert worker_b.local.get("7") is None
+        assert await worker_b.get_or_load(7, v2) == "v2"
+
+        # Varias claves: un solo pipeline para las versiones y un solo mensaje para los demás procesos
+        for key in (8, 9):
+            await worker_b.get_or_load(key, v1)
+        round_trips = store.round_trips
+        await worker_a.invalidate_many([7, 8, 9])
+        await asyncio.sleep(0)
+        assert store.round_trips == round_trips + 1
+        assert all(worker_b.local.get(key) is None for key in ("7", "8", "9"))
+        assert await worker_b.get_or_load(8, v2) == "v2"
+
+        await worker_a.backend.close()
+        await worker_b.backend.close()
+
+    @pytest.mark.asyncio
+    async def test_other_worker_waits_for_lock_holder(self):
+        store = FakeRedis()
+        worker_a, worker_b = self._worker(store), self._worker(store)
+        loads = []
+
+        async def loader(name):
+            loads.append(name)
+            await asyncio.sleep(0.03)
+            return "payload"
+
+        results = await asyncio.gather(
+            worker_a.get_or_load(3, lambda: loader("a")),
+            worker_b.get_or_load(3, lambda: loader("b")),
+        )
+        assert results == ["payload", "payload"]
+        assert loads == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_version_token_changes_on_bump_and_never_repeats(self):
+        backend = InMemoryCacheBackend(max_entries=10, max_bytes=1024)
+        version = VersionToken(backend, "task-list:version", ttl=60)
+        first = await version.get()
+        assert await version.get() == first
+        await version.bump()
+        second = await version.get()
+        assert second != first
+        # Aunque la clave desaparezca, la versión siguiente no repite una anterior
+        await backend.delete("task-list:version")
+        assert await version.get() not in (first, second)
+
@@ -0,0 +1,25 @@
+import gzip
+
+from app.presentation import compression
+from app.presentation.compression import PrecompressedBody, negotiate
+
+
+def test_negotiate_prefers_server_order_and_honours_q_zero():
+    assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate("gzip;q=0.5, br;q=0", ("br", "gzip")) == "gzip"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert negotiate("", ("gzip",)) is None
+
+
+def test_precompressed_body_skips_small_payloads(mocker):
+    mocker.patch.object(compression, "ENCODINGS", ("gzip",))
+    small = PrecompressedBody(b"{}")
+    assert small.variants == {}
+    assert small.select("gzip") == (None, b"{}")
+
+    body = b'{"title": "Tarea"}' * 200
+    large = PrecompressedBody(body, {"X-Next-Cursor": "abc"})
+    encoding, payload = large.select("gzip, br")
+    assert encoding == "gzip"
+    assert gzip.decompress(payload) == body
+    assert len(large) == len(body) + len(payload)
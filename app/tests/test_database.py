@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.infrastructure import database
+from app.infrastructure.pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, POOL_CHECKED_OUT, POOL_CHECKOUTS, POOL_OVERFLOW,
+    POOL_TIMEOUTS, POOL_WAIT_SECONDS, instrument_engine,
+)
+from app.infrastructure.replicas import LEAST_CONNECTIONS, REPLICA_HEALTHY, ROUND_ROBIN, Replica, ReplicaRouter
+
+
+def test_engine_options_from_settings(mocker):
+    mocker.patch.multiple(
+        database, DB_MAX_OVERFLOW=3, DB_POOL_TIMEOUT=2.5, DB_POOL_RECYCLE=1800, DB_POOL_PRE_PING=True,
+        DB_MAX_CONNECTIONS=0, DB_EXTERNAL_POOLER=False,
+    )
+    assert database.engine_options("postgresql://db/tasks", 4) == {
+        "poolclass": InstrumentedQueuePool, "pool_size": 4, "max_overflow": 3,
+        "pool_timeout": 2.5, "pool_recycle": 1800, "pool_pre_ping": True,
+    }
+    assert database.engine_options("postgresql+asyncpg://db/tasks", 4)["poolclass"] is InstrumentedAsyncQueuePool
+    assert database.engine_options("sqlite:///tasks.db", 4) == {}
+
+    # Con tope global de conexiones no hay overflow
+    mocker.patch.object(database, "DB_MAX_CONNECTIONS", 20)
+    assert database.engine_options("postgresql://db/tasks", 2)["max_overflow"] == 0
+
+
+def test_engine_options_for_external_pooler(mocker):
+    mocker.patch.object(database, "DB_EXTERNAL_POOLER", True)
+    assert database.engine_options("postgresql://db/tasks") == {"poolclass": NullPool}
+    assert database.engine_options("postgresql+asyncpg://db/tasks") == {
+        "poolclass": NullPool,
+        "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+    }
+
+
+def test_sync_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    instrument_engine(engine, "sync")
+    checkouts, overflow = POOL_CHECKOUTS.value(pool="sync"), POOL_OVERFLOW.value(pool="sync")
+    timeouts, waited = POOL_TIMEOUTS.value(pool="sync"), POOL_WAIT_SECONDS.value(pool="sync")
+
+    first, second = engine.connect(), engine.connect()
+    assert POOL_CHECKED_OUT.value(pool="sync") == 2
+    assert POOL_OVERFLOW.value(pool="sync") == overflow + 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert POOL_TIMEOUTS.value(pool="sync") == timeouts + 1
+    assert POOL_WAIT_SECONDS.value(pool="sync") >= waited + 0.05
+
+    first.close()
+    second.close()
+    assert POOL_CHECKED_OUT.value(pool="sync") == 0
+    assert POOL_CHECKOUTS.value(pool="sync") == checkouts + 2
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_pool_metrics(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedAsyncQueuePool, pool_size=1,
+    )
+    instrument_engine(engine.sync_engine, "async")
+    checkouts = POOL_CHECKOUTS.value(pool="async")
+
+    async with engine.connect() as connection:
+        await connection.execute(text("select 1"))
+        assert POOL_CHECKED_OUT.value(pool="async") == 1
+    assert POOL_CHECKED_OUT.value(pool="async") == 0
+    assert POOL_CHECKOUTS.value(pool="async") == checkouts + 1
+    await engine.dispose()
+
+
+def test_replica_router_balancing_and_stickiness():
+    now = [0.0]
+    first, second = Replica("r0", None, None), Replica("r1", None, None)
+    router = ReplicaRouter(ROUND_ROBIN, sticky_seconds=2, clock=lambda: now[0])
+    assert router.choose("cliente") is None
+    router.set_replicas([first, second])
+
+    assert [router.choose("cliente").name for _ in range(4)] == ["r0", "r1", "r0", "r1"]
+    second.set_healthy(False)
+    assert [router.choose("cliente").name for _ in range(2)] == ["r0", "r0"]
+    first.set_healthy(False)
+    assert router.choose("cliente") is None
+    first.set_healthy(True)
+    second.set_healthy(True)
+
+    # Las escrituras van al primario y el cliente que escribe lee de él hasta que vence la ventana
+    with router.route("cliente", read_only=False) as replica:
+        assert replica is None
+    router.record_write("cliente")
+    assert router.choose("cliente") is None
+    assert router.choose("otro") is not None
+    now[0] += 2.5
+    assert router.choose("cliente") is not None
+    assert len(router) == 0
+
+    least = ReplicaRouter(LEAST_CONNECTIONS)
+    least.set_replicas([first, second])
+    with least.route("a", read_only=True) as busy:
+        assert busy.in_use == 1
+        assert least.choose("b") is not busy
+    assert busy.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_replica_health_check(tmp_path):
+    healthy = Replica(
+        "sana", None, create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    )
+    broken = Replica(
+        "caida", None, create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'no-existe' / 'x.db'}", poolclass=NullPool)
+    )
+    router = ReplicaRouter()
+    router.set_replicas([healthy, broken])
+
+    await router.check_health()
+    assert healthy.healthy and not broken.healthy
+    assert REPLICA_HEALTHY.value(replica="caida") == 0
+    assert router.choose("cliente") is healthy
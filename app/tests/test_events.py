@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import os
+import threading
+
+import pytest
+
+from app.application.events import ChangeFeed
+from app.domain.interfaces import EventBroker
+
+
+class FakeBroker(EventBroker):
+    """
+    Canal compartido en proceso que imita NOTIFY: entrega cada mensaje a todos los suscriptores,
+    también al que lo envió. Varios ChangeFeed sobre el mismo canal simulan varios workers.
+    """
+    def __init__(self, channel, sequence):
+        self.channel = channel
+        self.sequence = sequence
+
+    async def publish(self, message):
+        event_id = str(next(self.sequence))
+        for callback in list(self.channel):
+            callback(event_id, message)
+
+    async def subscribe(self, callback):
+        self.channel.append(callback)
+
+    async def close(self):
+        pass
+
+
+def test_since_resumes_until_events_leave_the_buffer():
+    feed = ChangeFeed(capacity=3)
+    for task_id in range(1, 6):
+        feed.publish("task.deleted", {"ids": [task_id]})
+
+    assert [event.id for event in feed.since(3)] == [4, 5]
+    assert feed.since(5) == []
+    assert feed.since(2) is not None and feed.since(1) is None
+    assert feed.since(4)[0].message == f'id: {feed.epoch}-5\nevent: task.deleted\ndata: {{"ids": [5]}}\n\n'.encode()
+
+    assert feed.parse_event_id(f"{feed.epoch}-4") == 4
+    for value in (f"{feed.epoch}-9", "otro-4", "basura", None):
+        assert feed.parse_event_id(value) is None
+
+
+def test_epoch_is_generated_in_each_process(mocker):
+    feed = ChangeFeed(capacity=3)
+    parent = feed.epoch
+    assert feed.epoch == parent
+    # Un worker creado con fork hereda el objeto, pero no debe compartir el identificador del padre
+    mocker.patch("app.application.events.os.getpid", return_value=os.getpid() + 1)
+    assert feed.epoch != parent
+
+
+@pytest.mark.asyncio
+async def test_publish_from_executor_thread_wakes_waiters():
+    feed = ChangeFeed(capacity=10)
+    await feed.start()
+    waiters = [asyncio.ensure_future(feed.wait(0, timeout=5)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    thread = threading.Thread(target=feed.publish, args=("task.created", {"task": {"id": 1}}))
+    thread.start()
+    thread.join()
+    assert await asyncio.gather(*waiters) == [True, True, True]
+    assert await feed.wait(1, timeout=0.01) is False
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_other_workers_once():
+    channel, sequence = [], itertools.count(41)
+    worker_a, worker_b = ChangeFeed(10, FakeBroker(channel, sequence)), ChangeFeed(10, FakeBroker(channel, sequence))
+    await worker_a.start()
+    await worker_b.start()
+
+    worker_a.publish("task.updated", {"task": {"id": 7}})
+    worker_b.publish("task.deleted", {"ids": [8]})
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert [event.type for event in worker_a.since(0)] == ["task.updated", "task.deleted"]
+    assert [event.message.split(b"\n")[2] for event in worker_b.since(0)] == [
+        b'data: {"task": {"id": 7}}', b'data: {"ids": [8]}',
+    ]
+
+    # Los ids vienen del broker: un Last-Event-ID de un worker se reanuda en el otro
+    assert [event.key for event in worker_a.since(0)] == [event.key for event in worker_b.since(0)] == ["41", "42"]
+    assert worker_b.parse_event_id(worker_a.event_id(1)) == 1
+    assert [event.type for event in worker_b.since(worker_b.parse_event_id("41"))] == ["task.deleted"]
+
+    await worker_b.close()
+    assert worker_b.closed and await worker_b.wait(1, timeout=5)
@@ -0,0 +1,87 @@
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.adapters.search_index import InvertedIndex, task_search_index, tokenize
+from app.adapters.sqlalchemy_task_repository import SQLAlchemyTaskRepository
+from app.domain.models import Task
+from app.domain.queries import TaskSearchQueryDTO
+from app.infrastructure.database import Base
+
+
+def build_index():
+    index = InvertedIndex()
+    index.apply([
+        (1, "Revisión del informe", "informe trimestral"),
+        (2, "Comprar pan", None),
+        (3, "Informe", "enviar el informe a contabilidad y revisar las cuentas del trimestre"),
+        (4, "Revisar cuentas", "banco"),
+    ])
+    return index
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Revisión  del INFORME, ¡ya!") == ["revision", "del", "informe", "ya"]
+    assert tokenize(None) == []
+
+
+def test_search_requires_all_terms_and_ranks_by_relevance():
+    index = build_index()
+    assert [task_id for _, task_id in index.search("informe")] == [1, 3]
+    assert [task_id for _, task_id in index.search("revisar cuentas")] == [4, 3]
+    assert index.search("informe banco") == []
+    assert index.search("   ") == []
+
+
+def test_search_keyset_after_and_removal():
+    index = build_index()
+    ranked = index.search("informe")
+    assert index.search("informe", after=ranked[0]) == ranked[1:]
+    assert index.search("informe", limit=1) == ranked[:1]
+
+    index.apply([(3, "Informe", "enviado")], checked_ids=[1, 3])
+    assert [task_id for _, task_id in index.search("informe")] == [3]
+    assert index.search("contabilidad") == []
+    assert len(index) == 3
+
+
+def test_sqlite_sync_only_queries_the_table_when_the_version_changes():
+    engine = create_engine("sqlite://")
+    for table in Base.metadata.sorted_tables:
+        table.create(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    task_search_index.clear()
+    with Session(engine) as session:
+        repository = SQLAlchemyTaskRepository(session)
+        for title in ("Informe anual", "Informe mensual", "Comprar pan"):
+            session.add(Task(title=title, priority=2))
+        session.commit()
+
+        def search():
+            statements.clear()
+            return [row.id for row in repository.search_tasks(TaskSearchQueryDTO(q="informe"), None, 10)]
+
+        task_search_index.observe("v1")
+        assert sorted(search()) == [1, 2]
+        # Misma versión y nada sucio: sólo la consulta de candidatos, sin tocar toda la tabla
+        assert sorted(search()) == [1, 2]
+        assert len(statements) == 1
+
+        # Borrado hecho por otro proceso: nueva versión, el recuento no cuadra y se quitan los ids que faltan
+        session.execute(text("DELETE FROM tasks WHERE id = 1"))
+        session.commit()
+        task_search_index.observe("v2")
+        assert search() == [2]
+        assert len(task_search_index) == 2
+        # Incremental: ninguna relectura del texto de toda la tabla
+        assert not any(statement.startswith("SELECT tasks.id, tasks.title") and "WHERE" not in statement
+                       for statement in statements)
+
+        # Borrado de este proceso: lo cubre el conjunto sucio, sin recuento ni recarga
+        session.execute(text("DELETE FROM tasks WHERE id = 2"))
+        session.commit()
+        task_search_index.mark_dirty([2])
+        assert search() == []
+        assert not any("count(" in statement.lower() for statement in statements)
+        assert len(task_search_index) == 1
+    task_search_index.clear()
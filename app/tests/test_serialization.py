@@ -0,0 +1,54 @@
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.presentation.dtos import COMMENT_RESPONSE_FIELDS, TASK_RESPONSE_FIELDS, CommentResponseDTO, TaskResponseDTO
+from app.presentation.serialization import TaskJSONEncoder
+from benchmarks.serialization import build_rows
+
+
+def test_response_fields_follow_the_response_dtos():
+    # El dominio fija el orden de las columnas sin depender de presentation: debe coincidir con los DTOs
+    assert TASK_RESPONSE_FIELDS == tuple(TaskResponseDTO.__fields__)
+    assert COMMENT_RESPONSE_FIELDS == tuple(CommentResponseDTO.__fields__)
+
+
+def reference(row) -> str:
+    task = SimpleNamespace(**dict(zip(TASK_RESPONSE_FIELDS, row)))
+    return json.dumps(TaskResponseDTO.from_orm(task).dict(), default=str)
+
+
+@pytest.mark.parametrize("values", [
+    {"title": "Señal ✓ \"comillas\"\n\\", "description": None, "due_date": None, "category": None},
+    {"title": "Tarea", "description": "x" * 300, "due_date": datetime(2025, 1, 2, 3, 4, 5, 6)},
+    {"title": "UTC", "due_date": datetime(2025, 1, 2, tzinfo=timezone(timedelta(hours=-3)))},
+])
+def test_row_encoder_matches_pydantic_json(values):
+    base = dict(zip(TASK_RESPONSE_FIELDS, build_rows(1)[0]))
+    row = tuple({**base, **values}[field] for field in TASK_RESPONSE_FIELDS)
+    assert TaskJSONEncoder().row(row) == reference(row)
+
+
+def test_array_and_task_match_pydantic_json():
+    rows = build_rows(50)
+    encoder = TaskJSONEncoder()
+    expected = json.dumps([json.loads(reference(row)) for row in rows], default=str)
+    assert encoder.array(rows) == expected
+    assert encoder.array([]) == "[]"
+    task = TaskResponseDTO(**dict(zip(TASK_RESPONSE_FIELDS, rows[0])))
+    assert encoder.task(task) == reference(rows[0])
+
+
+def test_array_with_comments_matches_json_dumps():
+    rows = build_rows(2)
+    comment = (7, 1, "Revisado ✓", datetime(2025, 7, 21, 8, 30))
+    comments = {1: [comment]}
+    encoder, comment_encoder = TaskJSONEncoder(), TaskJSONEncoder(COMMENT_RESPONSE_FIELDS, CommentResponseDTO)
+    encoded = encoder.array_with(rows, "comments", lambda row: comment_encoder.array(comments.get(row[0], ())))
+    expected = [
+        {**dict(zip(TASK_RESPONSE_FIELDS, row)), "comments": [dict(zip(COMMENT_RESPONSE_FIELDS, c)) for c in comments.get(row[0], ())]}
+        for row in rows
+    ]
+    assert encoded == json.dumps(expected, default=str)
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.infrastructure import database
+from app.infrastructure.server import HTTP_IN_FLIGHT, drain
+
+
+@pytest.mark.parametrize("max_connections, processes, expected", [
+    (0, 8, 5),    # Sin tope global: DB_POOL_SIZE por worker
+    (20, 8, 2),   # 8 workers * 2 conexiones <= 20
+    (100, 4, 5),  # Nunca por encima de DB_POOL_SIZE
+    (3, 8, 1),    # Al menos una conexión por worker
+])
+def test_worker_pool_size(mocker, max_connections, processes, expected):
+    mocker.patch.object(database, "DB_POOL_SIZE", 5)
+    mocker.patch.object(database, "DB_MAX_CONNECTIONS", max_connections)
+    assert database.worker_pool_size(processes) == expected
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests(mocker):
+    dispose = mocker.patch("app.infrastructure.server.database.dispose_engine", new=AsyncMock())
+    server = MagicMock()
+    server.close_all_connections = AsyncMock()
+    HTTP_IN_FLIGHT.inc()
+
+    async def finish_request():
+        await asyncio.sleep(0.05)
+        assert not server.close_all_connections.called
+        HTTP_IN_FLIGHT.dec()
+
+    await asyncio.gather(drain(server, timeout=5, poll_interval=0.01), finish_request())
+    server.stop.assert_called_once()
+    server.close_all_connections.assert_awaited_once()
+    dispose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_timeout(mocker):
+    mocker.patch("app.infrastructure.server.database.dispose_engine", new=AsyncMock())
+    server = MagicMock()
+    server.close_all_connections = AsyncMock()
+    HTTP_IN_FLIGHT.inc()
+    try:
+        await asyncio.wait_for(drain(server, timeout=0.05, poll_interval=0.01), timeout=1)
+    finally:
+        HTTP_IN_FLIGHT.dec()
+    server.close_all_connections.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_drain_stops_the_application_before_closing_connections(mocker):
+    mocker.patch("app.infrastructure.server.database.dispose_engine", new=AsyncMock())
+    server = MagicMock()
+    server.close_all_connections = AsyncMock()
+    order = []
+    server.close_all_connections.side_effect = lambda: order.append("close_all_connections")
+
+    async def on_stop():
+        order.append("on_stop")
+
+    await drain(server, timeout=1, poll_interval=0.01, on_stop=on_stop)
+    assert order == ["on_stop", "close_all_connections"]
+
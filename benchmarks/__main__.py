@@ -0,0 +1,74 @@
+"""
+Uso:
+    python -m benchmarks --tasks 10000 --concurrency 32 --duration 30 --output results.json
+    python -m benchmarks --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import tornado.ioloop
+
+from app.infrastructure import database
+from benchmarks.harness import compare_results, configure_database, parse_mix, run_workload, seed, start_server
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API de tareas.")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL"),
+                        help="Base de datos desechable (se borra y se siembra). Por defecto, un SQLite temporal.")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--comments-per-task", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30, help="Segundos medidos.")
+    parser.add_argument("--warmup", type=float, default=3, help="Segundos iniciales que no se miden.")
+    parser.add_argument("--mix", help="Pesos por operación, p. ej. list=30,detail=50,create=10,update=10.")
+    parser.add_argument("--output", help="Fichero donde guardar el JSON de resultados.")
+    parser.add_argument("--baseline", help="JSON de resultados previo contra el que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Empeoramiento relativo admitido frente al baseline.")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='tasks-bench-')}/bench.db"
+    configure_database(url)
+    seed(args.tasks, args.comments_per_task)
+    # El proceso servidor abre sus propias conexiones tras el fork
+    database.engine.dispose()
+
+    process, port = start_server(url)
+    try:
+        results = tornado.ioloop.IOLoop.current().run_sync(lambda: run_workload(
+            f"http://127.0.0.1:{port}", args.tasks, parse_mix(args.mix),
+            args.concurrency, args.duration, args.warmup,
+        ))
+    finally:
+        process.terminate()
+        process.join()
+
+    report = {
+        "config": {
+            "database": url.split("://")[0], "tasks": args.tasks, "comments_per_task": args.comments_per_task,
+            "concurrency": args.concurrency, "duration": args.duration, "mix": parse_mix(args.mix),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Arnés de carga: levanta make_app() en un proceso aparte contra una base de datos desechable,
+la siembra con tareas y comentarios y mide throughput y latencias de una mezcla de peticiones.
+"""
+import json
+import multiprocessing
+import os
+import random
+import socket
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import tornado.gen
+import tornado.httpclient
+import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
+
+from app.infrastructure import database
+
+# Mezcla por defecto: mayoría de lecturas, como el tráfico del frontend
+DEFAULT_MIX = {"list": 30, "detail": 50, "create": 10, "update": 10}
+# Métricas que compare_results vigila frente al baseline
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+def configure_database(url: str):
+    """Apunta los engines de la aplicación a la base de datos del benchmark."""
+    database.DATABASE_URL = url
+    database.ASYNC_DATABASE_URL = database.to_async_url(url)
+    database.init_engine()
+
+def seed(tasks: int, comments_per_task: int, batch_size: int = 1000):
+    """Recrea el esquema y siembra tareas (con comentarios) en lotes."""
+    from app.domain.models import Comment, Task
+
+    database.Base.metadata.drop_all(database.engine)
+    database.Base.metadata.create_all(database.engine)
+    rng = random.Random(42)
+    with database.SessionLocal() as db:
+        for start in range(1, tasks + 1, batch_size):
+            batch = [
+                Task(
+                    title=f"Tarea {i}",
+                    description=f"Descripción de la tarea {i}",
+                    completed=rng.random() < 0.3,
+                    priority=rng.randint(1, 3),
+                    category=rng.choice(("Trabajo", "Hogar", "Estudio", None)),
+                    comments=[Comment(content=f"Comentario {j}") for j in range(comments_per_task)],
+                )
+                for i in range(start, min(start + batch_size, tasks + 1))
+            ]
+            db.add_all(batch)
+            db.commit()
+
+def _serve(sockets: List[socket.socket], url: str):
+    # Proceso hijo: engines propios tras el fork, igual que un worker de app.infrastructure.server.
+    # Todo el tráfico sale de 127.0.0.1: el rate limit por cliente se desactiva aunque se active en el entorno
+    os.environ["RATE_LIMIT_RPS"] = "0"
+    from app.main import make_app
+
+    configure_database(url)
+    server = tornado.httpserver.HTTPServer(make_app())
+    server.add_sockets(sockets)
+    tornado.ioloop.IOLoop.current().start()
+
+def start_server(url: str) -> Tuple[multiprocessing.Process, int]:
+    """Arranca la API en un proceso propio para que el cliente no compita por su IOLoop."""
+    sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    process = multiprocessing.get_context("fork").Process(target=_serve, args=(sockets, url), daemon=True)
+    process.start()
+    for sock in sockets:
+        sock.close()
+    return process, port
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+def build_requests(base_url: str, task_count: int, rng: random.Random) -> Dict[str, Callable[[], dict]]:
+    """Cada operación de la mezcla devuelve los argumentos de un HTTPRequest."""
+    def task_url() -> str:
+        return f"{base_url}/tasks/{rng.randint(1, task_count)}"
+
+    return {
+        "list": lambda: {"url": f"{base_url}/tasks?limit=50&sort=-id"},
+        "detail": lambda: {"url": task_url()},
+        "create": lambda: {
+            "url": f"{base_url}/tasks", "method": "POST",
+            "body": json.dumps({"title": "Tarea de carga", "priority": rng.randint(1, 3)}),
+        },
+        "update": lambda: {
+            "url": task_url(), "method": "PUT",
+            "body": json.dumps({"completed": rng.random() < 0.5}),
+        },
+    }
+
+async def run_workload(
+    base_url: str,
+    task_count: int,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    seed_value: int = 7,
+) -> dict:
+    """Lanza `concurrency` clientes en bucle durante `duration` segundos (tras `warmup`)."""
+    rng = random.Random(seed_value)
+    requests = build_requests(base_url, task_count, rng)
+    operations, weights = zip(*mix.items())
+    client = tornado.httpclient.AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    latencies: Dict[str, List[float]] = {operation: [] for operation in operations}
+    errors: Dict[str, int] = {operation: 0 for operation in operations}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker():
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            operation = rng.choices(operations, weights)[0]
+            response = await client.fetch(
+                tornado.httpclient.HTTPRequest(**requests[operation]()), raise_error=False
+            )
+            finished = time.perf_counter()
+            if now < measure_from:
+                continue
+            latencies[operation].append(finished - now)
+            if response.code >= 400:
+                errors[operation] += 1
+
+    await tornado.gen.multi([worker() for _ in range(concurrency)])
+    client.close()
+    elapsed = time.perf_counter() - measure_from
+
+    results = {operation: summarize(latencies[operation], errors[operation], elapsed) for operation in operations}
+    everything = [latency for values in latencies.values() for latency in values]
+    results["total"] = summarize(everything, sum(errors.values()), elapsed)
+    return results
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regresiones frente al baseline: latencias que suben o throughput que baja más de `tolerance`."""
+    regressions = []
+    for operation, base in baseline.items():
+        current = results.get(operation)
+        if current is None:
+            continue
+        for key in LATENCY_KEYS:
+            if base.get(key) and current[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{operation}.{key}: {current[key]} > {base[key]} (+{tolerance:.0%})")
+        if base.get("rps") and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{operation}.rps: {current['rps']} < {base['rps']} (-{tolerance:.0%})")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{operation}.errors: {current['errors']} > {base.get('errors', 0)}")
+    return regressions
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """Convierte "list=30,detail=50" en {"list": 30, "detail": 50}."""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        operation, _, weight = part.partition("=")
+        if operation not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {operation!r}")
+        mix[operation] = int(weight)
+    return mix
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark de serialización de listados, sin red ni base de datos.
+
+Uso:
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+from app.presentation.dtos import TASK_RESPONSE_FIELDS, TaskResponseDTO
+from app.presentation.serialization import TaskJSONEncoder, build_task_encoder
+
+def build_rows(count: int) -> List[Tuple]:
+    """Filas con la forma de TASK_ROW_COLUMNS: textos no ASCII, nulos y fechas con microsegundos."""
+    created = datetime(2025, 7, 20, 9, 0, 0, 123456)
+    rows = []
+    for i in range(1, count + 1):
+        values = {
+            "id": i,
+            "title": f"Tarea {i} — revisión \"urgente\"",
+            "description": None if i % 3 else f"Descripción de la tarea {i}",
+            "completed": i % 4 == 0,
+            "due_date": None if i % 2 else created + timedelta(days=i % 30),
+            "priority": i % 3 + 1,
+            "category": None if i % 5 == 0 else "Trabajo",
+            "created_at": created + timedelta(seconds=i),
+            "updated_at": created + timedelta(seconds=i, microseconds=i % 7),
+        }
+        rows.append(tuple(values[field] for field in TASK_RESPONSE_FIELDS))
+    return rows
+
+def pydantic_path(rows: List[Tuple]) -> str:
+    """Camino anterior: entidad → TaskResponseDTO.from_orm → dict() → json.dumps(default=str)."""
+    tasks = [SimpleNamespace(**dict(zip(TASK_RESPONSE_FIELDS, row))) for row in rows]
+    return json.dumps([TaskResponseDTO.from_orm(task).dict() for task in tasks], default=str)
+
+def best_of(function: Callable[[], str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara la serialización con pydantic frente a la de filas.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rows = build_rows(args.rows)
+    encoder = build_task_encoder()
+    identical = pydantic_path(rows) == TaskJSONEncoder().array(rows)
+    baseline = best_of(lambda: pydantic_path(rows), args.repeat)
+    fast = best_of(lambda: encoder.array(rows), args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "encoder": type(encoder).__name__,
+        "identical_output": identical,
+        "pydantic_ms": round(baseline * 1000, 2),
+        "encoder_ms": round(fast * 1000, 2),
+        "speedup": round(baseline / fast, 2),
+    }, indent=2))
+    return 0 if identical else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
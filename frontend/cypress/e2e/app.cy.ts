@@ -14,13 +14,17 @@ describe('Theme Toggle Functionality', () => {
     };
   
     beforeEach(() => {
-      cy.intercept('GET', 'http://localhost:8888/tasks', (req) => {
+      cy.intercept({ method: 'GET', url: 'http://localhost:8888/tasks?*' }, (req) => {
         req.reply({
           statusCode: 200,
           body: [],
           delay: 500,
         });
       }).as('getTasksSlowly');
+      cy.intercept('GET', 'http://localhost:8888/tasks/stats', {
+        statusCode: 200,
+        body: { total: 0, completed: 0, pending: 0, overdue: 0, by_priority: {}, by_category: {}, uncategorized: 0 },
+      });
   
       cy.visit(FRONTEND_URL);
     });
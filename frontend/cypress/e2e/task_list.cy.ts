@@ -4,7 +4,7 @@ describe('Task List Component', () => {
   
     beforeEach(() => {
       // Intercepta las peticiones GET de tareas
-      cy.intercept('GET', `${BACKEND_API_URL}/tasks`, {
+      cy.intercept({ method: 'GET', url: `${BACKEND_API_URL}/tasks?*` }, {
         statusCode: 200,
         body: [
           {
@@ -27,6 +27,12 @@ describe('Task List Component', () => {
           },
         ],
       }).as('getTasks');
+
+      // Contadores del dashboard
+      cy.intercept('GET', `${BACKEND_API_URL}/tasks/stats`, {
+        statusCode: 200,
+        body: { total: 2, completed: 1, pending: 1, overdue: 0, by_priority: {}, by_category: {}, uncategorized: 2 },
+      }).as('getStats');
   
       // Visita la aplicación frontend
       cy.visit(FRONTEND_URL);
@@ -163,4 +169,30 @@ describe('Task List Component', () => {
 
       cy.contains(taskTitleToDelete).should('not.exist');
     });
-  });
\ No newline at end of file
+
+    it('should filter on the server and take the counts from /tasks/stats', () => {
+      cy.contains('Total de Tareas').prev().should('have.text', '2');
+
+      cy.intercept({ method: 'GET', url: `${BACKEND_API_URL}/tasks?*`, query: { completed: 'true' } }, {
+        statusCode: 200,
+        body: [
+          {
+            id: 2,
+            title: 'Tarea Inicial Test 2',
+            description: 'Esta es la segunda tarea cargada por el test.',
+            completed: true,
+            priority: 1,
+            created_at: '2025-07-20T11:00:00Z',
+            updated_at: '2025-07-20T11:00:00Z',
+          },
+        ],
+      }).as('getCompletedTasks');
+
+      cy.get('select[id="task-filter"]').select('completed');
+      cy.wait('@getCompletedTasks');
+
+      cy.contains('Tarea Inicial Test 2').should('be.visible');
+      cy.contains('Tarea Inicial Test 1').should('not.exist');
+      cy.contains('Tareas visibles: 1 de 1').should('be.visible');
+    });
+  });
@@ -107,4 +107,19 @@ export const TaskActions = styled.div`
 export const TaskCount = styled.p`
   font-size: 0.9em;
   white-space: nowrap;
-`;
\ No newline at end of file
+`;
+export const LoadMoreButton = styled.button`
+  display: block;
+  margin: ${({ theme }) => theme.spacing.medium} auto 0;
+  background-color: ${({ theme }) => theme.colors.primary};
+  color: ${({ theme }) => theme.colors.white};
+  border: none;
+  padding: ${({ theme }) => theme.spacing.small} ${({ theme }) => theme.spacing.large};
+  border-radius: ${({ theme }) => theme.borderRadius};
+  cursor: pointer;
+
+  &:disabled {
+    opacity: 0.6;
+    cursor: default;
+  }
+`;
@@ -1,7 +1,9 @@
-import React, { useEffect, useState, useMemo } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useSelector, useDispatch } from 'react-redux';
 import { RootState, AppDispatch } from '../../app/store';
-import { fetchTasks, updateTask, deleteTask, Task } from '../tasks/tasksSlice';
+import {
+  fetchTasks, fetchMoreTasks, fetchTaskStats, updateTask, deleteTask, subscribeToTaskEvents, Task, TaskFilterValue,
+} from '../tasks/tasksSlice';
 
 import TaskForm from './components/TaskForm/TaskForm';
 import TaskDashboard from './components/TaskDashboard/TaskDashboard';
@@ -16,31 +18,34 @@ import {
   AddTaskButton,
   TaskListHeader,
   TaskCount,
+  LoadMoreButton,
 } from './TaskList.styles';
 
 const TaskList: React.FC = () => {
   const tasks = useSelector((state: RootState) => state.tasks.tasks);
   const status = useSelector((state: RootState) => state.tasks.status);
   const error = useSelector((state: RootState) => state.tasks.error);
+  // El filtro se aplica en el servidor: la lista sólo contiene las páginas cargadas de ese filtro
+  const filter = useSelector((state: RootState) => state.tasks.filter);
+  const nextCursor = useSelector((state: RootState) => state.tasks.nextCursor);
+  const loadingMore = useSelector((state: RootState) => state.tasks.loadingMore);
+  const stats = useSelector((state: RootState) => state.tasks.stats);
   const dispatch = useDispatch<AppDispatch>();
   const [showForm, setShowForm] = useState(false);
   const [taskToEdit, setTaskToEdit] = useState<Task | undefined>(undefined);
-  const [filter, setFilter] = useState<'all' | 'completed' | 'pending'>('all'); // Estado para el filtro
 
   useEffect(() => {
     if (status === 'idle') {
       dispatch(fetchTasks());
+      dispatch(fetchTaskStats());
     }
   }, [status, dispatch]);
 
-  const filteredTasks = useMemo(() => {
-    if (filter === 'completed') {
-      return tasks.filter(task => task.completed);
-    } else if (filter === 'pending') {
-      return tasks.filter(task => !task.completed);
-    }
-    return tasks;
-  }, [tasks, filter]);
+  // Cambios hechos desde otras pestañas o usuarios, sin volver a pedir la lista
+  useEffect(() => dispatch(subscribeToTaskEvents()), [dispatch]);
+
+  // Total del filtro actual según /tasks/stats, no según las páginas cargadas
+  const filterTotal = stats && { all: stats.total, completed: stats.completed, pending: stats.pending }[filter];
 
   const handleToggleComplete = (task: Task) => {
     dispatch(updateTask({ id: task.id, completed: !task.completed }));
@@ -65,8 +70,12 @@ const TaskList: React.FC = () => {
     setTaskToEdit(undefined);
   };
 
-  const handleFilterChange = (newFilter: 'all' | 'completed' | 'pending') => {
-    setFilter(newFilter);
+  const handleFilterChange = (newFilter: TaskFilterValue) => {
+    dispatch(fetchTasks(newFilter));
+  };
+
+  const handleLoadMore = () => {
+    dispatch(fetchMoreTasks());
   };
 
   if (status === 'loading') {
@@ -88,7 +97,7 @@ const TaskList: React.FC = () => {
         {/* Componente de filtro */}
         <TaskFilter currentFilter={filter} onFilterChange={handleFilterChange} />
         {/* Contador de tareas visibles */}
-        <TaskCount>Tareas visibles: {filteredTasks.length} de {tasks.length}</TaskCount>
+        <TaskCount>Tareas visibles: {tasks.length} de {filterTotal ?? '…'}</TaskCount>
       </TaskListHeader>
 
       {/* Botón para añadir nueva tarea (solo visible si el formulario no está abierto) */}
@@ -102,8 +111,8 @@ const TaskList: React.FC = () => {
       )}
 
       <ul>
-        {filteredTasks.length > 0 ? (
-          filteredTasks.map((task) => (
+        {tasks.length > 0 ? (
+          tasks.map((task) => (
             <TaskItem key={task.id}>
               <div>
                 <TaskTitle completed={task.completed}>
@@ -128,6 +137,12 @@ const TaskList: React.FC = () => {
           <p>No hay tareas para mostrar con el filtro actual.</p>
         )}
       </ul>
+
+      {nextCursor && (
+        <LoadMoreButton onClick={handleLoadMore} disabled={loadingMore}>
+          {loadingMore ? 'Cargando...' : 'Cargar más'}
+        </LoadMoreButton>
+      )}
     </TaskListWrapper>
   );
 };
@@ -17,11 +17,12 @@ import { RootState } from '../../../../app/store';
 ChartJS.register(ArcElement, Tooltip, Legend);
 
 const TaskDashboard: React.FC = () => {
-  const tasks = useSelector((state: RootState) => state.tasks.tasks);
+  // Contadores de GET /tasks/stats: la lista sólo tiene las páginas cargadas
+  const stats = useSelector((state: RootState) => state.tasks.stats);
   const theme = useTheme();
-  const completedTasks = tasks.filter(task => task.completed).length;
-  const pendingTasks = tasks.filter(task => !task.completed).length;
-  const totalTasks = tasks.length;
+  const completedTasks = stats?.completed ?? 0;
+  const pendingTasks = stats?.pending ?? 0;
+  const totalTasks = stats?.total ?? 0;
 
   const data = {
     labels: ['Completadas', 'Pendientes'],
@@ -1,9 +1,10 @@
 import React from 'react';
 import { FilterContainer, FilterLabel, FilterSelect } from '../TaskFilter/TaskFilter.styles';
+import { TaskFilterValue } from '../../tasksSlice';
 
 interface TaskFilterProps {
-  currentFilter: 'all' | 'completed' | 'pending';
-  onFilterChange: (filter: 'all' | 'completed' | 'pending') => void;
+  currentFilter: TaskFilterValue;
+  onFilterChange: (filter: TaskFilterValue) => void;
 }
 
 const TaskFilter: React.FC<TaskFilterProps> = ({ currentFilter, onFilterChange }) => {
@@ -13,7 +14,7 @@ const TaskFilter: React.FC<TaskFilterProps> = ({ currentFilter, onFilterChange }
       <FilterSelect
         id="task-filter"
         value={currentFilter}
-        onChange={(e) => onFilterChange(e.target.value as 'all' | 'completed' | 'pending')}
+        onChange={(e) => onFilterChange(e.target.value as TaskFilterValue)}
       >
         <option value="all">Todas</option>
         <option value="completed">Completadas</option>
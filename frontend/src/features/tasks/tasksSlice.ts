@@ -1,4 +1,4 @@
-import { createSlice, createAsyncThunk, PayloadAction } from '@reduxjs/toolkit';
+import { createSlice, createAsyncThunk, PayloadAction, Dispatch } from '@reduxjs/toolkit';
 const API_BASE_URL = 'http://localhost:8888'
 export interface Task {
   id: number;
@@ -10,31 +10,89 @@ export interface Task {
   updated_at: string;
 }
 
+export type TaskFilterValue = 'all' | 'completed' | 'pending';
+
+// Contadores agregados de GET /tasks/stats
+export interface TaskStats {
+  total: number;
+  completed: number;
+  pending: number;
+}
+
 // Define el estado inicial del slice de tareas
 interface TasksState {
+  // Páginas ya cargadas del listado, filtrado en el servidor
   tasks: Task[];
+  filter: TaskFilterValue;
+  // Cursor de la página siguiente (null si no hay más)
+  nextCursor: string | null;
+  stats: TaskStats | null;
   status: 'idle' | 'loading' | 'succeeded' | 'failed';
+  loadingMore: boolean;
   error: string | null;
 }
 
 const initialState: TasksState = {
   tasks: [],
+  filter: 'all',
+  nextCursor: null,
+  stats: null,
   status: 'idle',
+  loadingMore: false,
   error: null,
 };
 
-export const fetchTasks = createAsyncThunk<Task[], void>(
+// Tareas por página: el resto se pide con "Cargar más"
+const TASKS_PAGE_SIZE = 50;
+
+const matchesFilter = (task: Task, filter: TaskFilterValue) =>
+  filter === 'all' || task.completed === (filter === 'completed');
+
+interface TasksPage {
+  tasks: Task[];
+  nextCursor: string | null;
+}
+
+// Una página de GET /tasks con el filtro aplicado en el servidor; X-Next-Cursor apunta a la siguiente
+const fetchTasksPage = async (filter: TaskFilterValue, cursor: string | null): Promise<TasksPage> => {
+  const params = new URLSearchParams({ limit: String(TASKS_PAGE_SIZE) });
+  if (filter !== 'all') {
+    params.set('completed', String(filter === 'completed'));
+  }
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const response = await fetch(`${API_BASE_URL}/tasks?${params}`);
+  if (!response.ok) {
+    throw new Error('No se pudieron obtener las tareas.');
+  }
+  const tasks: Task[] = await response.json();
+  return { tasks, nextCursor: response.headers.get('X-Next-Cursor') };
+};
+
+// Primera página con el filtro indicado (o el actual, p. ej. al recargar tras un "reset")
+export const fetchTasks = createAsyncThunk<TasksPage, TaskFilterValue | undefined, { state: { tasks: TasksState } }>(
   'tasks/fetchTasks',
+  async (filter, { getState }) => fetchTasksPage(filter ?? getState().tasks.filter, null)
+);
+
+export const fetchMoreTasks = createAsyncThunk<TasksPage, void, { state: { tasks: TasksState } }>(
+  'tasks/fetchMoreTasks',
+  async (_, { getState }) => {
+    const { filter, nextCursor } = getState().tasks;
+    return fetchTasksPage(filter, nextCursor);
+  }
+);
+
+// Los contadores del dashboard salen de una sola consulta agregada, no de las tareas cargadas
+export const fetchTaskStats = createAsyncThunk<TaskStats, void>(
+  'tasks/fetchTaskStats',
   async () => {
-    const response = await fetch(`${API_BASE_URL}/tasks`);
-    const data: Task[] = await response.json();
-    console.log('DATA', data);
-    
+    const response = await fetch(`${API_BASE_URL}/tasks/stats`);
     if (!response.ok) {
-      throw new Error('No se pudieron obtener las tareas.');
+      throw new Error('No se pudieron obtener las estadísticas.');
     }
-    
-    return data;
+    return response.json();
   }
 );
 
@@ -87,27 +145,124 @@ export const deleteTask = createAsyncThunk<number, number>(
   }
 );
 
+// Delta recibido por /tasks/events: la tarea completa (altas y ediciones) o sólo ids (borrados y lotes)
+export interface TaskEvent {
+  type: 'task.created' | 'task.updated' | 'task.deleted';
+  task?: Task;
+  ids?: number[];
+}
+
+const TASK_EVENT_TYPES: TaskEvent['type'][] = ['task.created', 'task.updated', 'task.deleted'];
+
+// Milisegundos que se agrupan los eventos antes de volver a pedir los contadores
+const STATS_REFRESH_DELAY = 500;
+
+// Mantiene la lista al día con Server-Sent Events en lugar de volver a pedirla; devuelve la función para cerrar la conexión.
+// EventSource reconecta solo y el servidor reenvía lo perdido; si no puede, envía "reset" y se recarga la primera página.
+export const subscribeToTaskEvents = () => (dispatch: Dispatch<any>) => {
+  const source = new EventSource(`${API_BASE_URL}/tasks/events`);
+  let statsTimer: ReturnType<typeof setTimeout> | null = null;
+  // Una ráfaga de cambios se traduce en una sola petición a /tasks/stats
+  const refreshStats = () => {
+    if (statsTimer === null) {
+      statsTimer = setTimeout(() => {
+        statsTimer = null;
+        dispatch(fetchTaskStats());
+      }, STATS_REFRESH_DELAY);
+    }
+  };
+  const onTaskEvent = (event: MessageEvent) => {
+    const taskEvent: TaskEvent = { type: event.type as TaskEvent['type'], ...JSON.parse(event.data) };
+    if (taskEvent.type === 'task.updated' && !taskEvent.task) {
+      // Modificación por lotes: sólo llegan los ids
+      dispatch(fetchTasks());
+    } else {
+      dispatch(taskEventReceived(taskEvent));
+    }
+    refreshStats();
+  };
+  TASK_EVENT_TYPES.forEach((type) => source.addEventListener(type, onTaskEvent as EventListener));
+  source.addEventListener('reset', () => {
+    dispatch(fetchTasks());
+    dispatch(fetchTaskStats());
+  });
+  return () => {
+    if (statsTimer !== null) {
+      clearTimeout(statsTimer);
+    }
+    source.close();
+  };
+};
+
 const tasksSlice = createSlice({
   name: 'tasks',
   initialState,
-  reducers: { },
+  reducers: {
+    taskEventReceived: (state, action: PayloadAction<TaskEvent>) => {
+      const { task, ids } = action.payload;
+      if (task) {
+        const index = state.tasks.findIndex((current) => current.id === task.id);
+        if (!matchesFilter(task, state.filter)) {
+          // Ya no entra en el filtro (p. ej. se completó viendo las pendientes)
+          if (index !== -1) {
+            state.tasks.splice(index, 1);
+          }
+        } else if (index === -1) {
+          // Las altas nuevas llegan al final del orden por id: si quedan páginas, aparecerán al cargarlas
+          if (state.nextCursor === null) {
+            state.tasks.push(task);
+          }
+        } else {
+          state.tasks[index] = task;
+        }
+      } else if (ids) {
+        state.tasks = state.tasks.filter((current) => !ids.includes(current.id));
+      }
+    },
+  },
   extraReducers: (builder) => {
     builder
       // Manejo de fetchTasks
-      .addCase(fetchTasks.pending, (state) => {
+      .addCase(fetchTasks.pending, (state, action) => {
         state.status = 'loading';
+        state.filter = action.meta.arg ?? state.filter;
       })
-      .addCase(fetchTasks.fulfilled, (state, action: PayloadAction<Task[]>) => {
+      .addCase(fetchTasks.fulfilled, (state, action) => {
         state.status = 'succeeded';
-        state.tasks = action.payload; // Reemplaza las tareas con las obtenidas de la API
+        state.tasks = action.payload.tasks; // Reemplaza las tareas con la primera página obtenida de la API
+        state.nextCursor = action.payload.nextCursor;
       })
       .addCase(fetchTasks.rejected, (state, action) => {
         state.status = 'failed';
         state.error = action.error.message || 'Error al obtener tareas.';
       })
+      // Manejo de fetchMoreTasks
+      .addCase(fetchMoreTasks.pending, (state) => {
+        state.loadingMore = true;
+      })
+      .addCase(fetchMoreTasks.fulfilled, (state, action) => {
+        state.loadingMore = false;
+        // Una tarea recibida por evento mientras tanto puede venir también en la página
+        const loaded = new Set(state.tasks.map((task) => task.id));
+        state.tasks.push(...action.payload.tasks.filter((task) => !loaded.has(task.id)));
+        state.nextCursor = action.payload.nextCursor;
+      })
+      .addCase(fetchMoreTasks.rejected, (state, action) => {
+        state.loadingMore = false;
+        state.error = action.error.message || 'Error al obtener tareas.';
+      })
+      // Manejo de fetchTaskStats
+      .addCase(fetchTaskStats.fulfilled, (state, action: PayloadAction<TaskStats>) => {
+        state.stats = action.payload;
+      })
       // Manejo de addNewTask
       .addCase(addNewTask.fulfilled, (state, action: PayloadAction<Task>) => {
-        state.tasks.push(action.payload); // Añade la nueva tarea (con ID real del backend)
+        // El evento task.created puede haber llegado antes que la respuesta
+        const created = action.payload;
+        if (matchesFilter(created, state.filter) && state.nextCursor === null
+            && !state.tasks.some((task) => task.id === created.id)) {
+          state.tasks.push(created); // Añade la nueva tarea (con ID real del backend)
+        }
       })
       .addCase(addNewTask.rejected, (state, action) => {
         state.error = action.error.message || 'Error al añadir tarea.';
@@ -117,7 +272,11 @@ const tasksSlice = createSlice({
         const updatedTask = action.payload;
         const index = state.tasks.findIndex((task) => task.id === updatedTask.id);
         if (index !== -1) {
-          state.tasks[index] = updatedTask; // Actualiza la tarea en el estado
+          if (matchesFilter(updatedTask, state.filter)) {
+            state.tasks[index] = updatedTask; // Actualiza la tarea en el estado
+          } else {
+            state.tasks.splice(index, 1); // Sale del filtro actual
+          }
         }
       })
       .addCase(updateTask.rejected, (state, action) => {
@@ -134,4 +293,6 @@ const tasksSlice = createSlice({
   },
 });
 
+export const { taskEventReceived } = tasksSlice.actions;
+
 export default tasksSlice.reducer;
\ No newline at end of file
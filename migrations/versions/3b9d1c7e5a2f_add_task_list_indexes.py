@@ -0,0 +1,38 @@
+"""Add composite indexes for task list filters and keyset pagination
+
+Revision ID: 3b9d1c7e5a2f
+Revises: f74c225c0025
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d1c7e5a2f'
+down_revision = 'f74c225c0025'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_tasks_completed_id', ['completed', 'id']),
+    ('ix_tasks_priority_id', ['priority', 'id']),
+    ('ix_tasks_category_id', ['category', 'id']),
+    ('ix_tasks_due_date_id', ['due_date', 'id']),
+    ('ix_tasks_created_at_id', ['created_at', 'id']),
+    ('ix_tasks_updated_at_id', ['updated_at', 'id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no bloquea escrituras, pero no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True)
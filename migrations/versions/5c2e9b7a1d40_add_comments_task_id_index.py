@@ -0,0 +1,29 @@
+"""Add a (task_id, id) index on comments
+
+Revision ID: 5c2e9b7a1d40
+Revises: 8e4f2a6c9d13
+Create Date: 2026-10-18 15:02:44.871305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e9b7a1d40'
+down_revision = '8e4f2a6c9d13'
+branch_labels = None
+depends_on = None
+
+# Sirve a la vez al IN (task_id, ...) de ?include=comments, a la paginación por id y al ON DELETE CASCADE
+INDEX = 'ix_comments_task_id_id'
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(INDEX, 'comments', ['task_id', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name='comments', postgresql_concurrently=True)
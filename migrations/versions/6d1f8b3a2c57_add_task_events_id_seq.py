@@ -0,0 +1,27 @@
+"""Add the task_events_id_seq sequence for change feed event ids shared by all workers
+
+Revision ID: 6d1f8b3a2c57
+Revises: 9a7d3c1e5f28
+Create Date: 2026-10-18 19:12:40.518377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d1f8b3a2c57'
+down_revision = '9a7d3c1e5f28'
+branch_labels = None
+depends_on = None
+
+# Mismo nombre que app.adapters.postgres_event_broker.PostgresEventBroker.SEQUENCE
+SEQUENCE = 'task_events_id_seq'
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence(SEQUENCE)))
+
+
+def downgrade():
+    op.execute(sa.schema.DropSequence(sa.Sequence(SEQUENCE)))
@@ -0,0 +1,30 @@
+"""Cascade comment deletes from tasks at the database level
+
+Revision ID: 8e4f2a6c9d13
+Revises: 3b9d1c7e5a2f
+Create Date: 2026-10-18 12:47:05.318240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f2a6c9d13'
+down_revision = '3b9d1c7e5a2f'
+branch_labels = None
+depends_on = None
+
+# Nombre por defecto que PostgreSQL dio a la FK sin nombre de la migración inicial
+CONSTRAINT = 'comments_task_id_fkey'
+
+
+def upgrade():
+    # DELETE FROM tasks ... RETURNING id borra los comentarios sin que el ORM los cargue
+    op.drop_constraint(CONSTRAINT, 'comments', type_='foreignkey')
+    op.create_foreign_key(CONSTRAINT, 'comments', 'tasks', ['task_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    op.drop_constraint(CONSTRAINT, 'comments', type_='foreignkey')
+    op.create_foreign_key(CONSTRAINT, 'comments', 'tasks', ['task_id'], ['id'])
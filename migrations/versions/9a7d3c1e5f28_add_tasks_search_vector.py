@@ -0,0 +1,60 @@
+"""Add a trigger-maintained search_vector column with a GIN index on tasks
+
+Revision ID: 9a7d3c1e5f28
+Revises: 5c2e9b7a1d40
+Create Date: 2026-10-18 16:41:09.204113
+
+Sin reescribir la tabla: la columna se añade nullable (sólo catálogo), un trigger la mantiene en
+INSERT/UPDATE, las filas existentes se rellenan por lotes de ids con un commit por lote y el índice
+GIN se crea con CONCURRENTLY. Ningún paso bloquea las escrituras más que un instante.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d3c1e5f28'
+down_revision = '5c2e9b7a1d40'
+branch_labels = None
+depends_on = None
+
+# Misma configuración y expresión que app.domain.models.SEARCH_VECTOR_EXPRESSION (con NEW. en el trigger)
+EXPRESSION = "to_tsvector('spanish', coalesce({row}title, '') || ' ' || coalesce({row}description, ''))"
+INDEX = 'ix_tasks_search_vector'
+FUNCTION = 'tasks_search_vector_update'
+TRIGGER = 'tasks_search_vector_trigger'
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    op.execute("ALTER TABLE tasks ADD COLUMN search_vector tsvector")
+    op.execute(
+        f"CREATE FUNCTION {FUNCTION}() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {EXPRESSION.format(row='NEW.')}; RETURN NEW; "
+        "END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        f"CREATE TRIGGER {TRIGGER} BEFORE INSERT OR UPDATE OF title, description ON tasks "
+        f"FOR EACH ROW EXECUTE FUNCTION {FUNCTION}()"
+    )
+    # Fuera de la transacción: cada lote hace commit y sólo bloquea sus propias filas. Las filas
+    # insertadas después de leer max(id) ya las rellena el trigger.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM tasks")).scalar()
+        backfill = sa.text(
+            f"UPDATE tasks SET search_vector = {EXPRESSION.format(row='')} "
+            "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+        )
+        for start in range(0, last_id, BATCH_SIZE):
+            bind.execute(backfill, {"start": start, "end": start + BATCH_SIZE})
+        op.create_index(INDEX, 'tasks', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name='tasks', postgresql_concurrently=True)
+    op.execute(f"DROP TRIGGER {TRIGGER} ON tasks")
+    op.execute(f"DROP FUNCTION {FUNCTION}()")
+    op.drop_column('tasks', 'search_vector')